@@ -20,8 +20,13 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 # target_metadata = None
 from app.models import Base
+from app.database import DATABASE_URL
 target_metadata = Base.metadata
 
+# Migrate the database the application uses (DATABASE_URL) rather than the
+# URL in alembic.ini; '%' is escaped for the ini interpolation.
+config.set_main_option("sqlalchemy.url", DATABASE_URL.render_as_string(hide_password=False).replace("%", "%%"))
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -0,0 +1,39 @@
+"""Index sales_daily_rollup by product and day
+
+Revision ID: a8e2f5c1d9b3
+Revises: f2c9d4e6b8a1
+Create Date: 2025-07-08 10:41:12.503318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8e2f5c1d9b3'
+down_revision: Union[str, None] = 'f2c9d4e6b8a1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Per-product revenue reports scan one product's date range instead of
+    # filtering the whole (day, product_id, category) primary key range.
+    # Built concurrently so the sales triggers keep writing to the rollup.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_sales_daily_rollup_product_day',
+            'sales_daily_rollup',
+            ['product_id', 'day'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_sales_daily_rollup_product_day', table_name='sales_daily_rollup',
+                      postgresql_concurrently=True)
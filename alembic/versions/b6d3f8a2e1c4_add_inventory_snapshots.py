@@ -0,0 +1,37 @@
+"""Add inventory snapshots
+
+Revision ID: b6d3f8a2e1c4
+Revises: a8e2f5c1d9b3
+Create Date: 2025-07-14 09:12:48.117305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6d3f8a2e1c4'
+down_revision: Union[str, None] = 'a8e2f5c1d9b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The (taken_at, product_id) primary key also finds the checkpoint
+    # nearest to a point in time.
+    op.create_table(
+        'inventory_snapshots',
+        sa.Column('taken_at', sa.DateTime(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('stock', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('taken_at', 'product_id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('inventory_snapshots')
@@ -0,0 +1,123 @@
+"""Add sales_daily_rollup table
+
+Revision ID: c3f1d2a8b9e4
+Revises: a02a9b6e7891
+Create Date: 2025-06-02 10:12:41.518302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f1d2a8b9e4'
+down_revision: Union[str, None] = 'a02a9b6e7891'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Statement-level trigger function: each INSERT/UPDATE/DELETE on ``sales`` is
+# folded into the rollup with one grouped upsert over the transition tables,
+# so a multi-row insert costs one rollup write per touched key, not per row.
+# A key is removed once its last sale is gone (sales_count = 0): quantity and
+# revenue can sum to zero or cancel out while sales remain.
+ROLLUP_FUNCTION = """
+CREATE OR REPLACE FUNCTION sales_daily_rollup_apply() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        INSERT INTO sales_daily_rollup AS r (day, product_id, category, revenue, quantity, sales_count)
+        SELECT o.sale_date::date, o.product_id, COALESCE(p.category, ''),
+               -COALESCE(SUM(o.total_price), 0), -COALESCE(SUM(o.quantity), 0), -COUNT(*)
+        FROM old_rows o
+        LEFT JOIN products p ON p.id = o.product_id
+        WHERE o.sale_date IS NOT NULL AND o.product_id IS NOT NULL
+        GROUP BY 1, 2, 3
+        ORDER BY 1, 2, 3
+        ON CONFLICT (day, product_id, category) DO UPDATE
+        SET revenue = r.revenue + EXCLUDED.revenue,
+            quantity = r.quantity + EXCLUDED.quantity,
+            sales_count = r.sales_count + EXCLUDED.sales_count;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO sales_daily_rollup AS r (day, product_id, category, revenue, quantity, sales_count)
+        SELECT n.sale_date::date, n.product_id, COALESCE(p.category, ''),
+               COALESCE(SUM(n.total_price), 0), COALESCE(SUM(n.quantity), 0), COUNT(*)
+        FROM new_rows n
+        LEFT JOIN products p ON p.id = n.product_id
+        WHERE n.sale_date IS NOT NULL AND n.product_id IS NOT NULL
+        GROUP BY 1, 2, 3
+        ORDER BY 1, 2, 3
+        ON CONFLICT (day, product_id, category) DO UPDATE
+        SET revenue = r.revenue + EXCLUDED.revenue,
+            quantity = r.quantity + EXCLUDED.quantity,
+            sales_count = r.sales_count + EXCLUDED.sales_count;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        DELETE FROM sales_daily_rollup r
+        USING (SELECT DISTINCT sale_date::date AS day, product_id FROM old_rows) o
+        WHERE r.day = o.day AND r.product_id = o.product_id AND r.sales_count = 0;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+BACKFILL = """
+INSERT INTO sales_daily_rollup (day, product_id, category, revenue, quantity, sales_count)
+SELECT s.sale_date::date, s.product_id, COALESCE(p.category, ''),
+       COALESCE(SUM(s.total_price), 0), COALESCE(SUM(s.quantity), 0), COUNT(*)
+FROM sales s
+LEFT JOIN products p ON p.id = s.product_id
+WHERE s.sale_date IS NOT NULL AND s.product_id IS NOT NULL
+GROUP BY 1, 2, 3
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('sales_daily_rollup',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('category', sa.String(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('sales_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'product_id', 'category')
+    )
+    op.create_index('ix_sales_daily_rollup_category_day', 'sales_daily_rollup', ['category', 'day'], unique=False)
+
+    # Block concurrent sale writes so nothing lands between the backfill and
+    # the triggers going live.
+    op.execute("LOCK TABLE sales IN SHARE MODE")
+    op.execute(BACKFILL)
+    op.execute(ROLLUP_FUNCTION)
+    op.execute(
+        "CREATE TRIGGER sales_daily_rollup_insert AFTER INSERT ON sales "
+        "REFERENCING NEW TABLE AS new_rows "
+        "FOR EACH STATEMENT EXECUTE FUNCTION sales_daily_rollup_apply()"
+    )
+    op.execute(
+        "CREATE TRIGGER sales_daily_rollup_update AFTER UPDATE ON sales "
+        "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+        "FOR EACH STATEMENT EXECUTE FUNCTION sales_daily_rollup_apply()"
+    )
+    op.execute(
+        "CREATE TRIGGER sales_daily_rollup_delete AFTER DELETE ON sales "
+        "REFERENCING OLD TABLE AS old_rows "
+        "FOR EACH STATEMENT EXECUTE FUNCTION sales_daily_rollup_apply()"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS sales_daily_rollup_delete ON sales")
+    op.execute("DROP TRIGGER IF EXISTS sales_daily_rollup_update ON sales")
+    op.execute("DROP TRIGGER IF EXISTS sales_daily_rollup_insert ON sales")
+    op.execute("DROP FUNCTION IF EXISTS sales_daily_rollup_apply()")
+    op.drop_index('ix_sales_daily_rollup_category_day', table_name='sales_daily_rollup')
+    op.drop_table('sales_daily_rollup')
@@ -0,0 +1,79 @@
+"""Add table watermarks
+
+Revision ID: d4b8e2a6c1f7
+Revises: c9e4a7d2f6b5
+Create Date: 2025-07-28 10:37:52.915604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4b8e2a6c1f7'
+down_revision: Union[str, None] = 'c9e4a7d2f6b5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+WATERMARKED_TABLES = ('products', 'sales', 'inventory_changes')
+WATERMARK_SHARDS = 32  # counter rows per table; more concurrent writers than this queue
+
+# Bumps one of the table's counter rows once per write statement, from any
+# write path; the table's version is their sum. A bumped row stays locked
+# until the writing transaction commits, so readers only ever see versions
+# whose data is visible too. Each transaction takes a row no other
+# transaction holds (SKIP LOCKED), starting from one picked by its backend
+# PID, so concurrent writers do not wait on each other; only when every row
+# is held does it wait for its own.
+WATERMARK_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION bump_table_watermark() RETURNS trigger AS $$
+DECLARE
+    preferred integer := pg_backend_pid() % {WATERMARK_SHARDS};
+    picked integer;
+BEGIN
+    SELECT shard INTO picked
+    FROM table_watermarks
+    WHERE table_name = TG_TABLE_NAME
+    ORDER BY (shard - preferred + {WATERMARK_SHARDS}) % {WATERMARK_SHARDS}
+    LIMIT 1
+    FOR UPDATE SKIP LOCKED;
+
+    UPDATE table_watermarks
+    SET version = version + 1, updated_at = timezone('utc', now())
+    WHERE table_name = TG_TABLE_NAME AND shard = COALESCE(picked, preferred);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'table_watermarks',
+        sa.Column('table_name', sa.String(), nullable=False),
+        sa.Column('shard', sa.Integer(), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('table_name', 'shard'),
+    )
+    op.execute(WATERMARK_FUNCTION)
+    for table in WATERMARKED_TABLES:
+        op.execute(f"INSERT INTO table_watermarks (table_name, shard, version, updated_at) "
+                   f"SELECT '{table}', shard, CASE WHEN shard = 0 THEN 1 ELSE 0 END, timezone('utc', now()) "
+                   f"FROM generate_series(0, {WATERMARK_SHARDS - 1}) shard")
+        op.execute(
+            f"CREATE TRIGGER {table}_watermark AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table} "
+            "FOR EACH STATEMENT EXECUTE FUNCTION bump_table_watermark()"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in reversed(WATERMARKED_TABLES):
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_watermark ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS bump_table_watermark()")
+    op.drop_table('table_watermarks')
@@ -0,0 +1,151 @@
+"""Partition sales by month
+
+Revision ID: d7a4e0c5f2b1
+Revises: c3f1d2a8b9e4
+Create Date: 2025-06-16 09:47:12.903417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7a4e0c5f2b1'
+down_revision: Union[str, None] = 'c3f1d2a8b9e4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Creates (or returns the existing) partition holding the month of ``month``.
+# Rows of that month already sitting in sales_default are moved into the new
+# partition first, so attaching it cannot fail the default's constraint. DML
+# on partitions directly does not fire the statement triggers on ``sales``,
+# so the move leaves sales_daily_rollup untouched.
+CREATE_PARTITION_FUNCTION = """
+CREATE OR REPLACE FUNCTION create_sales_partition(month date) RETURNS text AS $$
+DECLARE
+    start_at timestamp := date_trunc('month', month);
+    end_at timestamp := date_trunc('month', month) + interval '1 month';
+    partition_name text := format('sales_y%sm%s', to_char(start_at, 'YYYY'), to_char(start_at, 'MM'));
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN partition_name;
+    END IF;
+
+    EXECUTE format('CREATE TABLE %I (LIKE sales INCLUDING DEFAULTS)', partition_name);
+    IF to_regclass('sales_default') IS NOT NULL THEN
+        EXECUTE format(
+            'WITH moved AS (DELETE FROM sales_default WHERE sale_date >= %L AND sale_date < %L RETURNING *) '
+            'INSERT INTO %I SELECT * FROM moved',
+            start_at, end_at, partition_name
+        );
+    END IF;
+    EXECUTE format(
+        'ALTER TABLE sales ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        partition_name, start_at, end_at
+    );
+    RETURN partition_name;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+ROLLUP_TRIGGERS = [
+    "CREATE TRIGGER sales_daily_rollup_insert AFTER INSERT ON sales "
+    "REFERENCING NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION sales_daily_rollup_apply()",
+    "CREATE TRIGGER sales_daily_rollup_update AFTER UPDATE ON sales "
+    "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION sales_daily_rollup_apply()",
+    "CREATE TRIGGER sales_daily_rollup_delete AFTER DELETE ON sales "
+    "REFERENCING OLD TABLE AS old_rows "
+    "FOR EACH STATEMENT EXECUTE FUNCTION sales_daily_rollup_apply()",
+]
+
+SALES_INDEXES = [
+    ('ix_sales_id', ['id']),
+    ('ix_sales_product_id', ['product_id']),
+    ('ix_sales_sale_date', ['sale_date']),
+    ('ix_sales_product_date', ['product_id', 'sale_date']),
+]
+
+
+def _move_sales_aside() -> None:
+    """Rename the current sales table out of the way, keeping its data and sequence."""
+    op.execute("LOCK TABLE sales IN ACCESS EXCLUSIVE MODE")
+    op.execute("ALTER TABLE sales RENAME TO sales_old")
+    op.execute("ALTER TABLE sales_old RENAME CONSTRAINT sales_pkey TO sales_old_pkey")
+    for name, _ in SALES_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+    # The rollup already reflects these rows; keep its triggers off the copy.
+    op.execute("DROP TRIGGER IF EXISTS sales_daily_rollup_insert ON sales_old")
+    op.execute("DROP TRIGGER IF EXISTS sales_daily_rollup_update ON sales_old")
+    op.execute("DROP TRIGGER IF EXISTS sales_daily_rollup_delete ON sales_old")
+
+
+def _finish_sales_swap() -> None:
+    """Copy rows from sales_old, hand over the id sequence and re-create indexes and triggers."""
+    op.execute(
+        "INSERT INTO sales (id, product_id, quantity, total_price, sale_date) "
+        "SELECT id, product_id, quantity, total_price, sale_date FROM sales_old"
+    )
+    op.execute("ALTER SEQUENCE sales_id_seq OWNED BY sales.id")
+    op.execute("DROP TABLE sales_old")
+    for name, columns in SALES_INDEXES:
+        op.create_index(name, 'sales', columns, unique=False)
+    for trigger in ROLLUP_TRIGGERS:
+        op.execute(trigger)
+    op.execute("ANALYZE sales")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+    missing_dates = conn.execute(sa.text("SELECT count(*) FROM sales WHERE sale_date IS NULL")).scalar()
+    if missing_dates:
+        raise RuntimeError(
+            f"{missing_dates} sales have no sale_date; set one before partitioning by sale_date."
+        )
+
+    _move_sales_aside()
+    op.execute("""
+        CREATE TABLE sales (
+            id integer NOT NULL DEFAULT nextval('sales_id_seq'::regclass),
+            product_id integer REFERENCES products (id),
+            quantity integer,
+            total_price double precision,
+            sale_date timestamp without time zone NOT NULL,
+            PRIMARY KEY (id, sale_date)
+        ) PARTITION BY RANGE (sale_date)
+    """)
+    op.execute(CREATE_PARTITION_FUNCTION)
+    # One partition per month of existing history and three months ahead;
+    # anything outside lands in sales_default until a partition is created.
+    op.execute("""
+        SELECT create_sales_partition(month::date)
+        FROM generate_series(
+            date_trunc('month', COALESCE((SELECT min(sale_date) FROM sales_old), now())),
+            date_trunc('month', now()) + interval '3 months',
+            interval '1 month'
+        ) AS month
+    """)
+    op.execute("CREATE TABLE sales_default PARTITION OF sales DEFAULT")
+    _finish_sales_swap()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _move_sales_aside()
+    op.execute("""
+        CREATE TABLE sales (
+            id integer NOT NULL DEFAULT nextval('sales_id_seq'::regclass),
+            product_id integer REFERENCES products (id),
+            quantity integer,
+            total_price double precision,
+            sale_date timestamp without time zone,
+            PRIMARY KEY (id)
+        )
+    """)
+    _finish_sales_swap()
+    op.execute("DROP FUNCTION IF EXISTS create_sales_partition(date)")
@@ -0,0 +1,43 @@
+"""Index inventory_changes by product and time
+
+Revision ID: e5b8c1f3a7d2
+Revises: d7a4e0c5f2b1
+Create Date: 2025-06-23 14:05:37.210894
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b8c1f3a7d2'
+down_revision: Union[str, None] = 'd7a4e0c5f2b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built concurrently so hourly stock syncs keep writing during the upgrade.
+    # The composite index serves plain product_id lookups as well, so the
+    # single-column one is dropped.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_inventory_changes_product_timestamp',
+            'inventory_changes',
+            ['product_id', sa.text('timestamp DESC'), sa.text('id DESC')],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.drop_index('ix_inventory_changes_product_id', table_name='inventory_changes', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_inventory_changes_product_id', 'inventory_changes', ['product_id'], unique=False,
+                        postgresql_concurrently=True)
+        op.drop_index('ix_inventory_changes_product_timestamp', table_name='inventory_changes',
+                      postgresql_concurrently=True)
@@ -0,0 +1,72 @@
+"""Add low-stock watchlist
+
+Revision ID: f2c9d4e6b8a1
+Revises: e5b8c1f3a7d2
+Create Date: 2025-06-30 11:21:09.640275
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c9d4e6b8a1'
+down_revision: Union[str, None] = 'e5b8c1f3a7d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Publishes a product on the ``low_stock`` channel whenever it enters or leaves
+# the watchlist (stock <= reorder_level). NOTIFY is delivered on commit, so
+# listeners in every worker see crossings from any write path, including
+# update_inventory, the batch stock update and bulk sale ingestion.
+# pg_notify rejects payloads of 8000 bytes or more, so the unbounded text
+# columns are cut to NOTIFY_TEXT_CHARS characters (at most 6 bytes each once
+# JSON-escaped), keeping every payload well under the limit.
+NOTIFY_TEXT_CHARS = 200
+NOTIFY_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION products_low_stock_notify() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('low_stock', json_build_object(
+        'product_id', NEW.id,
+        'name', left(NEW.name, {NOTIFY_TEXT_CHARS}),
+        'category', left(NEW.category, {NOTIFY_TEXT_CHARS}),
+        'stock', NEW.stock,
+        'reorder_level', NEW.reorder_level,
+        'low', COALESCE(NEW.stock <= NEW.reorder_level, false)
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('products', sa.Column('reorder_level', sa.Integer(), nullable=False, server_default='10'))
+    # Only low-stock products are indexed, so the watchlist stays as small as
+    # the set itself and every stock write keeps it current.
+    op.create_index('ix_products_low_stock', 'products', ['id'], unique=False,
+                    postgresql_where=sa.text('stock <= reorder_level'))
+    op.execute(NOTIFY_FUNCTION)
+    op.execute(
+        "CREATE TRIGGER products_low_stock_insert AFTER INSERT ON products "
+        "FOR EACH ROW WHEN (NEW.stock <= NEW.reorder_level) "
+        "EXECUTE FUNCTION products_low_stock_notify()"
+    )
+    op.execute(
+        "CREATE TRIGGER products_low_stock_update AFTER UPDATE OF stock, reorder_level ON products "
+        "FOR EACH ROW WHEN ((OLD.stock <= OLD.reorder_level) IS DISTINCT FROM (NEW.stock <= NEW.reorder_level)) "
+        "EXECUTE FUNCTION products_low_stock_notify()"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS products_low_stock_update ON products")
+    op.execute("DROP TRIGGER IF EXISTS products_low_stock_insert ON products")
+    op.execute("DROP FUNCTION IF EXISTS products_low_stock_notify()")
+    op.drop_index('ix_products_low_stock', table_name='products')
+    op.drop_column('products', 'reorder_level')
@@ -0,0 +1,410 @@
+import asyncio
+import datetime
+import io
+import threading
+import time
+from typing import Optional
+import numpy as np
+from sqlalchemy import Date, Double, Integer, cast, func, literal, select
+from app import config, crud, models
+from app.database import SessionLocal
+
+EPOCH = datetime.date(1970, 1, 1)
+
+# One row of the binary COPY of SalesSnapshot.refresh: a field count, then a
+# length-prefixed big-endian value per column (none are NULL).
+_COPY_ROW = np.dtype([
+    ("fields", ">i2"),
+    ("product_id_size", ">i4"), ("product_id", ">i4"),
+    ("day_size", ">i4"), ("day", ">i4"),
+    ("total_price_size", ">i4"), ("total_price", ">f8"),
+    ("quantity_size", ">i4"), ("quantity", ">i4"),
+])
+_COPY_SIGNATURE = b"PGCOPY\n\xff\r\n\x00"
+_COPY_TRAILER = b"\xff\xff"
+SNAPSHOT_COPY_IDS = 1_000_000  # sale ids per COPY, bounding the raw data held while loading
+
+def next_period_start(period: str, day: datetime.date) -> datetime.date:
+    """
+    First day of the report period after the one starting on ``day``.
+    """
+    if period == "weekly":
+        return day + datetime.timedelta(days=7)
+    if period == "monthly":
+        return (day.replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
+    if period == "annual":
+        return day.replace(year=day.year + 1)
+    return day + datetime.timedelta(days=1)
+
+class _Columns:
+    """
+    Immutable column arrays of one snapshot generation, sorted by day.
+    """
+    __slots__ = ("product_id", "day", "total_price", "quantity", "revenue_cumsum")
+
+    def __init__(self, product_id, day, total_price, quantity, revenue_cumsum=None):
+        self.product_id = product_id
+        self.day = day
+        self.total_price = total_price
+        self.quantity = quantity
+        self.revenue_cumsum = np.concatenate(([0.0], np.cumsum(total_price))) if revenue_cumsum is None else revenue_cumsum
+
+    @classmethod
+    def empty(cls):
+        return cls(np.empty(0, np.int32), np.empty(0, np.int32), np.empty(0, np.float64), np.empty(0, np.int32))
+
+    def append(self, product_id, day, total_price, quantity):
+        """
+        Return a new generation with the given rows added, keeping day order.
+        """
+        order = np.argsort(day, kind="stable")
+        product_id, day, total_price, quantity = product_id[order], day[order], total_price[order], quantity[order]
+
+        if not len(self.day):
+            return _Columns(product_id, day, total_price, quantity)
+        if len(day) and day[0] < self.day[-1]:
+            # Back-dated rows: merge and re-sort the whole snapshot.
+            return _Columns.empty().append(
+                np.concatenate((self.product_id, product_id)),
+                np.concatenate((self.day, day)),
+                np.concatenate((self.total_price, total_price)),
+                np.concatenate((self.quantity, quantity)),
+            )
+        cumsum = np.concatenate((self.revenue_cumsum, self.revenue_cumsum[-1] + np.cumsum(total_price)))
+        return _Columns(
+            np.concatenate((self.product_id, product_id)),
+            np.concatenate((self.day, day)),
+            np.concatenate((self.total_price, total_price)),
+            np.concatenate((self.quantity, quantity)),
+            cumsum,
+        )
+
+def _copy_columns(cursor, query: str):
+    """
+    Run ``query`` through ``COPY ... TO STDOUT WITH (FORMAT binary)`` and
+    decode its rows (see ``_COPY_ROW``) straight into typed column arrays.
+
+    Returns:
+        tuple: The product_id, day, total_price and quantity arrays.
+    """
+    buffer = io.BytesIO()
+    cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT binary)", buffer)
+    data = buffer.getbuffer()
+    if data[:11] != _COPY_SIGNATURE or data[-2:] != _COPY_TRAILER:
+        raise ValueError("Not a binary COPY stream")
+    header_size = 19 + int.from_bytes(data[15:19], "big")
+    count, remainder = divmod(len(data) - header_size - len(_COPY_TRAILER), _COPY_ROW.itemsize)
+    rows = np.frombuffer(data, dtype=_COPY_ROW, count=count, offset=header_size)
+    if remainder or (rows["fields"] != 4).any():
+        raise ValueError("Unexpected binary COPY row layout")
+    return (
+        rows["product_id"].astype(np.int32),
+        rows["day"].astype(np.int32),
+        rows["total_price"].astype(np.float64),
+        rows["quantity"].astype(np.int32),
+    )
+
+class SalesSnapshot:
+    """
+    Columnar in-memory copy of ``sales`` answering the revenue reports with
+    vectorized NumPy operations instead of SQL aggregates.
+
+    Rows are loaded once, then appended incrementally by id watermark. Sales
+    updated or deleted after loading, or committed late with an id below the
+    watermark, are picked up by the periodic full reload.
+    """
+
+    def __init__(self, refresh_interval: float = 5.0, full_reload_interval: float = 3600.0):
+        self.refresh_interval = refresh_interval
+        self.full_reload_interval = full_reload_interval
+        self.max_id = 0
+        self.refreshed_at = 0.0
+        self.reloaded_at = 0.0
+        self._columns = _Columns.empty()
+        self._categories = np.empty(0, dtype=object)  # category name by code
+        self._product_category = np.empty(0, dtype=np.int32)  # category code by product_id, -1 if unknown
+        self._product_names: dict[int, str] = {}
+        self._refresh_lock = threading.Lock()
+        self._async_lock: Optional[asyncio.Lock] = None
+
+    @classmethod
+    def from_arrays(cls, product_id, day, total_price, quantity, product_categories: dict[int, str]):
+        """
+        Build a snapshot from existing arrays, e.g. for benchmarks.
+
+        Args:
+            product_id (array): Product ID per sale.
+            day (array): Sale date per sale, as days since 1970-01-01.
+            total_price (array): Revenue per sale.
+            quantity (array): Units per sale.
+            product_categories (dict[int, str]): Category of every product.
+
+        Returns:
+            SalesSnapshot: A snapshot that is never refreshed from the database.
+        """
+        snapshot = cls(refresh_interval=float("inf"), full_reload_interval=float("inf"))
+        snapshot._set_categories(product_categories)
+        snapshot._columns = _Columns.empty().append(
+            np.asarray(product_id, np.int32),
+            np.asarray(day, np.int32),
+            np.asarray(total_price, np.float64),
+            np.asarray(quantity, np.int32),
+        )
+        snapshot.refreshed_at = snapshot.reloaded_at = time.monotonic()
+        return snapshot
+
+    @property
+    def rows(self) -> int:
+        return len(self._columns.day)
+
+    def _set_categories(self, product_categories: dict[int, str]):
+        names, codes = np.unique(np.array(list(product_categories.values()) or [""], dtype=object), return_inverse=True)
+        mapping = np.full(max(product_categories, default=0) + 1, -1, dtype=np.int32)
+        if product_categories:
+            mapping[np.fromiter(product_categories, dtype=np.int64)] = codes
+        self._categories = names
+        self._product_category = mapping
+
+    def refresh(self, full: bool = False):
+        """
+        Load sales newer than the id watermark (or everything when ``full``)
+        and the current product categories.
+
+        Args:
+            full (bool): Discard the snapshot and reload all sales.
+        """
+        with self._refresh_lock:
+            full = full or time.monotonic() - self.reloaded_at >= self.full_reload_interval
+            watermark = 0 if full else self.max_id
+            day_number = cast(models.Sale.sale_date, Date) - literal(EPOCH, Date)
+            stmt = (
+                select(
+                    cast(models.Sale.product_id, Integer),
+                    cast(day_number, Integer),
+                    cast(func.coalesce(models.Sale.total_price, 0), Double),
+                    cast(func.coalesce(models.Sale.quantity, 0), Integer),
+                )
+                .where(models.Sale.product_id.is_not(None))
+            )
+
+            with SessionLocal() as db:
+                # One snapshot for the catalog, the id bound and every COPY.
+                db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+                products = db.execute(select(models.Product.id, models.Product.name, models.Product.category)).all()
+                categories = {row.id: row.category or "" for row in products}
+                names = {row.id: row.name for row in products}
+                max_id = max(watermark, db.execute(select(func.max(models.Sale.id))).scalar() or 0)
+                dialect = db.get_bind().dialect
+                with db.connection().connection.cursor() as cursor:
+                    # COPY decoded into typed arrays: no Row or Python number per value.
+                    blocks = [
+                        _copy_columns(cursor, stmt.where(models.Sale.id > lo, models.Sale.id <= lo + SNAPSHOT_COPY_IDS)
+                                      .compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+                        for lo in range(watermark, max_id, SNAPSHOT_COPY_IDS)
+                    ]
+
+            columns = _Columns.empty() if full else self._columns
+            if blocks:
+                columns = columns.append(*(np.concatenate(column) for column in zip(*blocks)))
+
+            self._set_categories(categories)
+            self._product_names = names
+            self._columns = columns
+            self.max_id = max_id
+            self.refreshed_at = time.monotonic()
+            if full:
+                self.reloaded_at = self.refreshed_at
+
+    async def ensure_fresh(self):
+        """
+        Refresh in a worker thread when the snapshot is older than ``refresh_interval``.
+        """
+        if time.monotonic() - self.refreshed_at < self.refresh_interval:
+            return
+        if self._async_lock is None:
+            self._async_lock = asyncio.Lock()
+        async with self._async_lock:
+            if time.monotonic() - self.refreshed_at >= self.refresh_interval:
+                await asyncio.to_thread(self.refresh)
+
+    def _day_range(self, columns: _Columns, start_date, end_date) -> tuple[int, int]:
+        """
+        Index bounds [lo, hi) of the sales between two inclusive dates.
+        """
+        lo = 0 if start_date is None else np.searchsorted(columns.day, (start_date - EPOCH).days, side="left")
+        hi = len(columns.day) if end_date is None else np.searchsorted(columns.day, (end_date - EPOCH).days, side="right")
+        return int(lo), int(max(hi, lo))
+
+    def _codes_for(self, product_id):
+        """
+        Category codes of the given product IDs, -1 for products without a known category.
+        """
+        mapping = self._product_category
+        if not len(mapping):
+            return np.full(len(product_id), -1, dtype=np.int32)
+        return np.where(product_id < len(mapping), mapping[np.minimum(product_id, len(mapping) - 1)], -1)
+
+    def _category_code(self, category: str) -> int:
+        matches = np.flatnonzero(self._categories == category)
+        return int(matches[0]) if len(matches) else -2  # matches no product
+
+    def revenue_by_period(self, period: str, start_date: Optional[datetime.date] = None,
+                          end_date: Optional[datetime.date] = None, category: Optional[str] = None,
+                          product_id: Optional[int] = None):
+        """
+        NumPy version of :func:`app.crud.get_revenue_by_period`.
+        """
+        if period not in crud.PERIOD_UNITS:
+            return {"error": ("Invalid period. Use daily, weekly, monthly, or annual.")}
+
+        columns = self._columns
+        lo, hi = self._day_range(columns, start_date, end_date)
+        days = columns.day[lo:hi]
+        revenue = columns.total_price[lo:hi]
+        if category or product_id:
+            selected = np.ones(hi - lo, dtype=bool)
+            if product_id:
+                selected &= columns.product_id[lo:hi] == product_id
+            if category:
+                selected &= self._codes_for(columns.product_id[lo:hi]) == self._category_code(category)
+            days, revenue = days[selected], revenue[selected]
+        if not len(days) and (start_date is None or end_date is None):
+            return []
+
+        if period == "weekly":
+            keys = days - (days + 3) % 7  # Monday of the ISO week; 1970-01-01 was a Thursday
+        elif period == "daily":
+            keys = days
+        else:
+            unit = "M" if period == "monthly" else "Y"
+            keys = days.astype("datetime64[D]").astype(f"datetime64[{unit}]").astype(np.int64)
+
+        # Days are sorted, so every bucket is one contiguous run.
+        totals = {}
+        if len(days):
+            starts = np.concatenate(([0], np.flatnonzero(keys[1:] != keys[:-1]) + 1))
+            for first_day, total in zip(days[starts].tolist(), np.add.reduceat(revenue, starts).tolist()):
+                totals[crud.period_start(period, EPOCH + datetime.timedelta(days=first_day))] = total
+
+        first = crud.period_start(period, start_date or EPOCH + datetime.timedelta(days=int(days[0])))
+        last = crud.period_start(period, end_date or EPOCH + datetime.timedelta(days=int(days[-1])))
+        report = []
+        while first <= last:
+            report.append({"period": crud.period_label(period, first), "period_start": first,
+                           "total_revenue": float(totals.get(first, 0.0))})
+            first = next_period_start(period, first)
+        return report
+
+    def period_revenue(self, start: datetime.date, end: datetime.date, category: Optional[str] = None) -> float:
+        """
+        Total revenue between two inclusive dates, optionally for one category.
+        """
+        columns = self._columns
+        lo, hi = self._day_range(columns, start, end)
+        if not category:
+            return float(columns.revenue_cumsum[hi] - columns.revenue_cumsum[lo])
+        in_category = self._codes_for(columns.product_id[lo:hi]) == self._category_code(category)
+        return float(columns.total_price[lo:hi][in_category].sum())
+
+    def compare_revenue(self, start1: datetime.date, end1: datetime.date, start2: datetime.date,
+                        end2: datetime.date, category: Optional[str] = None):
+        """
+        NumPy version of :func:`app.crud.compare_revenue`.
+        """
+        revenue1 = self.period_revenue(start1, end1, category)
+        revenue2 = self.period_revenue(start2, end2, category)
+        return {
+            "period1": {"start": start1.isoformat(), "end": end1.isoformat(), "revenue": revenue1},
+            "period2": {"start": start2.isoformat(), "end": end2.isoformat(), "revenue": revenue2},
+            "difference": revenue2 - revenue1,
+            "category": category
+        }
+
+    def compare_revenue_periods(self, periods: list[tuple[datetime.date, datetime.date]],
+                                category: Optional[str] = None, by_category: bool = False):
+        """
+        NumPy version of :func:`app.crud.compare_revenue_periods`.
+        """
+        if not by_category:
+            return crud.period_comparison(periods, category, [self.period_revenue(start, end, category) for start, end in periods])
+
+        columns = self._columns
+        revenue = np.zeros((len(periods), len(self._categories)))
+        sales = np.zeros(len(self._categories), dtype=np.int64)
+        wanted = self._category_code(category) if category else None
+        for index, (start, end) in enumerate(periods):
+            lo, hi = self._day_range(columns, start, end)
+            codes = self._codes_for(columns.product_id[lo:hi])
+            selected = codes >= 0 if wanted is None else codes == wanted
+            revenue[index] = np.bincount(codes[selected], weights=columns.total_price[lo:hi][selected],
+                                         minlength=len(self._categories))
+            sales += np.bincount(codes[selected], minlength=len(self._categories))
+
+        present = np.flatnonzero(sales)  # codes follow name order, like the SQL ORDER BY
+        rows = [(self._categories[code], revenue[:, code].tolist()) for code in present]
+        return crud.period_comparison(periods, category, revenue[:, present].sum(axis=1).tolist(), rows)
+
+    def revenue_by_category(self, start_date: Optional[datetime.date] = None,
+                            end_date: Optional[datetime.date] = None):
+        """
+        NumPy version of :func:`app.crud.get_revenue_by_category`.
+        """
+        columns = self._columns
+        lo, hi = self._day_range(columns, start_date, end_date)
+        codes = self._codes_for(columns.product_id[lo:hi])
+        known = codes >= 0
+        revenue = np.bincount(codes[known], weights=columns.total_price[lo:hi][known], minlength=len(self._categories))
+        quantity = np.bincount(codes[known], weights=columns.quantity[lo:hi][known], minlength=len(self._categories))
+        present = np.flatnonzero(quantity)
+        order = present[np.argsort(-revenue[present], kind="stable")]
+        return [
+            {"category": self._categories[code], "total_revenue": float(revenue[code]), "total_quantity": int(quantity[code])}
+            for code in order
+        ]
+
+    def top_sales(self, by: str = "product", metric: str = "revenue", limit: int = 20,
+                  start_date: Optional[datetime.date] = None, end_date: Optional[datetime.date] = None,
+                  category: Optional[str] = None):
+        """
+        NumPy version of :func:`app.crud.get_top_sales`.
+
+        Totals every group with ``bincount``, then selects the best ``limit``
+        with ``argpartition`` so only those are sorted.
+        """
+        columns = self._columns
+        lo, hi = self._day_range(columns, start_date, end_date)
+        product_id = columns.product_id[lo:hi]
+        codes = self._codes_for(product_id)
+        selected = codes >= 0 if by == "category" else np.ones(len(codes), dtype=bool)
+        if category is not None:
+            selected &= codes == self._category_code(category)
+
+        keys = (codes if by == "category" else product_id)[selected]
+        revenue = np.bincount(keys, weights=columns.total_price[lo:hi][selected])
+        quantity = np.bincount(keys, weights=columns.quantity[lo:hi][selected])
+        present = np.flatnonzero(np.bincount(keys))
+        score = revenue if metric == "revenue" else quantity
+
+        if len(present) > limit:
+            present = present[np.argpartition(-score[present], limit - 1)[:limit]]
+        # Ties rank by key, like the SQL version (category codes follow name order).
+        top = present[np.lexsort((present, -score[present]))]
+
+        if by == "category":
+            return [
+                {"category": self._categories[code], "total_revenue": float(revenue[code]), "total_quantity": int(quantity[code])}
+                for code in top.tolist()
+            ]
+        top_codes = self._codes_for(top)
+        return [
+            {
+                "product_id": product,
+                "name": self._product_names.get(product),
+                "category": (self._categories[code] or None) if code >= 0 else None,
+                "total_revenue": float(revenue[product]),
+                "total_quantity": int(quantity[product]),
+            }
+            for product, code in zip(top.tolist(), top_codes.tolist())
+        ]
+
+sales_snapshot = SalesSnapshot(config.ANALYTICS_REFRESH_SECONDS, config.ANALYTICS_FULL_RELOAD_SECONDS)
@@ -0,0 +1,225 @@
+from datetime import date, datetime
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import crud, models, schemas
+from app.cache import report_cache
+
+# Async counterparts of app.crud. Most run the sync implementation via
+# AsyncSession.run_sync, which executes it in a greenlet on the event loop:
+# the query logic lives in crud.py only, while all I/O goes through asyncpg
+# without occupying a threadpool slot. Only paths that need asyncpg-specific
+# features (server-side streaming, COPY) are written natively here.
+
+async def create_product(db: AsyncSession, product: schemas.ProductCreate):
+    """
+    Async version of :func:`app.crud.create_product`.
+    """
+    return await db.run_sync(crud.create_product, product)
+
+async def get_sales(db: AsyncSession, skip: int = 0, limit: int = 100,
+                    start_date: Optional[str] = None,
+                    end_date: Optional[str] = None,
+                    product_id: Optional[int] = None,
+                    category: Optional[str] = None,
+                    cursor: Optional[str] = None):
+    """
+    Async version of :func:`app.crud.get_sales`.
+    """
+    return await db.run_sync(
+        crud.get_sales,
+        skip=skip,
+        limit=limit,
+        start_date=start_date,
+        end_date=end_date,
+        product_id=product_id,
+        category=category,
+        cursor=cursor,
+    )
+
+async def stream_sales(db: AsyncSession,
+                       start_date: Optional[str] = None,
+                       end_date: Optional[str] = None,
+                       product_id: Optional[int] = None,
+                       category: Optional[str] = None,
+                       batch_size: int = 5000):
+    """
+    Async version of :func:`app.crud.stream_sales`, reading from an asyncpg
+    server-side cursor.
+
+    Yields:
+        List[Row]: Batches of sale rows ordered by (sale_date, id).
+    """
+    stmt = crud.sales_export_query(start_date, end_date, product_id, category)
+    result = await db.stream(stmt.execution_options(yield_per=batch_size))
+    try:
+        async for batch in result.partitions():
+            yield batch
+    finally:
+        await result.close()
+
+async def get_inventory(db: AsyncSession, low_stock_threshold: Optional[int] = None):
+    """
+    Async version of :func:`app.crud.get_inventory`.
+    """
+    return await db.run_sync(crud.get_inventory, low_stock_threshold)
+
+async def get_low_stock(db: AsyncSession, limit: int = 100, cursor: Optional[str] = None):
+    """
+    Async version of :func:`app.crud.get_low_stock`.
+    """
+    return await db.run_sync(crud.get_low_stock, limit, cursor)
+
+async def compare_revenue(db: AsyncSession, start1: date, end1: date, start2: date, end2: date, category: Optional[str] = None):
+    """
+    Async version of :func:`app.crud.compare_revenue`.
+    """
+    return await db.run_sync(crud.compare_revenue, start1, end1, start2, end2, category)
+
+async def compare_revenue_periods(db: AsyncSession, periods: list[tuple[date, date]], category: Optional[str] = None,
+                                  by_category: bool = False):
+    """
+    Async version of :func:`app.crud.compare_revenue_periods`.
+    """
+    return await db.run_sync(crud.compare_revenue_periods, periods, category, by_category)
+
+async def get_revenue_by_period(
+    db: AsyncSession,
+    period: str,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    category: Optional[str] = None,
+    product_id: Optional[int] = None,
+):
+    """
+    Async version of :func:`app.crud.get_revenue_by_period`.
+    """
+    return await db.run_sync(crud.get_revenue_by_period, period, start_date, end_date, category, product_id)
+
+async def get_revenue_by_category(
+    db: AsyncSession,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+):
+    """
+    Async version of :func:`app.crud.get_revenue_by_category`.
+    """
+    return await db.run_sync(crud.get_revenue_by_category, start_date, end_date)
+
+async def get_top_sales(
+    db: AsyncSession,
+    by: str = "product",
+    metric: str = "revenue",
+    limit: int = 20,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    category: Optional[str] = None,
+):
+    """
+    Async version of :func:`app.crud.get_top_sales`.
+    """
+    return await db.run_sync(crud.get_top_sales, by, metric, limit, start_date, end_date, category)
+
+async def get_product(db: AsyncSession, product_id: int):
+    """
+    Async version of :func:`app.crud.get_product`.
+    """
+    return await db.run_sync(crud.get_product, product_id)
+
+async def update_inventory(db: AsyncSession, product: models.Product, new_stock: int):
+    """
+    Async version of :func:`app.crud.update_inventory`.
+    """
+    return await db.run_sync(crud.update_inventory, product, new_stock)
+
+async def adjust_inventory(db: AsyncSession, product_id: int, delta: int, allow_negative: bool = True):
+    """
+    Async version of :func:`app.crud.adjust_inventory`.
+    """
+    return await db.run_sync(crud.adjust_inventory, product_id, delta, allow_negative)
+
+async def update_inventory_batch(db: AsyncSession, updates: list[schemas.StockUpdateItem]):
+    """
+    Async version of :func:`app.crud.update_inventory_batch`.
+    """
+    return await db.run_sync(crud.update_inventory_batch, updates)
+
+async def get_inventory_changes(db: AsyncSession, product_id: int, limit: int = 100,
+                                since: Optional[datetime] = None,
+                                until: Optional[datetime] = None,
+                                cursor: Optional[str] = None):
+    """
+    Async version of :func:`app.crud.get_inventory_changes`.
+    """
+    return await db.run_sync(crud.get_inventory_changes, product_id, limit, since, until, cursor)
+
+async def get_inventory_net_changes(db: AsyncSession, product_id: int, bucket: str = "day", limit: int = 100,
+                                    since: Optional[datetime] = None,
+                                    until: Optional[datetime] = None):
+    """
+    Async version of :func:`app.crud.get_inventory_net_changes`.
+    """
+    return await db.run_sync(crud.get_inventory_net_changes, product_id, bucket, limit, since, until)
+
+async def get_stock_as_of(db: AsyncSession, as_of: datetime, limit: int = 1000, cursor: Optional[str] = None):
+    """
+    Async version of :func:`app.crud.get_stock_as_of`.
+    """
+    return await db.run_sync(crud.get_stock_as_of, as_of, limit, cursor)
+
+async def get_watermark(db: AsyncSession, table_name: str) -> int:
+    """
+    Async version of :func:`app.crud.get_watermark`.
+    """
+    return await db.run_sync(crud.get_watermark, table_name)
+
+async def bulk_create_sales(db: AsyncSession, sales: list[schemas.SaleCreate]):
+    """
+    Insert many sales in one transaction and decrement product stock.
+
+    The rows are loaded with asyncpg's binary COPY into a temporary staging
+    table, then :func:`app.crud.ingest_staged_sales` applies them set-based.
+    Cached reports covering the written days are invalidated.
+
+    Args:
+        db (AsyncSession): Database session.
+        sales (list[schemas.SaleCreate]): Sales to ingest.
+
+    Returns:
+        dict: Number of sales inserted and of products whose stock changed.
+
+    Raises:
+        UnknownProductsError: If any sale references a missing product; nothing is written.
+    """
+    records = crud.sale_staging_records(sales, datetime.utcnow())
+    conn = await db.connection()
+    await conn.execute(text(crud.SALES_STAGING_DDL))
+    raw = await conn.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(
+        "sales_staging",
+        records=records,
+        columns=crud.SALE_STAGING_COLUMNS,
+    )
+    result = await db.run_sync(crud.ingest_staged_sales)
+    await db.commit()
+
+    report_cache.invalidate_days({record[3].date() for record in records})
+    return result
+
+async def create_report_job(db: AsyncSession, kind: str, params: dict, reuse_seconds: float = 0, stale_seconds: float = 0):
+    """
+    Async version of :func:`app.crud.create_report_job`.
+    """
+    return await db.run_sync(crud.create_report_job, kind, params, reuse_seconds, stale_seconds)
+
+async def get_report_job(db: AsyncSession, job_id: int):
+    """
+    Async version of :func:`app.crud.get_report_job`.
+    """
+    return await db.run_sync(crud.get_report_job, job_id)
+
+async def cancel_report_job(db: AsyncSession, job_id: int, reason: str = "Cancelled"):
+    """
+    Async version of :func:`app.crud.cancel_report_job`.
+    """
+    return await db.run_sync(crud.cancel_report_job, job_id, reason)
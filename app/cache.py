@@ -0,0 +1,154 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import date, datetime
+from typing import Any, Hashable, Iterable, Optional
+from app import config
+
+DateRange = tuple[Optional[date], Optional[date]]
+
+INVALIDATION_LOG_SIZE = 256  # recent invalidations checked by ReportCache.set
+
+class ReportCache:
+    """
+    Bounded in-process LRU cache with TTL for aggregate report results.
+
+    Each entry remembers the sale-date ranges it was computed from, so a write
+    only evicts the reports whose ranges contain one of the written days.
+    The cache is per worker process: writes made through another worker are
+    picked up once the TTL expires.
+
+    A report computed while a write was being invalidated may predate that
+    write: callers read :attr:`generation` before computing a report and pass
+    it to :meth:`set`, which refuses the result if an overlapping
+    invalidation ran since.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.stale_stores = 0
+        self.generation = 0  # bumped by every invalidation
+        self._invalidated: deque = deque(maxlen=INVALIDATION_LOG_SIZE)  # (generation, days or None for all)
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Return the cached value for ``key``, or None on a miss or expired entry.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, _, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ranges: Iterable[DateRange], generation: Optional[int] = None):
+        """
+        Store ``value`` under ``key``, evicting the least recently used entries
+        beyond ``max_entries``.
+
+        Args:
+            key (Hashable): Normalized request parameters.
+            value (Any): Report result; callers must not mutate it afterwards.
+            ranges (Iterable[DateRange]): Inclusive sale-date ranges the report
+                covers, None meaning unbounded.
+            generation (Optional[int]): :attr:`generation` read before the
+                report was computed; the value is not stored if an
+                invalidation overlapping ``ranges`` ran since.
+        """
+        if self.max_entries <= 0:
+            return
+        ranges = tuple(ranges)
+        with self._lock:
+            if generation is not None and self._invalidated_since(generation, ranges):
+                self.stale_stores += 1
+                return
+            self._entries[key] = (value, ranges, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _invalidated_since(self, generation: int, ranges: tuple) -> bool:
+        if generation == self.generation:
+            return False
+        if not self._invalidated or self._invalidated[0][0] > generation + 1:
+            return True  # the invalidations since then are no longer all logged
+        return any(
+            days is None or any(_range_contains_any(date_range, days) for date_range in ranges)
+            for logged, days in self._invalidated
+            if logged > generation
+        )
+
+    def invalidate_days(self, days: Iterable[date]):
+        """
+        Drop every entry whose date ranges contain any of ``days``.
+        """
+        days = sorted(set(days))
+        if not days:
+            return
+        with self._lock:
+            self.generation += 1
+            self._invalidated.append((self.generation, days))
+            stale = [
+                key for key, (_, ranges, _) in self._entries.items()
+                if any(_range_contains_any(date_range, days) for date_range in ranges)
+            ]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._invalidated.append((self.generation, None))
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "stale_stores": self.stale_stores,
+            }
+
+def _range_contains_any(date_range: DateRange, days: list[date]) -> bool:
+    start, end = date_range
+    return any((start is None or day >= start) and (end is None or day <= end) for day in days)
+
+def parse_day(value) -> Optional[date]:
+    """
+    Normalize a date or 'YYYY-MM-DD' string (with an optional time part) to a date.
+
+    Raises:
+        ValueError: If the string is not an ISO date.
+    """
+    if isinstance(value, datetime):
+        return value.date()
+    if value is None or isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+report_cache = ReportCache(config.REPORT_CACHE_MAX_ENTRIES, config.REPORT_CACHE_TTL_SECONDS)
@@ -1,14 +1,64 @@
 from datetime import date
 import datetime
+import hashlib
+import json
 from typing import Optional
 from sqlalchemy.orm import Session
 from app import models, schemas
-from sqlalchemy import func
+from app.dialects import report_dialect
+from app.pagination import decode_cursor, encode_cursor
+from sqlalchemy import Date, DateTime, and_, bindparam, cast, func, insert, not_, or_, select, text, tuple_, update
+
+# Columns of schemas.Sale and schemas.Product; list endpoints and the export
+# select them as plain rows instead of loading ORM objects.
+SALE_COLUMNS = ("id", "product_id", "quantity", "total_price", "sale_date")
+PRODUCT_COLUMNS = ("id", "name", "category", "price", "stock", "reorder_level")
+SALE_STAGING_COLUMNS = ("product_id", "quantity", "total_price", "sale_date")
+REPORT_JOB_COLUMNS = ("id", "kind", "params", "status", "created_at", "started_at", "finished_at", "result", "error")
+REPORT_JOB_ABANDONED = "Abandoned: the worker running it stopped"
+
+# Start time of the calling connection's backend, recorded with its PID so a
+# later backend that reuses the PID is not mistaken for it.
+BACKEND_START_SQL = "(SELECT backend_start FROM pg_stat_activity WHERE pid = pg_backend_pid())"
+
+# Per-transaction landing table for bulk sale ingestion.
+SALES_STAGING_DDL = """
+CREATE TEMPORARY TABLE sales_staging (
+    product_id integer NOT NULL,
+    quantity integer NOT NULL,
+    total_price double precision NOT NULL,
+    sale_date timestamp
+) ON COMMIT DROP
+"""
+
+class UnknownProductsError(ValueError):
+    """
+    Raised when a write references product IDs that do not exist.
+    """
+
+    def __init__(self, product_ids: list[int]):
+        super().__init__(f"Unknown product IDs: {product_ids}")
+        self.product_ids = product_ids
+
+class InsufficientStockError(ValueError):
+    """
+    Raised when a stock adjustment would leave a product with negative stock.
+    """
+
+    def __init__(self, product_id: int, stock: int, delta: int):
+        super().__init__(f"Product {product_id} has {stock} in stock; cannot apply {delta}")
+        self.product_id = product_id
+        self.stock = stock
+        self.delta = delta
 
 def create_product(db: Session, product: schemas.ProductCreate):
     """
     Create and store a new product in the database.
 
+    The initial stock is logged as a change from zero, so point-in-time
+    lookups before the product existed (see :func:`get_stock_as_of`) see no
+    stock.
+
     Args:
         db (Session): Database session.
         product (schemas.ProductCreate): Product data to create.
@@ -18,42 +68,145 @@ def create_product(db: Session, product: schemas.ProductCreate):
     """
     db_product = models.Product(**product.model_dump())
     db.add(db_product)
+    db.flush()
+    stock = db_product.stock or 0
+    db.add(models.InventoryChange(
+        product_id=db_product.id,
+        previous_stock=0,
+        new_stock=stock,
+        change_amount=stock,
+        timestamp=datetime.datetime.utcnow()
+    ))
     db.commit()
     db.refresh(db_product)
     return db_product
 
+def _columns(model, names):
+    """
+    The ``names`` columns of ``model``, in order, for a Core select().
+    """
+    return [getattr(model, name) for name in names]
+
+def _filter_sales(query, start_date: Optional[str], end_date: Optional[str],
+                  product_id: Optional[int], category: Optional[str]):
+    """
+    Apply the shared sales filters to a Query or select() joined with products.
+    """
+    if start_date:
+        query = query.filter(models.Sale.sale_date >= start_date)
+    if end_date:
+        query = query.filter(models.Sale.sale_date <= end_date)
+    if product_id:
+        query = query.filter(models.Sale.product_id == product_id)
+    if category:
+        query = query.filter(models.Product.category == category)
+    return query
+
 def get_sales(db: Session, skip: int = 0, limit: int = 100,
               start_date: Optional[str] = None,
               end_date: Optional[str] = None,
               product_id: Optional[int] = None,
-              category: Optional[str] = None):
+              category: Optional[str] = None,
+              cursor: Optional[str] = None):
     """
-    Retrieve sales records with optional filters and pagination.
+    Retrieve sales records with optional filters and keyset pagination.
+
+    Sales are returned newest first, ordered by (sale_date, id). Passing the
+    ``next_cursor`` of a page as ``cursor`` seeks straight to the following
+    page through the sale_date indexes instead of skipping rows.
+
+    Rows are read with a Core select() and returned as plain dicts, skipping
+    ORM object construction, so routes can serialize them as they are.
 
     Args:
         db (Session): Database session.
-        skip (int): Records to skip for pagination.
+        skip (int): Records to skip (deprecated, prefer ``cursor``).
         limit (int): Maximum records to return.
         start_date (Optional[str]): Filter by minimum sale date.
         end_date (Optional[str]): Filter by maximum sale date.
         product_id (Optional[int]): Filter by product ID.
         category (Optional[str]): Filter by product category.
+        cursor (Optional[str]): Cursor returned with the previous page.
 
     Returns:
-        List[models.Sale]: List of sales matching the criteria.
+        dict: ``items`` with the sales matching the criteria, as dicts keyed
+        by ``SALE_COLUMNS``, and ``next_cursor``, which is None on the last page.
+
+    Raises:
+        ValueError: If the cursor is malformed.
     """
-    query = db.query(models.Sale).join(models.Product)
+    query = _filter_sales(
+        select(*_columns(models.Sale, SALE_COLUMNS)).join(models.Product),
+        start_date, end_date, product_id, category
+    )
+    if cursor:
+        sale_date, sale_id = decode_cursor(cursor)
+        query = query.filter(tuple_(models.Sale.sale_date, models.Sale.id) < tuple_(sale_date, sale_id))
 
-    if start_date:
-        query = query.filter(models.Sale.sale_date >= start_date)
-    if end_date:
-        query = query.filter(models.Sale.sale_date <= end_date)
-    if product_id:
-        query = query.filter(models.Sale.product_id == product_id)
-    if category:
-        query = query.filter(models.Product.category == category)
+    query = query.order_by(models.Sale.sale_date.desc(), models.Sale.id.desc())
+    if skip:
+        query = query.offset(skip)
+
+    # Fetch one extra row to learn whether another page exists.
+    sales = [dict(zip(SALE_COLUMNS, row)) for row in db.execute(query.limit(limit + 1))]
+    next_cursor = None
+    if len(sales) > limit:
+        sales = sales[:limit]
+        next_cursor = encode_cursor(sales[-1]["sale_date"], sales[-1]["id"])
 
-    return query.offset(skip).limit(limit).all()
+    return {"items": sales, "next_cursor": next_cursor}
+
+def sales_export_query(start_date: Optional[str] = None,
+                       end_date: Optional[str] = None,
+                       product_id: Optional[int] = None,
+                       category: Optional[str] = None):
+    """
+    Build the select() behind the sales export.
+
+    Args:
+        start_date (Optional[str]): Filter by minimum sale date.
+        end_date (Optional[str]): Filter by maximum sale date.
+        product_id (Optional[int]): Filter by product ID.
+        category (Optional[str]): Filter by product category.
+
+    Returns:
+        Select: Sale columns in ``SALE_COLUMNS`` order, ordered by (sale_date, id).
+    """
+    return _filter_sales(
+        select(*_columns(models.Sale, SALE_COLUMNS)).join(models.Product),
+        start_date, end_date, product_id, category
+    ).order_by(models.Sale.sale_date, models.Sale.id)
+
+def stream_sales(db: Session,
+                 start_date: Optional[str] = None,
+                 end_date: Optional[str] = None,
+                 product_id: Optional[int] = None,
+                 category: Optional[str] = None,
+                 batch_size: int = 5000):
+    """
+    Stream sales rows in batches through a server-side cursor.
+
+    Rows are plain tuples in ``SALE_COLUMNS`` order, so memory use is
+    bounded by ``batch_size`` whatever the size of the result.
+
+    Args:
+        db (Session): Database session.
+        start_date (Optional[str]): Filter by minimum sale date.
+        end_date (Optional[str]): Filter by maximum sale date.
+        product_id (Optional[int]): Filter by product ID.
+        category (Optional[str]): Filter by product category.
+        batch_size (int): Rows fetched from the cursor per round trip.
+
+    Yields:
+        List[Row]: Batches of sale rows ordered by (sale_date, id).
+    """
+    stmt = sales_export_query(start_date, end_date, product_id, category)
+    result = db.execute(stmt.execution_options(yield_per=batch_size))
+    try:
+        for batch in result.partitions():
+            yield batch
+    finally:
+        result.close()
 
 def get_inventory(db: Session, low_stock_threshold: Optional[int] = None):
     """
@@ -64,37 +217,67 @@ def get_inventory(db: Session, low_stock_threshold: Optional[int] = None):
         low_stock_threshold (Optional[int]): If provided, filters products with stock less than or equal to this value.
 
     Returns:
-        List[models.Product]: List of products.
+        List[dict]: Products as dicts keyed by ``PRODUCT_COLUMNS``.
     """
-    query = db.query(models.Product)
+    query = select(*_columns(models.Product, PRODUCT_COLUMNS))
     if low_stock_threshold is not None:
         query = query.filter(models.Product.stock <= low_stock_threshold)
-    return query.order_by(models.Product.id.desc()).all()
+    return [dict(zip(PRODUCT_COLUMNS, row)) for row in db.execute(query.order_by(models.Product.id.desc()))]
 
-def compare_revenue(db: Session, start1: str, end1: str, start2: str, end2: str, category: Optional[str] = None):
+def get_low_stock(db: Session, limit: int = 100, cursor: Optional[str] = None):
+    """
+    Retrieve a page of the low-stock watchlist: products at or below their
+    reorder level, by ascending ID.
+
+    The predicate matches the partial index ``ix_products_low_stock``, so the
+    query reads only the watchlist, never the whole catalog.
+
+    Args:
+        db (Session): Database session.
+        limit (int): Maximum products to return.
+        cursor (Optional[str]): Cursor returned with the previous page.
+
+    Returns:
+        dict: ``items`` with the products, as dicts keyed by ``PRODUCT_COLUMNS``,
+        and ``next_cursor``, which is None on the last page.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    query = select(*_columns(models.Product, PRODUCT_COLUMNS)).filter(
+        models.Product.stock <= models.Product.reorder_level
+    )
+    if cursor:
+        query = query.filter(models.Product.id > int(cursor))
+
+    rows = db.execute(query.order_by(models.Product.id).limit(limit + 1))
+    products = [dict(zip(PRODUCT_COLUMNS, row)) for row in rows]
+    next_cursor = None
+    if len(products) > limit:
+        products = products[:limit]
+        next_cursor = str(products[-1]["id"])
+
+    return {"items": products, "next_cursor": next_cursor}
+
+def compare_revenue(db: Session, start1: date, end1: date, start2: date, end2: date, category: Optional[str] = None):
     """
     Compare revenue between two time periods, optionally filtered by category.
 
+    Reads from the ``sales_daily_rollup`` table, so both dates are inclusive
+    whole days. Both periods are summed in one query.
+
     Args:
         db (Session): Database session.
-        start1 (str): Start date for the first period.
-        end1 (str): End date for the first period.
-        start2 (str): Start date for the second period.
-        end2 (str): End date for the second period.
+        start1 (date): Start date for the first period.
+        end1 (date): End date for the first period.
+        start2 (date): Start date for the second period.
+        end2 (date): End date for the second period.
         category (Optional[str]): Optional category filter.
 
     Returns:
         dict: Revenue comparison between the two periods.
     """
-    query1 = db.query(func.sum(models.Sale.total_price)).join(models.Product)
-    query2 = db.query(func.sum(models.Sale.total_price)).join(models.Product)
-
-    if category:
-        query1 = query1.filter(models.Product.category == category)
-        query2 = query2.filter(models.Product.category == category)
-
-    revenue1 = query1.filter(models.Sale.sale_date.between(start1, end1)).scalar() or 0
-    revenue2 = query2.filter(models.Sale.sale_date.between(start2, end2)).scalar() or 0
+    revenue1, revenue2 = _revenue_per_period(db, [(start1, end1), (start2, end2)], category)[0]
 
     return {
         "period1": {"start": start1, "end": end1, "revenue": revenue1},
@@ -103,50 +286,287 @@ def compare_revenue(db: Session, start1: str, end1: str, start2: str, end2: str,
         "category": category
     }
 
+def _revenue_per_period(db: Session, periods: list[tuple[date, date]], category: Optional[str] = None,
+                        by_category: bool = False):
+    """
+    Sum rollup revenue for every period in a single scan using ``SUM(...) FILTER``.
+
+    Returns:
+        List[tuple]: One row of per-period revenues, or one ``(category, revenues)``
+        row per category when ``by_category``.
+    """
+    rollup = models.SalesDailyRollup
+    sums = [
+        func.coalesce(func.sum(rollup.revenue).filter(rollup.day.between(start, end)), 0)
+        for start, end in periods
+    ]
+    query = db.query(rollup.category, *sums) if by_category else db.query(*sums)
+    query = query.filter(or_(*(rollup.day.between(start, end) for start, end in periods)))
+    if category:
+        query = query.filter(rollup.category == category)
+
+    if by_category:
+        return [
+            (row[0], [float(revenue) for revenue in row[1:]])
+            for row in query.group_by(rollup.category).order_by(rollup.category)
+        ]
+    return [[float(revenue) for revenue in query.one()]]
+
+def _period_changes(periods: list[tuple[date, date]], revenues: list[float]):
+    changes = []
+    previous = None
+    for (start, end), revenue in zip(periods, revenues):
+        delta = None if previous is None else revenue - previous
+        delta_pct = delta / previous * 100 if previous else None
+        changes.append({"start": start, "end": end, "revenue": revenue, "delta": delta, "delta_pct": delta_pct})
+        previous = revenue
+    return changes
+
+def period_comparison(periods: list[tuple[date, date]], category: Optional[str], totals: list[float],
+                      by_category: Optional[list[tuple[str, list[float]]]] = None):
+    """
+    Shape per-period revenues into the N-period comparison report.
+
+    Every period carries its change from the period before it, absolute and
+    in percent (None for the first period and after a period without revenue).
+
+    Args:
+        periods (list[tuple[date, date]]): Inclusive (start, end) of each period.
+        category (Optional[str]): Category filter the revenues were computed with.
+        totals (list[float]): Revenue of each period.
+        by_category (Optional[list[tuple[str, list[float]]]]): Revenue of each
+            period per category, when a breakdown was requested.
+
+    Returns:
+        dict: Periods with revenue and deltas, plus the per-category breakdown.
+    """
+    return {
+        "category": category,
+        "periods": _period_changes(periods, totals),
+        "categories": None if by_category is None else [
+            {"category": name, "periods": _period_changes(periods, revenues)}
+            for name, revenues in by_category
+        ],
+    }
+
+def compare_revenue_periods(db: Session, periods: list[tuple[date, date]], category: Optional[str] = None,
+                            by_category: bool = False):
+    """
+    Compare revenue across any number of periods, optionally per category.
+
+    All periods (and categories) are aggregated from ``sales_daily_rollup``
+    in one query with one conditional sum per period.
+
+    Args:
+        db (Session): Database session.
+        periods (list[tuple[date, date]]): Inclusive (start, end) of each period, in report order.
+        category (Optional[str]): Optional category filter.
+        by_category (bool): Also break every period down by category.
+
+    Returns:
+        dict: See :func:`period_comparison`.
+    """
+    if not by_category:
+        return period_comparison(periods, category, _revenue_per_period(db, periods, category)[0])
+
+    rows = _revenue_per_period(db, periods, category, by_category=True)
+    totals = [sum(revenues[i] for _, revenues in rows) for i in range(len(periods))]
+    return period_comparison(periods, category, totals, rows)
+
+# Bucket unit per revenue report period (see app/dialects.py).
+PERIOD_UNITS = {"daily": "day", "weekly": "week", "monthly": "month", "annual": "year"}
+
+def period_start(period: str, day: date) -> date:
+    """
+    First day of the report period containing ``day`` (weeks start on Monday).
+    """
+    if period == "weekly":
+        return day - datetime.timedelta(days=day.weekday())
+    if period == "monthly":
+        return day.replace(day=1)
+    if period == "annual":
+        return day.replace(month=1, day=1)
+    return day
+
+def period_label(period: str, day: date) -> str:
+    """
+    Label of the report period starting on ``day``, e.g. '2025-06' for a month
+    or '2025-23' for an ISO week.
+    """
+    if period == "weekly":
+        iso_year, iso_week, _ = day.isocalendar()
+        return f"{iso_year}-{iso_week:02d}"
+    if period == "monthly":
+        return f"{day:%Y-%m}"
+    if period == "annual":
+        return f"{day:%Y}"
+    return day.isoformat()
+
 def get_revenue_by_period(
     db: Session,
     period: str,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
+    category: Optional[str] = None,
+    product_id: Optional[int] = None,
 ):
     """
     Get revenue report aggregated by a specific time period.
 
+    Aggregates the ``sales_daily_rollup`` table. The date bounds are range
+    predicates on ``day`` and days are grouped on their period's first day, so
+    only the requested range of the primary key (or of the category or
+    product index when filtering) is read. Periods without sales are filled
+    in with zero revenue by a generated series of periods, from the period of
+    ``start_date`` (or of the first sale) to the period of ``end_date`` (or of
+    the last sale). Bucketing and the series come from the session's
+    :func:`app.dialects.report_dialect`.
+
     Args:
         db (Session): Database session.
         period (str): Period to group by ('daily', 'weekly', 'monthly', 'annual').
         start_date (Optional[date]): Start date for filtering.
         end_date (Optional[date]): End date for filtering.
+        category (Optional[str]): Only count sales of this product category.
+        product_id (Optional[int]): Only count sales of this product.
 
     Returns:
-        List[dict]: Revenue data grouped by the specified period.
+        List[dict]: Period label, first day of the period and revenue, for every period in order.
     """
-    query = db.query(models.Sale)
+    unit = PERIOD_UNITS.get(period)
+    if unit is None:
+        return {"error": ("Invalid period. Use daily, weekly, monthly, or annual.")}
 
+    dialect = report_dialect(db)
+    rollup = models.SalesDailyRollup
+    bucket = dialect.period_bucket(rollup.day, unit)
+    totals = select(bucket.label("bucket"), func.sum(rollup.revenue).label("revenue"))
     if start_date:
-        query = query.filter(models.Sale.sale_date >= start_date)
+        totals = totals.where(rollup.day >= start_date)
     if end_date:
-        query = query.filter(models.Sale.sale_date <= end_date)
+        totals = totals.where(rollup.day <= end_date)
+    if category:
+        totals = totals.where(rollup.category == category)
+    if product_id:
+        totals = totals.where(rollup.product_id == product_id)
+    totals = totals.group_by(bucket).cte("totals")
 
-    if period == "daily":
-        group_format = 'YYYY-MM-DD'
-    elif period == "weekly":
-        group_format = 'IYYY-IW'  # ISO week number
-    elif period == "monthly":
-        group_format = 'YYYY-MM'
-    elif period == "annual":
-        group_format = 'YYYY'
-    else:
-        return {"error": ("Invalid period. Use daily, weekly, monthly, or annual.")}
+    # Without an explicit bound the series stops at the first or last period with sales.
+    first = period_start(period, start_date) if start_date else select(func.min(totals.c.bucket)).scalar_subquery()
+    last = period_start(period, end_date) if end_date else select(func.max(totals.c.bucket)).scalar_subquery()
+    series = dialect.period_series(first, last, unit)
+
+    results = db.execute(
+        select(series.c.bucket.label("period_start"), func.coalesce(totals.c.revenue, 0).label("total_revenue"))
+        .select_from(series.outerjoin(totals, totals.c.bucket == series.c.bucket))
+        .order_by(series.c.bucket)
+    ).all()
+
+    return [
+        {"period": period_label(period, row.period_start), "period_start": row.period_start,
+         "total_revenue": float(row.total_revenue)}
+        for row in results
+    ]
+
+def get_revenue_by_category(
+    db: Session,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+):
+    """
+    Get revenue and units sold per product category, highest revenue first.
+
+    Args:
+        db (Session): Database session.
+        start_date (Optional[date]): First day to include.
+        end_date (Optional[date]): Last day to include.
+
+    Returns:
+        List[dict]: Category, total revenue and total quantity.
+    """
+    rollup = models.SalesDailyRollup
+    revenue = func.sum(rollup.revenue)
+    query = db.query(
+        rollup.category,
+        revenue.label("total_revenue"),
+        func.sum(rollup.quantity).label("total_quantity")
+    )
+    if start_date:
+        query = query.filter(rollup.day >= start_date)
+    if end_date:
+        query = query.filter(rollup.day <= end_date)
+
+    results = query.group_by(rollup.category).order_by(revenue.desc()).all()
 
-    group_by = func.to_char(models.Sale.sale_date, group_format)
+    return [
+        {"category": row.category, "total_revenue": float(row.total_revenue), "total_quantity": int(row.total_quantity)}
+        for row in results
+    ]
 
-    results = db.query(
-        group_by.label("period"),
-        func.sum(models.Sale.total_price).label("total_revenue")
-    ).group_by(group_by).order_by(group_by).all()
+def get_top_sales(
+    db: Session,
+    by: str = "product",
+    metric: str = "revenue",
+    limit: int = 20,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    category: Optional[str] = None,
+):
+    """
+    Rank products or categories by revenue or units sold.
 
-    return [{"period": row.period, "total_revenue": float(row.total_revenue)} for row in results]
+    Aggregates the ``sales_daily_rollup`` table; the database keeps only the
+    best ``limit`` groups while sorting (top-N heapsort), and product names
+    are looked up for those rows only.
+
+    Args:
+        db (Session): Database session.
+        by (str): Either 'product' or 'category'.
+        metric (str): Either 'revenue' or 'quantity'.
+        limit (int): Number of entries to return.
+        start_date (Optional[date]): First day to include.
+        end_date (Optional[date]): Last day to include.
+        category (Optional[str]): Only rank sales of this category.
+
+    Returns:
+        List[dict]: Ranked entries with total revenue and total quantity.
+    """
+    rollup = models.SalesDailyRollup
+    key = rollup.product_id if by == "product" else rollup.category
+    revenue = func.sum(rollup.revenue)
+    quantity = func.sum(rollup.quantity)
+
+    query = db.query(key.label("key"), revenue.label("total_revenue"), quantity.label("total_quantity"))
+    if start_date:
+        query = query.filter(rollup.day >= start_date)
+    if end_date:
+        query = query.filter(rollup.day <= end_date)
+    if category is not None:
+        query = query.filter(rollup.category == category)
+
+    ranked = revenue if metric == "revenue" else quantity
+    results = query.group_by(key).order_by(ranked.desc(), key).limit(limit).all()
+
+    if by == "category":
+        return [
+            {"category": row.key, "total_revenue": float(row.total_revenue), "total_quantity": int(row.total_quantity)}
+            for row in results
+        ]
+
+    products = {
+        product.id: product
+        for product in db.query(models.Product).filter(models.Product.id.in_([row.key for row in results]))
+    }
+    return [
+        {
+            "product_id": row.key,
+            "name": products[row.key].name if row.key in products else None,
+            "category": products[row.key].category if row.key in products else None,
+            "total_revenue": float(row.total_revenue),
+            "total_quantity": int(row.total_quantity),
+        }
+        for row in results
+    ]
 
 def get_product(db: Session, product_id: int):
     """
@@ -192,15 +612,782 @@ def update_inventory(db: Session, product: models.Product, new_stock: int):
 
     return product
 
-def get_inventory_changes(db: Session, product_id: int):
+def adjust_inventory(db: Session, product_id: int, delta: int, allow_negative: bool = True):
+    """
+    Add a signed delta to the stock of a product and log the change.
+
+    Unlike :func:`update_inventory`, the new stock is computed by the database
+    in a single ``UPDATE ... RETURNING`` whose row lock serializes concurrent
+    adjustments, so none is lost and no read round trip is needed. The
+    ``inventory_changes`` row is inserted by a data-modifying CTE of the same
+    statement. A missing stock value counts as zero.
+
+    Args:
+        db (Session): Database session.
+        product_id (int): ID of the product to adjust.
+        delta (int): Amount to add to the stock; negative to remove stock.
+        allow_negative (bool): If False, refuse adjustments that would leave the stock below zero.
+
+    Returns:
+        Optional[dict]: Product ID, previous and new stock, or None if the product does not exist.
+
+    Raises:
+        InsufficientStockError: If ``allow_negative`` is False and the stock is lower than ``-delta``.
+    """
+    row = db.execute(text("""
+        WITH updated AS (
+            UPDATE products
+            SET stock = COALESCE(stock, 0) + :delta
+            WHERE id = :product_id
+              AND (CAST(:allow_negative AS boolean) OR COALESCE(stock, 0) + :delta >= 0)
+            RETURNING id, stock - :delta AS previous_stock, stock AS new_stock
+        ),
+        changes AS (
+            INSERT INTO inventory_changes (product_id, previous_stock, new_stock, change_amount, timestamp)
+            SELECT id, previous_stock, new_stock, :delta, :now FROM updated
+        )
+        SELECT id, previous_stock, new_stock FROM updated
+    """), {
+        "product_id": product_id,
+        "delta": delta,
+        "allow_negative": allow_negative,
+        "now": datetime.datetime.utcnow(),
+    }).first()
+    db.commit()
+
+    if row is None:
+        if allow_negative:
+            return None
+        # Nothing was updated: tell a missing product from a refused adjustment.
+        stock = db.execute(
+            select(models.Product.stock).where(models.Product.id == product_id)
+        ).first()
+        if stock is None:
+            return None
+        raise InsufficientStockError(product_id, stock[0] or 0, delta)
+    return {"product_id": row.id, "previous_stock": row.previous_stock, "new_stock": row.new_stock}
+
+def update_inventory_batch(db: Session, updates: list[schemas.StockUpdateItem]):
+    """
+    Set the stock of many products in one statement and log every change.
+
+    A single statement locks the products in id order, applies the new
+    values from the unnested id/stock arrays, captures the previous stock in
+    RETURNING and inserts the matching ``inventory_changes`` rows through a
+    data-modifying CTE. If a product ID appears more than once, the last
+    value wins.
+
+    Args:
+        db (Session): Database session.
+        updates (list[schemas.StockUpdateItem]): Product IDs and their new stock.
+
+    Returns:
+        List[dict]: One result per input item, in input order, with status
+        'updated' (plus previous and new stock) or 'not_found'.
+    """
+    new_stock_by_id = {item.product_id: item.new_stock for item in updates}
+    rows = db.execute(text("""
+        WITH v AS (
+            SELECT * FROM unnest(CAST(:ids AS integer[]), CAST(:stocks AS integer[])) AS v(id, new_stock)
+        ),
+        old AS (
+            SELECT p.id, p.stock
+            FROM products p
+            JOIN v ON v.id = p.id
+            ORDER BY p.id
+            FOR UPDATE OF p
+        ),
+        updated AS (
+            UPDATE products p
+            SET stock = v.new_stock
+            FROM v
+            JOIN old ON old.id = v.id
+            WHERE p.id = v.id
+            RETURNING p.id, old.stock AS previous_stock, p.stock AS new_stock
+        ),
+        changes AS (
+            INSERT INTO inventory_changes (product_id, previous_stock, new_stock, change_amount, timestamp)
+            SELECT id, previous_stock, new_stock, new_stock - previous_stock, :now FROM updated
+        )
+        SELECT id, previous_stock, new_stock FROM updated
+    """), {
+        "ids": list(new_stock_by_id),
+        "stocks": list(new_stock_by_id.values()),
+        "now": datetime.datetime.utcnow(),
+    }).all()
+    db.commit()
+
+    applied = {row.id: row for row in rows}
+    results = []
+    for item in updates:
+        row = applied.get(item.product_id)
+        if row is None:
+            results.append({"product_id": item.product_id, "status": "not_found"})
+        else:
+            results.append({
+                "product_id": item.product_id,
+                "status": "updated",
+                "previous_stock": row.previous_stock,
+                "new_stock": row.new_stock,
+            })
+    return results
+
+def get_inventory_changes(db: Session, product_id: int, limit: int = 100,
+                          since: Optional[datetime.datetime] = None,
+                          until: Optional[datetime.datetime] = None,
+                          cursor: Optional[str] = None):
     """
-    Retrieve inventory change history for a specific product.
+    Retrieve a page of a product's inventory change history, newest first.
+
+    Ordered by (timestamp, id) descending and paginated by keyset, so every
+    page is a range scan of ``ix_inventory_changes_product_timestamp``.
 
     Args:
         db (Session): Database session.
         product_id (int): ID of the product.
+        limit (int): Maximum records to return.
+        since (Optional[datetime.datetime]): Only changes at or after this time.
+        until (Optional[datetime.datetime]): Only changes before this time.
+        cursor (Optional[str]): Cursor returned with the previous page.
+
+    Returns:
+        dict: ``items`` with the inventory change records and ``next_cursor``,
+        which is None on the last page.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    change = models.InventoryChange
+    query = db.query(change).filter(change.product_id == product_id)
+    if since:
+        query = query.filter(change.timestamp >= since)
+    if until:
+        query = query.filter(change.timestamp < until)
+    if cursor:
+        timestamp, change_id = decode_cursor(cursor)
+        query = query.filter(tuple_(change.timestamp, change.id) < tuple_(timestamp, change_id))
+
+    changes = query.order_by(change.timestamp.desc(), change.id.desc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(changes) > limit:
+        changes = changes[:limit]
+        next_cursor = encode_cursor(changes[-1].timestamp, changes[-1].id)
+
+    return {"items": changes, "next_cursor": next_cursor}
+
+def get_inventory_net_changes(db: Session, product_id: int, bucket: str = "day", limit: int = 100,
+                              since: Optional[datetime.datetime] = None,
+                              until: Optional[datetime.datetime] = None):
+    """
+    Summarize a product's inventory history as net stock change per hour or day, newest first.
+
+    Args:
+        db (Session): Database session.
+        product_id (int): ID of the product.
+        bucket (str): Either 'hour' or 'day'.
+        limit (int): Maximum buckets to return.
+        since (Optional[datetime.datetime]): Only changes at or after this time.
+        until (Optional[datetime.datetime]): Only changes before this time.
+
+    Returns:
+        List[dict]: Bucket start, net change and number of changes, for buckets with changes.
+    """
+    change = models.InventoryChange
+    period_start = func.date_trunc(bucket, change.timestamp)
+    query = db.query(
+        period_start.label("period_start"),
+        func.sum(change.change_amount).label("net_change"),
+        func.count().label("changes"),
+    ).filter(change.product_id == product_id)
+    if since:
+        query = query.filter(change.timestamp >= since)
+    if until:
+        query = query.filter(change.timestamp < until)
+
+    results = query.group_by(period_start).order_by(period_start.desc()).limit(limit).all()
+    return [
+        {"period_start": row.period_start, "net_change": int(row.net_change or 0), "changes": row.changes}
+        for row in results
+    ]
+
+def create_inventory_snapshot(db: Session, taken_at: datetime.datetime):
+    """
+    Record the stock of every product as of ``taken_at``.
+
+    The stock is the current stock minus the changes logged after
+    ``taken_at``, read in one statement so both sides are consistent. Take
+    checkpoints a little in the past so no transaction still in flight can
+    log a change at or before them.
+
+    Args:
+        db (Session): Database session.
+        taken_at (datetime.datetime): Checkpoint time (naive UTC, like change timestamps).
+
+    Returns:
+        int: Number of products recorded; 0 if a checkpoint already exists at ``taken_at``.
+    """
+    result = db.execute(text("""
+        INSERT INTO inventory_snapshots (taken_at, product_id, stock)
+        SELECT :taken_at, p.id, COALESCE(p.stock, 0) - COALESCE(later.delta, 0)
+        FROM products p
+        LEFT JOIN (
+            SELECT product_id, sum(change_amount) AS delta
+            FROM inventory_changes
+            WHERE timestamp > :taken_at
+            GROUP BY product_id
+        ) later ON later.product_id = p.id
+        ON CONFLICT (taken_at, product_id) DO NOTHING
+    """).bindparams(bindparam("taken_at", type_=DateTime)), {"taken_at": taken_at})
+    db.commit()
+    return result.rowcount
+
+def prune_inventory_snapshots(db: Session, before: datetime.datetime):
+    """
+    Delete the checkpoints taken before ``before``, keeping the latest of them
+    so that stock at any later time still starts from a checkpoint.
+
+    Args:
+        db (Session): Database session.
+        before (datetime.datetime): Checkpoints older than this are removed.
 
     Returns:
-        List[models.InventoryChange]: List of inventory change records.
+        int: Number of snapshot rows deleted.
+    """
+    result = db.execute(text("""
+        DELETE FROM inventory_snapshots
+        WHERE taken_at < (
+            SELECT max(taken_at) FROM inventory_snapshots WHERE taken_at < :before
+        )
+    """).bindparams(bindparam("before", type_=DateTime)), {"before": before})
+    db.commit()
+    return result.rowcount
+
+def get_stock_as_of(db: Session, as_of: datetime.datetime, limit: int = 1000, cursor: Optional[str] = None):
+    """
+    Reconstruct the stock of every product at a point in time, by product ID.
+
+    Starts from the checkpoint in ``inventory_snapshots`` nearest to
+    ``as_of`` and applies only the changes between the two, forwards or
+    backwards, so the cost is bounded by the checkpoint interval rather than
+    the length of the history. Products missing from that checkpoint (or all
+    of them, before the first checkpoint is taken) are reconstructed from
+    their current stock and the changes after ``as_of``. Products created
+    after ``as_of`` have 0 stock, their initial stock being logged as a
+    change by :func:`create_product`.
+
+    Args:
+        db (Session): Database session.
+        as_of (datetime.datetime): Point in time (naive UTC, like change timestamps).
+        limit (int): Maximum products to return.
+        cursor (Optional[str]): Cursor returned with the previous page.
+
+    Returns:
+        dict: ``items`` with product ID, name and stock, ``snapshot_taken_at``
+        (the checkpoint used, or None) and ``next_cursor``, which is None on
+        the last page.
+
+    Raises:
+        ValueError: If the cursor is malformed.
     """
-    return db.query(models.InventoryChange).filter(models.InventoryChange.product_id == product_id).order_by(models.InventoryChange.timestamp.desc()).all()
+    after_id = int(cursor) if cursor else 0
+    snapshot = models.InventorySnapshot
+    before = db.execute(
+        select(func.max(snapshot.taken_at)).where(snapshot.taken_at <= as_of)
+    ).scalar()
+    after = db.execute(
+        select(func.min(snapshot.taken_at)).where(snapshot.taken_at > as_of)
+    ).scalar()
+    candidates = [taken_at for taken_at in (before, after) if taken_at is not None]
+    taken_at = min(candidates, key=lambda taken_at: abs(taken_at - as_of)) if candidates else None
+
+    # Changes in (lo, hi] are added when replaying forwards from the
+    # checkpoint and subtracted when replaying backwards.
+    if taken_at is None:
+        lo = hi = as_of
+        sign = 1
+    elif taken_at <= as_of:
+        lo, hi, sign = taken_at, as_of, 1
+    else:
+        lo, hi, sign = as_of, taken_at, -1
+
+    rows = db.execute(text("""
+        WITH deltas AS (
+            SELECT product_id, sum(change_amount) AS delta
+            FROM inventory_changes
+            WHERE timestamp > :lo AND timestamp <= :hi
+            GROUP BY product_id
+        )
+        SELECT p.id AS product_id, p.name,
+               CASE
+                   WHEN s.product_id IS NOT NULL THEN s.stock + :sign * COALESCE(d.delta, 0)
+                   ELSE COALESCE(p.stock, 0) - (
+                       SELECT COALESCE(sum(c.change_amount), 0)
+                       FROM inventory_changes c
+                       WHERE c.product_id = p.id AND c.timestamp > :as_of
+                   )
+               END AS stock
+        FROM products p
+        LEFT JOIN inventory_snapshots s ON s.taken_at = :taken_at AND s.product_id = p.id
+        LEFT JOIN deltas d ON d.product_id = p.id
+        WHERE p.id > :after_id
+        ORDER BY p.id
+        LIMIT :limit
+    """).bindparams(*(bindparam(name, type_=DateTime) for name in ("lo", "hi", "as_of", "taken_at"))), {
+        "lo": lo, "hi": hi, "sign": sign, "as_of": as_of, "taken_at": taken_at,
+        "after_id": after_id, "limit": limit + 1,
+    }).all()
+
+    items = [{"product_id": row.product_id, "name": row.name, "stock": int(row.stock)} for row in rows[:limit]]
+    next_cursor = str(items[-1]["product_id"]) if len(rows) > limit else None
+    return {"items": items, "snapshot_taken_at": taken_at, "next_cursor": next_cursor}
+
+def get_watermark(db: Session, table_name: str) -> int:
+    """
+    Current change counter of a table, bumped by every statement writing to it.
+
+    The sum of the table's counter shards: it grows whenever a write commits,
+    whichever shard the writer bumped. Read it before the data it describes:
+    a response is then never newer than the version it is tagged with.
+
+    Args:
+        db (Session): Database session, the one the data will be read from.
+        table_name (str): 'products', 'sales' or 'inventory_changes'.
+
+    Returns:
+        int: The table's version; 0 if the table is not watermarked.
+    """
+    watermarks = models.TableWatermark
+    version = db.execute(select(func.sum(watermarks.version)).where(watermarks.table_name == table_name)).scalar()
+    return int(version or 0)
+
+def check_sales_rollup(db: Session, start_date: Optional[date] = None, end_date: Optional[date] = None):
+    """
+    Compare ``sales_daily_rollup`` against a fresh aggregation of ``sales``.
+
+    Args:
+        db (Session): Database session.
+        start_date (Optional[date]): First day to check.
+        end_date (Optional[date]): Last day to check.
+
+    Returns:
+        List[dict]: One entry per (day, product_id, category) key whose rollup
+        revenue, quantity or sale count differs from ``sales``, including keys
+        missing on either side. An empty list means the rollup is consistent.
+    """
+    sale_day = cast(models.Sale.sale_date, Date)
+    sale_category = func.coalesce(models.Product.category, "")
+    expected = (
+        select(
+            sale_day.label("day"),
+            models.Sale.product_id.label("product_id"),
+            sale_category.label("category"),
+            func.coalesce(func.sum(models.Sale.total_price), 0).label("revenue"),
+            func.coalesce(func.sum(models.Sale.quantity), 0).label("quantity"),
+            func.count().label("sales_count"),
+        )
+        .join(models.Product, models.Product.id == models.Sale.product_id)
+        .where(models.Sale.sale_date.is_not(None))
+        .group_by(sale_day, models.Sale.product_id, sale_category)
+    )
+    rollup = select(models.SalesDailyRollup)
+    if start_date:
+        expected = expected.where(models.Sale.sale_date >= start_date)
+        rollup = rollup.where(models.SalesDailyRollup.day >= start_date)
+    if end_date:
+        expected = expected.where(models.Sale.sale_date < end_date + datetime.timedelta(days=1))
+        rollup = rollup.where(models.SalesDailyRollup.day <= end_date)
+    expected = expected.subquery("expected")
+    rollup = rollup.subquery("rollup")
+
+    on = (
+        (expected.c.day == rollup.c.day)
+        & (expected.c.product_id == rollup.c.product_id)
+        & (expected.c.category == rollup.c.category)
+    )
+    mismatch = (
+        rollup.c.day.is_(None)
+        | expected.c.day.is_(None)
+        | (expected.c.quantity != rollup.c.quantity)
+        | (expected.c.sales_count != rollup.c.sales_count)
+        | (func.abs(expected.c.revenue - rollup.c.revenue) > 0.005)
+    )
+    results = db.execute(
+        select(
+            func.coalesce(expected.c.day, rollup.c.day).label("day"),
+            func.coalesce(expected.c.product_id, rollup.c.product_id).label("product_id"),
+            func.coalesce(expected.c.category, rollup.c.category).label("category"),
+            expected.c.revenue.label("expected_revenue"),
+            rollup.c.revenue.label("rollup_revenue"),
+            expected.c.quantity.label("expected_quantity"),
+            rollup.c.quantity.label("rollup_quantity"),
+            expected.c.sales_count.label("expected_sales_count"),
+            rollup.c.sales_count.label("rollup_sales_count"),
+        )
+        .select_from(expected.join(rollup, on, full=True))
+        .where(mismatch)
+        .order_by("day", "product_id", "category")
+    ).all()
+
+    return [dict(row._mapping) for row in results]
+
+def rebuild_sales_rollup(db: Session, days: list[date]):
+    """
+    Recompute the rollup rows of the given days from ``sales``.
+
+    Args:
+        db (Session): Database session.
+        days (list[date]): Days to rebuild, typically taken from
+            :func:`check_sales_rollup`.
+
+    Returns:
+        int: Number of rollup rows written.
+    """
+    if not days:
+        return 0
+
+    sale_day = cast(models.Sale.sale_date, Date)
+    sale_category = func.coalesce(models.Product.category, "")
+    # Hold off concurrent sale writes so their trigger updates cannot
+    # interleave with the delete-and-reinsert below.
+    db.execute(text("LOCK TABLE sales IN SHARE MODE"))
+    db.query(models.SalesDailyRollup).filter(models.SalesDailyRollup.day.in_(days)).delete(synchronize_session=False)
+    fresh = (
+        select(
+            sale_day,
+            models.Sale.product_id,
+            sale_category,
+            func.coalesce(func.sum(models.Sale.total_price), 0),
+            func.coalesce(func.sum(models.Sale.quantity), 0),
+            func.count(),
+        )
+        .join(models.Product, models.Product.id == models.Sale.product_id)
+        .where(sale_day.in_(days))
+        .group_by(sale_day, models.Sale.product_id, sale_category)
+    )
+    result = db.execute(
+        models.SalesDailyRollup.__table__.insert().from_select(
+            ["day", "product_id", "category", "revenue", "quantity", "sales_count"], fresh
+        )
+    )
+    db.commit()
+    return result.rowcount
+
+def create_sales_partitions(db: Session, months_ahead: int = 3, since: Optional[date] = None):
+    """
+    Make sure monthly ``sales`` partitions exist from this month (or the
+    month of ``since``) through ``months_ahead`` months from now.
+
+    Args:
+        db (Session): Database session.
+        months_ahead (int): How many future months to pre-create.
+        since (Optional[date]): First month to create, e.g. before loading history.
+
+    Returns:
+        List[str]: Names of the partitions covering the requested months.
+    """
+    names = db.execute(text("""
+        SELECT create_sales_partition(month::date)
+        FROM generate_series(
+            date_trunc('month', COALESCE(CAST(:since AS date), now())),
+            date_trunc('month', now()) + make_interval(months => :months_ahead),
+            interval '1 month'
+        ) AS month
+    """), {"months_ahead": months_ahead, "since": since}).scalars().all()
+    db.commit()
+    return names
+
+def sale_staging_records(sales: list[schemas.SaleCreate], now: datetime.datetime):
+    """
+    Convert incoming sales to tuples in ``SALE_STAGING_COLUMNS`` order.
+
+    Timezone-aware sale dates are converted to naive UTC, matching the
+    ``timestamp without time zone`` column; missing ones are set to ``now``.
+
+    Args:
+        sales (list[schemas.SaleCreate]): Sales to ingest.
+        now (datetime.datetime): Naive UTC timestamp for sales without a date.
+
+    Returns:
+        list[tuple]: Rows ready for COPY into ``sales_staging``.
+    """
+    records = []
+    for sale in sales:
+        sale_date = sale.sale_date or now
+        if sale_date.tzinfo is not None:
+            sale_date = sale_date.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+        records.append((sale.product_id, sale.quantity, sale.total_price, sale_date))
+    return records
+
+def ingest_staged_sales(db: Session):
+    """
+    Move the rows of ``sales_staging`` into ``sales`` and book the stock they consume.
+
+    Everything is set-based: one INSERT ... SELECT for the sales, then one
+    UPDATE ... FROM that decrements ``products.stock`` per product and feeds
+    the ``inventory_changes`` and ``inventory_logs`` rows (one per product)
+    through data-modifying CTEs. The caller owns the transaction.
+
+    Args:
+        db (Session): Database session with ``sales_staging`` populated.
+
+    Returns:
+        dict: Number of sales inserted and of products whose stock changed.
+
+    Raises:
+        UnknownProductsError: If staged sales reference missing products.
+    """
+    missing = db.execute(text("""
+        SELECT DISTINCT s.product_id
+        FROM sales_staging s
+        LEFT JOIN products p ON p.id = s.product_id
+        WHERE p.id IS NULL
+        ORDER BY 1
+    """)).scalars().all()
+    if missing:
+        raise UnknownProductsError(missing)
+
+    now = datetime.datetime.utcnow()
+    # Lock the affected products in id order so concurrent batches sharing
+    # products queue up instead of deadlocking in the UPDATE below.
+    db.execute(text("""
+        SELECT id FROM products
+        WHERE id IN (SELECT product_id FROM sales_staging)
+        ORDER BY id
+        FOR UPDATE
+    """))
+    inserted = db.execute(text("""
+        INSERT INTO sales (product_id, quantity, total_price, sale_date)
+        SELECT product_id, quantity, total_price, COALESCE(sale_date, :now)
+        FROM sales_staging
+    """), {"now": now}).rowcount
+    products_updated = db.execute(text("""
+        WITH sold AS (
+            SELECT product_id, SUM(quantity) AS quantity
+            FROM sales_staging
+            GROUP BY product_id
+        ),
+        updated AS (
+            UPDATE products p
+            SET stock = p.stock - sold.quantity
+            FROM sold
+            WHERE p.id = sold.product_id
+            RETURNING p.id, p.stock + sold.quantity AS previous_stock, p.stock AS new_stock, sold.quantity
+        ),
+        logged AS (
+            INSERT INTO inventory_logs (product_id, change, reason, timestamp)
+            SELECT id, -quantity, 'Sold', :now FROM updated
+        )
+        INSERT INTO inventory_changes (product_id, previous_stock, new_stock, change_amount, timestamp)
+        SELECT id, previous_stock, new_stock, -quantity, :now FROM updated
+    """), {"now": now}).rowcount
+
+    return {"inserted": inserted, "products_updated": products_updated}
+
+def report_params_hash(kind: str, params: dict) -> str:
+    """
+    Identify a report request: equal for the same kind and parameters, whatever their order.
+    """
+    payload = json.dumps([kind, params], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def _report_job(row) -> dict:
+    job = dict(row._mapping)
+    started, finished = job["started_at"], job["finished_at"]
+    job["duration_ms"] = round((finished - started).total_seconds() * 1000, 3) if started and finished else None
+    return job
+
+def _stale_report_jobs(stale_before: datetime.datetime):
+    """
+    Condition matching the jobs queued or started before ``stale_before``.
+    """
+    jobs = models.ReportJob
+    return or_(
+        and_(jobs.status == "queued", jobs.created_at < stale_before),
+        and_(jobs.status == "running", jobs.started_at < stale_before),
+    )
+
+def create_report_job(db: Session, kind: str, params: dict, reuse_seconds: float = 0, stale_seconds: float = 0):
+    """
+    Queue a background report, or return the job already answering an identical request.
+
+    A queued or running job with the same kind and parameters is shared, and
+    so is one that succeeded less than ``reuse_seconds`` ago. Jobs queued or
+    started more than ``stale_seconds`` ago are not shared: the worker
+    running them may have died without recording an outcome. The lookup and
+    the insert hold a transaction-level advisory lock on the parameters, so
+    identical requests arriving together on any worker create a single job.
+
+    Args:
+        db (Session): Database session.
+        kind (str): Report kind: 'revenue', 'compare' or 'top'.
+        params (dict): JSON-serializable report parameters.
+        reuse_seconds (float): Age up to which a succeeded result is reused; 0 reuses only jobs in flight.
+        stale_seconds (float): Age after which a queued or running job is taken as abandoned; 0 never.
+
+    Returns:
+        tuple[dict, bool]: The job, and whether it was created and must be run.
+    """
+    jobs = models.ReportJob
+    params_hash = report_params_hash(kind, params)
+    now = datetime.datetime.utcnow()
+    db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:params_hash))"), {"params_hash": params_hash})
+
+    in_flight = jobs.status.in_(("queued", "running"))
+    if stale_seconds:
+        in_flight = and_(in_flight, not_(_stale_report_jobs(now - datetime.timedelta(seconds=stale_seconds))))
+    shared = [in_flight]
+    if reuse_seconds:
+        shared.append(and_(jobs.status == "succeeded",
+                           jobs.finished_at >= now - datetime.timedelta(seconds=reuse_seconds)))
+    row = db.execute(
+        select(*_columns(jobs, REPORT_JOB_COLUMNS))
+        .where(jobs.params_hash == params_hash, or_(*shared))
+        .order_by(jobs.created_at.desc())
+        .limit(1)
+    ).first()
+    created = row is None
+    if created:
+        row = db.execute(
+            insert(jobs)
+            .values(kind=kind, params=params, params_hash=params_hash, status="queued", created_at=now)
+            .returning(*_columns(jobs, REPORT_JOB_COLUMNS))
+        ).first()
+    db.commit()
+    return _report_job(row), created
+
+def fail_stale_report_jobs(db: Session, stale_seconds: float):
+    """
+    Mark as failed the jobs queued or started more than ``stale_seconds`` ago.
+
+    Such jobs were left behind by a worker that stopped without recording
+    their outcome (killed or crashed); a job still running that late would
+    have its outcome dropped, like a cancelled one.
+
+    Args:
+        db (Session): Database session.
+        stale_seconds (float): Age after which a queued or running job is taken as abandoned.
+
+    Returns:
+        int: Number of jobs marked failed.
+    """
+    jobs = models.ReportJob
+    now = datetime.datetime.utcnow()
+    updated = db.execute(
+        update(jobs)
+        .where(_stale_report_jobs(now - datetime.timedelta(seconds=stale_seconds)))
+        .values(status="failed", error=REPORT_JOB_ABANDONED, finished_at=now, backend_pid=None, backend_start=None)
+    ).rowcount
+    db.commit()
+    return updated
+
+def get_report_job(db: Session, job_id: int):
+    """
+    Get the status, timing and result of a background report.
+
+    Args:
+        db (Session): Database session.
+        job_id (int): Job ID.
+
+    Returns:
+        Optional[dict]: The job, or None if it does not exist.
+    """
+    jobs = models.ReportJob
+    row = db.execute(select(*_columns(jobs, REPORT_JOB_COLUMNS)).where(jobs.id == job_id)).first()
+    return _report_job(row) if row is not None else None
+
+def start_report_job(db: Session, job_id: int):
+    """
+    Claim a queued job for the calling connection.
+
+    The job becomes 'running' and records the connection's backend PID and
+    start time, which :func:`cancel_report_job` signals; the caller must run
+    the report on the same connection.
+
+    Args:
+        db (Session): Database session bound to the connection running the report.
+        job_id (int): Job ID.
+
+    Returns:
+        Optional[dict]: The job's kind and params, or None if it is no longer queued (e.g. cancelled).
+    """
+    jobs = models.ReportJob
+    row = db.execute(
+        update(jobs)
+        .where(jobs.id == job_id, jobs.status == "queued")
+        .values(
+            status="running",
+            started_at=datetime.datetime.utcnow(),
+            backend_pid=func.pg_backend_pid(),
+            backend_start=text(BACKEND_START_SQL),
+        )
+        .returning(jobs.kind, jobs.params)
+    ).first()
+    db.commit()
+    return dict(row._mapping) if row is not None else None
+
+def finish_report_job(db: Session, job_id: int, result=None, error: Optional[str] = None):
+    """
+    Record the outcome of a running job: its result, or the error that stopped it.
+
+    Args:
+        db (Session): Database session.
+        job_id (int): Job ID.
+        result: JSON-serializable report, when it succeeded.
+        error (Optional[str]): Why it failed; marks the job 'failed'.
+
+    Returns:
+        bool: False if the job was no longer running (it was cancelled), so the outcome was dropped.
+    """
+    jobs = models.ReportJob
+    values = {"finished_at": datetime.datetime.utcnow(), "backend_pid": None, "backend_start": None}
+    if error is None:
+        values.update(status="succeeded", result=result)
+    else:
+        values.update(status="failed", error=error)
+    updated = db.execute(update(jobs).where(jobs.id == job_id, jobs.status == "running").values(**values)).rowcount
+    db.commit()
+    return updated == 1
+
+def cancel_report_job(db: Session, job_id: int, reason: str = "Cancelled"):
+    """
+    Cancel a queued or running job.
+
+    A queued job is simply never started. For a running job, the backend
+    running its query is sent ``pg_cancel_backend`` in the same statement that
+    marks the job cancelled: that backend cannot move on to other work before
+    it records the outcome, which waits on this statement's row lock.
+
+    The backend is only signalled while ``pg_stat_activity`` still lists its
+    PID with the recorded start time. Otherwise the worker died without
+    recording an outcome and the PID may now belong to an unrelated session,
+    so the job is marked failed as abandoned and nothing is signalled.
+
+    Args:
+        db (Session): Database session.
+        job_id (int): Job ID.
+        reason (str): Stored as the job's error.
+
+    Returns:
+        Optional[dict]: The job after the call, or None if it does not exist. A
+        job that had already finished is returned unchanged.
+    """
+    db.execute(text("""
+        UPDATE report_jobs j
+        SET status = CASE WHEN old.abandoned THEN 'failed' ELSE 'cancelled' END,
+            error = CASE WHEN old.abandoned THEN :abandoned ELSE :reason END,
+            finished_at = :now, backend_pid = NULL, backend_start = NULL
+        FROM (
+            SELECT r.id, r.status, a.pid,
+                   r.status = 'running' AND a.pid IS NULL AS abandoned
+            FROM report_jobs r
+            LEFT JOIN pg_stat_activity a ON a.pid = r.backend_pid AND a.backend_start = r.backend_start
+            WHERE r.id = :job_id
+            FOR UPDATE OF r
+        ) old
+        WHERE j.id = old.id AND old.status IN ('queued', 'running')
+        RETURNING CASE WHEN old.status = 'running' AND old.pid IS NOT NULL THEN pg_cancel_backend(old.pid) END
+    """).bindparams(bindparam("now", type_=DateTime)),
+        {"job_id": job_id, "reason": reason, "abandoned": REPORT_JOB_ABANDONED, "now": datetime.datetime.utcnow()})
+    db.commit()
+    return get_report_job(db, job_id)
+
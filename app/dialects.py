@@ -0,0 +1,95 @@
+import datetime
+from sqlalchemy import Date, DateTime, cast, func, literal, literal_column, select
+from sqlalchemy.orm import Session
+
+def _date(value):
+    """
+    A date parameter as a typed SQL literal; SQL expressions pass through.
+    """
+    return literal(value, Date) if isinstance(value, datetime.date) else value
+
+class PostgresReports:
+    """
+    Report SQL for PostgreSQL: ``date_trunc`` buckets, ``generate_series`` gap-filling.
+    """
+
+    def day(self, timestamp):
+        """
+        Calendar day of a timestamp expression.
+        """
+        return cast(timestamp, Date)
+
+    def period_bucket(self, day, unit: str):
+        """
+        First day of the ``unit`` ('day', 'week', 'month' or 'year') containing
+        ``day``; weeks start on Monday.
+        """
+        if unit == "day":
+            return day
+        return cast(func.date_trunc(unit, cast(day, DateTime)), Date)
+
+    def period_series(self, first, last, unit: str):
+        """
+        Every period start from ``first`` to ``last`` (dates or date
+        expressions), as a subquery with one ``bucket`` column; no rows when
+        either is NULL or ``first`` is after ``last``.
+        """
+        series = func.generate_series(
+            cast(_date(first), DateTime), cast(_date(last), DateTime), literal_column(f"interval '1 {unit}'")
+        ).table_valued("bucket").render_derived()
+        return select(cast(series.c.bucket, Date).label("bucket")).select_from(series).subquery("series")
+
+class SQLiteReports:
+    """
+    Report SQL for SQLite: ``date()`` modifiers for buckets, a recursive CTE for gap-filling.
+    """
+
+    BUCKET_MODIFIERS = {
+        "week": ("weekday 0", "-6 days"),  # the following Sunday (or the day itself), back to its Monday
+        "month": ("start of month",),
+        "year": ("start of year",),
+    }
+    STEPS = {"day": "+1 day", "week": "+7 days", "month": "+1 month", "year": "+1 year"}
+
+    def day(self, timestamp):
+        """
+        See :meth:`PostgresReports.day`.
+        """
+        return func.date(timestamp, type_=Date)
+
+    def period_bucket(self, day, unit: str):
+        """
+        See :meth:`PostgresReports.period_bucket`.
+        """
+        if unit == "day":
+            return day
+        return func.date(day, *self.BUCKET_MODIFIERS[unit], type_=Date)
+
+    def period_series(self, first, last, unit: str):
+        """
+        See :meth:`PostgresReports.period_series`.
+        """
+        first = _date(first)
+        series = select(first.label("bucket")).where(first <= _date(last)).cte("series", recursive=True)
+        return series.union_all(
+            select(func.date(series.c.bucket, self.STEPS[unit], type_=Date))
+            .where(series.c.bucket < _date(last))
+        )
+
+REPORT_DIALECTS = {
+    "postgresql": PostgresReports(),
+    "sqlite": SQLiteReports(),
+}
+
+def report_dialect(db: Session):
+    """
+    Report SQL builder for the database ``db`` is bound to.
+
+    Raises:
+        ValueError: If the database has no report dialect.
+    """
+    name = db.get_bind().dialect.name
+    try:
+        return REPORT_DIALECTS[name]
+    except KeyError:
+        raise ValueError(f"Reports are not supported on {name}") from None
@@ -0,0 +1,214 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+from sqlalchemy import Column, Integer, MetaData, Table, create_engine, delete, event, exc, func, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session
+from app import config, models
+from app.database import SessionLocal
+from app.dialects import report_dialect
+
+# Tables of the embedded copy; the report functions in app.crud read nothing else.
+EMBEDDED_TABLES = [models.Product.__table__, models.SalesDailyRollup.__table__]
+
+# Highest sale id folded into the copy. It lives in the file, not in the
+# process, so every worker sharing ANALYTICS_SQLITE_PATH advances one watermark.
+embedded_state = Table(
+    "embedded_state", MetaData(),
+    Column("id", Integer, primary_key=True),  # always 1
+    Column("max_id", Integer, nullable=False),
+)
+
+def _configure_connection(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")  # reports keep reading while a refresh writes
+    cursor.execute("PRAGMA synchronous=OFF")  # a disposable copy, rebuilt on every start
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
+
+class EmbeddedAnalytics:
+    """
+    Embedded SQLite copy of ``sales_daily_rollup`` and the product catalog,
+    answering the revenue reports through the same :mod:`app.crud` functions
+    as PostgreSQL; bucketing and gap-filling come from :mod:`app.dialects`.
+
+    A full reload copies the rollup together with the highest sale id, from
+    one snapshot of the primary. Refreshes then fold in the sales above that
+    id, grouped per day and product under their current category. The id is
+    stored in the file and read and advanced in the refresh's write
+    transaction, so workers sharing a file never fold a sale in twice. As with
+    :class:`app.analytics.SalesSnapshot`, sales updated or deleted after
+    loading, or committed late with a lower id, are picked up by the next
+    full reload.
+    """
+
+    def __init__(self, path: str = "", refresh_interval: float = 5.0, full_reload_interval: float = 3600.0):
+        self.path = path  # empty: a temporary file, removed on close
+        self.refresh_interval = refresh_interval
+        self.full_reload_interval = full_reload_interval
+        self.max_id = 0
+        self.refreshed_at = 0.0
+        self.reloaded_at = 0.0
+        self.engine = None
+        self.async_engine = None
+        self.sessionmaker: Optional[async_sessionmaker] = None
+        self._temporary = False
+        self._open_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._async_lock: Optional[asyncio.Lock] = None
+
+    def open(self):
+        """
+        Create the database file, its tables and engines; done on first use.
+        """
+        with self._open_lock:
+            if self.engine is not None:
+                return
+            if not self.path:
+                handle, self.path = tempfile.mkstemp(prefix="analytics-", suffix=".sqlite3")
+                os.close(handle)
+                self._temporary = True
+            self.engine = create_engine(f"sqlite:///{self.path}")
+            self.async_engine = create_async_engine(f"sqlite+aiosqlite:///{self.path}")
+            for sync_engine in (self.engine, self.async_engine.sync_engine):
+                event.listen(sync_engine, "connect", _configure_connection)
+            models.Base.metadata.create_all(self.engine, tables=EMBEDDED_TABLES)
+            embedded_state.create(self.engine, checkfirst=True)
+            self.sessionmaker = async_sessionmaker(bind=self.async_engine, autoflush=False, expire_on_commit=False)
+
+    def _new_sales(self, source: Session, watermark: int, max_id: int):
+        sale, product = models.Sale, models.Product
+        day = report_dialect(source).day(sale.sale_date)
+        category = func.coalesce(product.category, "")
+        return (
+            select(
+                day.label("day"),
+                sale.product_id,
+                category.label("category"),
+                func.coalesce(func.sum(sale.total_price), 0).label("revenue"),
+                func.coalesce(func.sum(sale.quantity), 0).label("quantity"),
+                func.count().label("sales_count"),
+            )
+            .outerjoin(product, product.id == sale.product_id)
+            .where(sale.id > watermark, sale.id <= max_id,
+                   sale.sale_date.is_not(None), sale.product_id.is_not(None))
+            .group_by(day, sale.product_id, category)
+        )
+
+    def refresh(self, full: bool = False):
+        """
+        Fold in the sales newer than the id watermark (or copy the whole
+        rollup when ``full``) and replace the product catalog.
+
+        A refresh holds the file's write lock from reading the watermark to
+        storing the new one. If another worker sharing the file still holds it
+        after the busy timeout, that worker is refreshing the same copy and
+        this refresh is skipped.
+
+        Args:
+            full (bool): Discard the copy and reload the whole rollup.
+        """
+        self.open()
+        with self._refresh_lock:
+            full = full or not self.reloaded_at or time.monotonic() - self.reloaded_at >= self.full_reload_interval
+            rollup = models.SalesDailyRollup.__table__
+            products = models.Product.__table__
+            with self.engine.connect() as target:
+                try:
+                    target.exec_driver_sql("BEGIN IMMEDIATE")
+                except exc.OperationalError:
+                    target.rollback()
+                    self.refreshed_at = time.monotonic()
+                    return
+                watermark = target.execute(select(embedded_state.c.max_id)).scalar()
+                full = full or watermark is None
+
+                with SessionLocal() as source:
+                    if source.get_bind().dialect.name == "postgresql":
+                        # One snapshot for the rollup, the id watermark and the catalog.
+                        source.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+                    max_id = source.execute(select(func.max(models.Sale.id))).scalar() or 0
+                    catalog = source.execute(select(products.c.id, products.c.name, products.c.category)).all()
+
+                    if full:
+                        target.execute(delete(rollup))
+                        stmt = insert(rollup)
+                        rows = source.execute(
+                            select(rollup.c.day, rollup.c.product_id, rollup.c.category, rollup.c.revenue,
+                                   rollup.c.quantity, rollup.c.sales_count)
+                            .execution_options(yield_per=100_000)
+                        )
+                    else:
+                        stmt = sqlite_insert(rollup)
+                        stmt = stmt.on_conflict_do_update(
+                            index_elements=[rollup.c.day, rollup.c.product_id, rollup.c.category],
+                            set_={"revenue": rollup.c.revenue + stmt.excluded.revenue,
+                                  "quantity": rollup.c.quantity + stmt.excluded.quantity,
+                                  "sales_count": rollup.c.sales_count + stmt.excluded.sales_count},
+                        )
+                        max_id = max(max_id, watermark)
+                        rows = source.execute(self._new_sales(source, watermark, max_id).execution_options(yield_per=100_000))
+                    for batch in rows.partitions():
+                        target.execute(stmt, [row._asdict() for row in batch])
+
+                target.execute(delete(products))
+                if catalog:
+                    target.execute(insert(products), [row._asdict() for row in catalog])
+                target.execute(delete(embedded_state))
+                target.execute(insert(embedded_state), {"id": 1, "max_id": max_id})
+                target.commit()
+
+            self.max_id = max_id
+            self.refreshed_at = time.monotonic()
+            if full:
+                self.reloaded_at = self.refreshed_at
+
+    async def ensure_fresh(self):
+        """
+        Refresh in a worker thread when the copy is older than ``refresh_interval``.
+        """
+        if time.monotonic() - self.refreshed_at < self.refresh_interval:
+            return
+        if self._async_lock is None:
+            self._async_lock = asyncio.Lock()
+        async with self._async_lock:
+            if time.monotonic() - self.refreshed_at >= self.refresh_interval:
+                await asyncio.to_thread(self.refresh)
+
+    @asynccontextmanager
+    async def session_scope(self):
+        """
+        Open an AsyncSession on the embedded copy, refreshing it first if it is stale.
+        """
+        await self.ensure_fresh()
+        async with self.sessionmaker() as db:
+            yield db
+
+    async def close(self):
+        """
+        Close the engines, and remove the file if it was temporary; called at shutdown.
+        """
+        if self.engine is None:
+            return
+        await self.async_engine.dispose()
+        self.engine.dispose()
+        self.engine = self.async_engine = self.sessionmaker = None
+        if self._temporary:
+            for suffix in ("", "-wal", "-shm"):
+                try:
+                    os.remove(self.path + suffix)
+                except FileNotFoundError:
+                    pass
+            self.path = ""
+            self._temporary = False
+
+embedded_analytics = EmbeddedAnalytics(
+    config.ANALYTICS_SQLITE_PATH,
+    refresh_interval=config.ANALYTICS_REFRESH_SECONDS,
+    full_reload_interval=config.ANALYTICS_FULL_RELOAD_SECONDS,
+)
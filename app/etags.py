@@ -0,0 +1,37 @@
+import hashlib
+import json
+from fastapi import Request, Response
+
+def make_etag(request: Request, version: int) -> str:
+    """
+    Build the ETag of a response computed from data at a table watermark.
+
+    Args:
+        request (Request): The request; its path and query parameters are part of the tag.
+        version (int): Watermark of the table the response is built from, see :func:`app.crud.get_watermark`.
+
+    Returns:
+        str: Weak ETag, e.g. ``W/"42-1f3a..."``.
+    """
+    params = sorted(request.query_params.multi_items())
+    digest = hashlib.sha1(json.dumps([request.url.path, params]).encode()).hexdigest()[:16]
+    return f'W/"{version}-{digest}"'
+
+def not_modified(request: Request, etag: str):
+    """
+    Build a 304 response if the client already holds ``etag``.
+
+    Args:
+        request (Request): The request, possibly carrying ``If-None-Match``.
+        etag (str): ETag of the current representation.
+
+    Returns:
+        Optional[Response]: An empty 304 response, or None if the body must be sent.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    if "*" in tags or etag.removeprefix("W/") in tags:
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
@@ -0,0 +1,126 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app import config, crud, schemas
+from app.database import SessionLocal, engine
+
+logger = logging.getLogger(__name__)
+
+_report_requests = TypeAdapter(schemas.ReportRequest)
+
+def run_report(db: Session, kind: str, params: dict):
+    """
+    Compute a report from the kind and parameters stored with its job.
+
+    Args:
+        db (Session): Database session.
+        kind (str): Report kind: 'revenue', 'compare' or 'top'.
+        params (dict): Parameters of the matching :data:`schemas.ReportRequest`, without ``kind``.
+
+    Returns:
+        The same data as the matching GET endpoint under /sales.
+    """
+    report = _report_requests.validate_python({"kind": kind, **params})
+    if report.kind == "revenue":
+        return crud.get_revenue_by_period(db, report.period, report.start_date, report.end_date,
+                                          report.category, report.product_id)
+    if report.kind == "compare":
+        return crud.compare_revenue_periods(db, report.periods, report.category, report.by_category)
+    return crud.get_top_sales(db, report.by, report.metric, report.limit, report.start_date, report.end_date,
+                              report.category)
+
+class ReportJobRunner:
+    """
+    Runs background reports on a bounded thread pool.
+
+    At most ``workers`` reports run at once per worker process; further jobs
+    wait in the pool's queue. A job keeps one connection of the sync engine
+    from claim to outcome, so the backend PID it records is the one running
+    its query, and its statements run under ``REPORT_JOB_TIMEOUT_SECONDS``
+    instead of the API's statement timeout. Reports are always computed in
+    SQL, whatever ``ANALYTICS_BACKEND`` is.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._unfinished: set[int] = set()  # submitted here and not finished yet
+
+    def submit(self, job_id: int):
+        """
+        Run a queued job once a thread is free.
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="report-job")
+            self._unfinished.add(job_id)
+            self._executor.submit(self._run, job_id)
+
+    def _run(self, job_id: int):
+        try:
+            self._execute(job_id)
+        except Exception:
+            logger.exception("Report job %s could not be run", job_id)
+        finally:
+            with self._lock:
+                self._unfinished.discard(job_id)
+
+    def _execute(self, job_id: int):
+        with engine.connect() as conn, Session(bind=conn, autoflush=False) as db:
+            job = crud.start_report_job(db, job_id)
+            if job is None:
+                return  # cancelled while queued
+            try:
+                if config.REPORT_JOB_TIMEOUT_SECONDS:
+                    timeout_ms = int(config.REPORT_JOB_TIMEOUT_SECONDS * 1000)
+                    db.execute(text(f"SET LOCAL statement_timeout = {timeout_ms}"))
+                result = jsonable_encoder(run_report(db, job["kind"], job["params"]))
+                crud.finish_report_job(db, job_id, result=result)
+            except Exception as error:
+                # Also reached when the job is cancelled: its outcome is then dropped.
+                db.rollback()
+                message = str(getattr(error, "orig", error)).strip().splitlines()
+                crud.finish_report_job(db, job_id, error=message[0] if message else type(error).__name__)
+
+    def sweep(self):
+        """
+        Fail the jobs queued or running for longer than ``REPORT_JOB_STALE_SECONDS``,
+        left behind by workers that were killed; called at startup.
+        """
+        if not config.REPORT_JOB_STALE_SECONDS:
+            return
+        with SessionLocal() as db:
+            swept = crud.fail_stale_report_jobs(db, config.REPORT_JOB_STALE_SECONDS)
+        if swept:
+            logger.warning("Marked %s abandoned report jobs as failed", swept)
+
+    def status(self) -> dict:
+        return {"workers": self.workers, "unfinished": len(self._unfinished)}
+
+    def close(self):
+        """
+        Cancel the jobs this process has not finished and stop the pool; called at shutdown.
+
+        Blocks until running reports have stopped, so call it off the event loop.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+            unfinished = sorted(self._unfinished)
+        if executor is None:
+            return
+        executor.shutdown(wait=False, cancel_futures=True)
+        db = SessionLocal()
+        try:
+            for job_id in unfinished:
+                crud.cancel_report_job(db, job_id, reason="Server shut down")
+        finally:
+            db.close()
+        executor.shutdown(wait=True)
+
+report_jobs = ReportJobRunner(config.REPORT_JOB_WORKERS)
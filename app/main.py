@@ -1,11 +1,44 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from app.routers import sales, inventory, products
+from app import config
+from app.analytics import sales_snapshot
+from app.database import async_engine, engine
+from app.embedded import embedded_analytics
+from app.jobs import report_jobs
+from app.metrics import MetricsMiddleware, instrument_engine
+from app.notifications import low_stock_feed
+from app.replicas import PrimaryReadMiddleware, replica_set
+from app.routers import sales, inventory, products, admin, metrics, reports
 
-app = FastAPI(title="E-commerce Admin API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if config.ANALYTICS_BACKEND == "numpy":
+        await sales_snapshot.ensure_fresh()  # load the snapshot before serving traffic
+    elif config.ANALYTICS_BACKEND == "sqlite":
+        await embedded_analytics.ensure_fresh()
+    replica_set.start()
+    await asyncio.to_thread(report_jobs.sweep)
+    yield
+    await low_stock_feed.close()
+    await replica_set.close()
+    await asyncio.to_thread(report_jobs.close)
+    await embedded_analytics.close()
+
+app = FastAPI(title="E-commerce Admin API", lifespan=lifespan)
+app.add_middleware(PrimaryReadMiddleware)
+app.add_middleware(MetricsMiddleware)
+instrument_engine(async_engine.sync_engine)
+for replica in replica_set.replicas:
+    instrument_engine(replica.engine.sync_engine)
+instrument_engine(engine)  # the NumPy snapshot and report jobs use the sync engine
 
 app.include_router(sales.router, prefix="/sales", tags=["Sales"])
 app.include_router(inventory.router, prefix="/inventory", tags=["Inventory"])
 app.include_router(products.router, prefix="/products", tags=["Products"])
+app.include_router(reports.router, prefix="/reports", tags=["Reports"])
+app.include_router(admin.router, prefix="/admin", tags=["Admin"])
+app.include_router(metrics.router)
 
 @app.get("/")
 def root():
@@ -0,0 +1,244 @@
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from starlette.routing import Match
+from app import config
+
+logger = logging.getLogger(__name__)
+
+REQUEST_SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENTS_PER_REQUEST_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100)
+
+BACKGROUND_ROUTE = "<background>"  # statements run outside any request, e.g. at startup
+UNMATCHED_ROUTE = "<unmatched>"  # requests no route handles (404s), kept as one series
+
+class RequestStats:
+    """
+    SQL activity of the request being served, filled in by the cursor hooks.
+    """
+
+    def __init__(self, route: str):
+        self.route = route
+        self.statements = 0
+        self.sql_seconds = 0.0
+        self.rows = 0
+        self.statement_counts: Counter = Counter()
+
+_current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+class Histogram:
+    """
+    Cumulative-bucket histogram in the Prometheus sense.
+    """
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def lines(self, name: str, labels: dict) -> list[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{_labels({**labels, 'le': _number(bound)})} {cumulative}")
+        lines.append(f"{name}_bucket{_labels({**labels, 'le': '+Inf'})} {self.count}")
+        lines.append(f"{name}_sum{_labels(labels)} {_number(self.sum)}")
+        lines.append(f"{name}_count{_labels(labels)} {self.count}")
+        return lines
+
+class MetricsRegistry:
+    """
+    Per-worker request and SQL metrics, rendered in the Prometheus text format.
+
+    Like the report cache, the numbers cover one worker process; scrape every
+    worker (or run one) for a complete picture.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests: Counter = Counter()  # (method, route, status)
+        self.request_seconds: dict[tuple, Histogram] = {}  # (method, route)
+        self.statements_per_request: dict[tuple, Histogram] = {}  # (method, route)
+        self.sql_statements: Counter = Counter()  # route
+        self.sql_seconds: Counter = Counter()  # route
+        self.sql_rows: Counter = Counter()  # route
+        self.slow_statements: Counter = Counter()  # route
+        self.repeated_statements: Counter = Counter()  # route
+
+    def observe_statement(self, route: str, seconds: float, rows: int, slow: bool):
+        with self._lock:
+            self.sql_statements[route] += 1
+            self.sql_seconds[route] += seconds
+            self.sql_rows[route] += rows
+            if slow:
+                self.slow_statements[route] += 1
+
+    def observe_request(self, method: str, status: int, seconds: float, stats: RequestStats, repeated: int):
+        key = (method, stats.route)
+        with self._lock:
+            self.requests[(method, stats.route, str(status))] += 1
+            self.request_seconds.setdefault(key, Histogram(REQUEST_SECONDS_BUCKETS)).observe(seconds)
+            self.statements_per_request.setdefault(key, Histogram(STATEMENTS_PER_REQUEST_BUCKETS)).observe(stats.statements)
+            if repeated:
+                self.repeated_statements[stats.route] += repeated
+
+    def render(self) -> str:
+        """
+        Return every metric in the Prometheus text exposition format.
+        """
+        with self._lock:
+            lines = []
+
+            def counter(name, help_text, values, label_names):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(values.items()):
+                    key = key if isinstance(key, tuple) else (key,)
+                    lines.append(f"{name}{_labels(dict(zip(label_names, key)))} {_number(value)}")
+
+            def histogram(name, help_text, values):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for (method, route), hist in sorted(values.items()):
+                    lines.extend(hist.lines(name, {"method": method, "route": route}))
+
+            counter("http_requests_total", "Requests served, by route and status.",
+                    self.requests, ("method", "route", "status"))
+            histogram("http_request_duration_seconds", "Request latency, including streamed bodies.",
+                      self.request_seconds)
+            histogram("db_statements_per_request", "SQL statements executed per request.",
+                      self.statements_per_request)
+            counter("db_statements_total", "SQL statements executed, by route.",
+                    self.sql_statements, ("route",))
+            counter("db_statement_seconds_total", "Time spent executing SQL, by route.",
+                    self.sql_seconds, ("route",))
+            counter("db_rows_total", "Rows returned or affected by SQL statements, by route.",
+                    self.sql_rows, ("route",))
+            counter("db_slow_statements_total", "SQL statements slower than SLOW_QUERY_MS, by route.",
+                    self.slow_statements, ("route",))
+            counter("db_repeated_statements_total",
+                    "Executions of statements repeated at least N_PLUS_ONE_THRESHOLD times in one request.",
+                    self.repeated_statements, ("route",))
+            return "\n".join(lines) + "\n"
+
+def _number(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(labels: dict) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+def _statement_shape(statement: str) -> str:
+    """
+    Collapse whitespace and IN-lists so repeats with different values group together.
+    """
+    statement = re.sub(r"\s+", " ", statement).strip()
+    return re.sub(r"\(\s*(?:[$%:?][\w()]*\s*,\s*)+[$%:?][\w()]*\s*\)", "(...)", statement)
+
+registry = MetricsRegistry()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_metrics_started", None)
+    if started is None:
+        return
+    seconds = time.perf_counter() - started
+    rows = max(cursor.rowcount, 0)  # -1 for server-side cursors, whose rows are fetched later
+    stats = _current_request.get()
+    route = stats.route if stats is not None else BACKGROUND_ROUTE
+
+    slow = config.SLOW_QUERY_MS > 0 and seconds * 1000 >= config.SLOW_QUERY_MS
+    if slow:
+        logger.warning("Slow query on %s: %.1f ms, %d rows: %s", route, seconds * 1000, rows, _statement_shape(statement)[:1000])
+    if stats is not None:
+        stats.statements += 1
+        stats.sql_seconds += seconds
+        stats.rows += rows
+        stats.statement_counts[_statement_shape(statement)] += 1
+    registry.observe_statement(route, seconds, rows, slow)
+
+def instrument_engine(engine):
+    """
+    Time every statement ``engine`` executes and attribute it to the current request.
+
+    Args:
+        engine (Engine): A sync engine, or ``async_engine.sync_engine``.
+    """
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+def route_template(scope) -> str:
+    """
+    Path template of the route handling ``scope`` (e.g. '/sales/revenue/{period}'),
+    so metrics are labelled per endpoint rather than per URL.
+    """
+    partial = None
+    for route in scope["app"].routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path  # path matches, method does not (405)
+    return partial or UNMATCHED_ROUTE
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency, status and SQL activity per route.
+
+    Written as plain ASGI rather than ``BaseHTTPMiddleware`` so that the
+    latency of streamed responses covers the whole body.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(route_template(scope))
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        token = _current_request.set(stats)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            seconds = time.perf_counter() - started
+            _current_request.reset(token)
+            repeated = 0
+            if config.N_PLUS_ONE_THRESHOLD > 0:
+                for shape, count in stats.statement_counts.items():
+                    if count >= config.N_PLUS_ONE_THRESHOLD:
+                        repeated += count
+                        logger.warning("Possible N+1 on %s %s: statement ran %d times: %s",
+                                       scope["method"], stats.route, count, shape[:1000])
+            registry.observe_request(scope["method"], status, seconds, stats, repeated)
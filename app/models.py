@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index
+from sqlalchemy import DDL, JSON, BigInteger, Column, Integer, String, Float, Date, DateTime, ForeignKey, Index, event, text
 from sqlalchemy.orm import relationship, declarative_base
 import datetime
 
@@ -11,6 +11,7 @@ class Product(Base):
     category = Column(String, index=True)  # Index added here for filtering by category
     price = Column(Float)
     stock = Column(Integer)
+    reorder_level = Column(Integer, nullable=False, default=10, server_default="10")  # low stock at or below this
     
     inventory_changes = relationship(
         "InventoryChange", back_populates="product", cascade="all, delete-orphan"
@@ -18,24 +19,40 @@ class Product(Base):
     sales = relationship("Sale", back_populates="product")
     logs = relationship("InventoryLog", back_populates="product")
 
+    __table_args__ = (
+        # Low-stock watchlist: only products at or below their reorder level are indexed
+        Index('ix_products_low_stock', 'id', postgresql_where=text('stock <= reorder_level')),
+    )
+
 class Sale(Base):
     __tablename__ = "sales"
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     product_id = Column(Integer, ForeignKey("products.id"), index=True)
     quantity = Column(Integer)
     total_price = Column(Float)
-    sale_date = Column(DateTime, default=datetime.datetime.utcnow, index=True)
+    # Part of the primary key because the table is range-partitioned by month on it
+    sale_date = Column(DateTime, primary_key=True, default=datetime.datetime.utcnow, index=True)
     
     product = relationship("Product", back_populates="sales")
 
     __table_args__ = (
         Index('ix_sales_product_date', 'product_id', 'sale_date'),  # composite index for faster querying by product + date
+        {'postgresql_partition_by': 'RANGE (sale_date)'},
     )
 
+# Monthly partitions are created by create_sales_partition() (see the
+# partition_sales_by_month migration); the default partition keeps a freshly
+# created schema writable until they exist.
+event.listen(
+    Sale.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS sales_default PARTITION OF sales DEFAULT").execute_if(dialect="postgresql"),
+)
+
 class InventoryChange(Base):
     __tablename__ = "inventory_changes"
     id = Column(Integer, primary_key=True, index=True)
-    product_id = Column(Integer, ForeignKey("products.id"), index=True)
+    product_id = Column(Integer, ForeignKey("products.id"))
     previous_stock = Column(Integer)
     new_stock = Column(Integer)
     change_amount = Column(Integer)
@@ -43,6 +60,11 @@ class InventoryChange(Base):
 
     product = relationship("Product", back_populates="inventory_changes")
 
+    __table_args__ = (
+        # Newest-first history of one product, matching the keyset order of get_inventory_changes
+        Index('ix_inventory_changes_product_timestamp', 'product_id', timestamp.desc(), id.desc()),
+    )
+
 class InventoryLog(Base):
     __tablename__ = 'inventory_logs'
 
@@ -54,3 +76,75 @@ class InventoryLog(Base):
 
     product = relationship("Product", back_populates="logs")
 
+class InventorySnapshot(Base):
+    """
+    Stock of every product at a checkpoint, written by
+    ``scripts/create_inventory_snapshot.py``. Stock at any other time is the
+    nearest checkpoint plus the ``inventory_changes`` between the two.
+    """
+    __tablename__ = "inventory_snapshots"
+
+    taken_at = Column(DateTime, primary_key=True)
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    stock = Column(Integer, nullable=False)
+
+class SalesDailyRollup(Base):
+    """
+    Pre-aggregated revenue and quantity per day, product and category.
+
+    Maintained by statement-level triggers on ``sales`` (see the
+    ``add_sales_daily_rollup`` migration); never written by the application.
+    """
+    __tablename__ = "sales_daily_rollup"
+
+    day = Column(Date, primary_key=True)
+    product_id = Column(Integer, primary_key=True)
+    category = Column(String, primary_key=True)  # '' for products without a category
+    revenue = Column(Float, nullable=False, default=0)
+    quantity = Column(Integer, nullable=False, default=0)
+    sales_count = Column(Integer, nullable=False, default=0)  # the key is removed when it drops to 0
+
+    __table_args__ = (
+        Index('ix_sales_daily_rollup_category_day', 'category', 'day'),  # category-filtered revenue reports
+        Index('ix_sales_daily_rollup_product_day', 'product_id', 'day'),  # product-filtered revenue reports
+    )
+
+class TableWatermark(Base):
+    """
+    One shard of the change counter of a table, bumped by a statement-level
+    trigger on every write to it (see the ``add_table_watermarks``
+    migration); never written by the application. The table's version is the
+    sum over its shards, and ETags of the responses built from the table
+    derive from it.
+    """
+    __tablename__ = "table_watermarks"
+
+    table_name = Column(String, primary_key=True)
+    shard = Column(Integer, primary_key=True)  # concurrent writers bump different shards
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime)
+
+class ReportJob(Base):
+    """
+    A report computed in the background (see ``app/jobs.py``), polled through
+    ``GET /reports/{id}``. ``params_hash`` identifies identical requests so
+    that they share one job.
+    """
+    __tablename__ = "report_jobs"
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String, nullable=False)  # 'revenue', 'compare' or 'top'
+    params = Column(JSON, nullable=False)
+    params_hash = Column(String, nullable=False)
+    status = Column(String, nullable=False, default="queued")  # queued, running, succeeded, failed or cancelled
+    result = Column(JSON)
+    error = Column(String)
+    created_at = Column(DateTime, nullable=False, default=datetime.datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    backend_pid = Column(Integer)  # server process running the job, signalled on cancel
+    backend_start = Column(DateTime(timezone=True))  # when that process started, telling it from a later one with the same PID
+
+    __table_args__ = (
+        Index('ix_report_jobs_params_hash_created_at', 'params_hash', 'created_at'),  # deduplication lookup
+    )
@@ -0,0 +1,100 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Optional
+import asyncpg
+from app import schemas
+from app.database import ASYNC_DATABASE_URL
+
+logger = logging.getLogger(__name__)
+
+LOW_STOCK_CHANNEL = "low_stock"  # notified by the products_low_stock_notify() trigger
+SUBSCRIBER_QUEUE_SIZE = 1000
+RECONNECT_DELAY_SECONDS = 1.0
+
+class LowStockFeed:
+    """
+    Fans ``low_stock`` notifications out to in-process subscribers.
+
+    One dedicated asyncpg connection per worker LISTENs while anyone is
+    subscribed; it is opened on the first subscription, re-opened after a
+    connection loss and closed when the last subscriber leaves. The trigger
+    notifies on commit, so every worker sees crossings caused by any writer.
+    Events raised while the listener is reconnecting are not replayed.
+    """
+
+    def __init__(self, dsn: str):
+        self.dsn = dsn
+        self._subscribers: set[asyncio.Queue] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._idle = asyncio.Event()
+
+    @asynccontextmanager
+    async def subscribe(self):
+        """
+        Yield a queue receiving a :class:`schemas.LowStockEvent` per crossing.
+
+        A subscriber that falls ``SUBSCRIBER_QUEUE_SIZE`` events behind loses
+        the oldest ones rather than blocking the others.
+        """
+        queue: asyncio.Queue = asyncio.Queue(SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        self._idle.clear()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen())
+        try:
+            yield queue
+        finally:
+            self._subscribers.discard(queue)
+            if not self._subscribers:
+                self._idle.set()
+
+    def _on_notify(self, connection, pid, channel, payload):
+        try:
+            event = schemas.LowStockEvent.model_validate_json(payload)
+        except ValueError:
+            logger.warning("Ignoring malformed %s notification: %s", channel, payload)
+            return
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    async def _listen(self):
+        while self._subscribers:
+            try:
+                connection = await asyncpg.connect(self.dsn)
+            except (OSError, asyncpg.PostgresError) as exc:
+                logger.warning("Low-stock listener cannot connect: %s", exc)
+                await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+                continue
+
+            lost = asyncio.Event()
+            connection.add_termination_listener(lambda _: lost.set())
+            try:
+                await connection.add_listener(LOW_STOCK_CHANNEL, self._on_notify)
+                idle = asyncio.create_task(self._idle.wait())
+                dropped = asyncio.create_task(lost.wait())
+                await asyncio.wait({idle, dropped}, return_when=asyncio.FIRST_COMPLETED)
+                idle.cancel()
+                dropped.cancel()
+            finally:
+                if not connection.is_closed():
+                    await connection.close()
+            if lost.is_set() and self._subscribers:
+                logger.warning("Low-stock listener lost its connection; reconnecting")
+                await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+
+    async def close(self):
+        """
+        Stop listening; called at application shutdown.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+low_stock_feed = LowStockFeed(ASYNC_DATABASE_URL.set(drivername="postgresql").render_as_string(hide_password=False))
@@ -0,0 +1,37 @@
+import base64
+import datetime
+import json
+
+def encode_cursor(timestamp: datetime.datetime, row_id: int) -> str:
+    """
+    Build an opaque keyset cursor from the sort key of the last row on a page.
+
+    Args:
+        timestamp (datetime.datetime): Timestamp column of the last row.
+        row_id (int): Primary key of the last row, used as a tie-breaker.
+
+    Returns:
+        str: URL-safe cursor string.
+    """
+    payload = json.dumps([timestamp.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[datetime.datetime, int]:
+    """
+    Decode a cursor produced by :func:`encode_cursor`.
+
+    Args:
+        cursor (str): Cursor string received from a client.
+
+    Returns:
+        tuple[datetime.datetime, int]: The (timestamp, id) sort key.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.datetime.fromisoformat(timestamp), int(row_id)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
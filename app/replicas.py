@@ -0,0 +1,204 @@
+import asyncio
+import itertools
+import logging
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import exc, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from app import config
+from app.database import POOL_OPTIONS, _connect_args, pool_status, session_scope
+
+logger = logging.getLogger(__name__)
+
+# Requests sending this header with a true value read from the primary, e.g.
+# right after a write whose result must be visible.
+PRIMARY_READ_HEADER = b"x-read-from-primary"
+
+# Seconds of replay lag; 0 on a primary, a standby that has replayed all the
+# WAL it received, or any database that is not a standby.
+REPLICA_LAG_SQL = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+_read_from_primary: ContextVar[bool] = ContextVar("read_from_primary", default=False)
+
+class Replica:
+    """
+    One read replica: its engine, session factory and last known health.
+    """
+
+    def __init__(self, url: str):
+        self.url = make_url(url).set(drivername="postgresql+asyncpg")
+        self.engine = create_async_engine(
+            self.url,
+            connect_args=_connect_args("asyncpg"),
+            **{**POOL_OPTIONS, "pool_timeout": config.REPLICA_POOL_TIMEOUT},
+        )
+        self.sessionmaker = async_sessionmaker(bind=self.engine, autoflush=False, expire_on_commit=False)
+        self.healthy = True
+        self.lag_seconds: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def status(self) -> dict:
+        return {
+            "url": self.url.render_as_string(hide_password=True),
+            "healthy": self.healthy,
+            "lag_seconds": self.lag_seconds,
+            "last_error": self.last_error,
+            "pool": pool_status(self.engine.sync_engine.pool),
+        }
+
+class ReplicaSet:
+    """
+    Round-robin over the healthy read replicas.
+
+    A background task probes every replica each ``REPLICA_HEALTH_CHECK_SECONDS``:
+    one that cannot be reached or lags by more than ``REPLICA_MAX_LAG_SECONDS``
+    is skipped until a later probe succeeds. A replica that fails when a
+    session connects is taken out at once, and that read goes to the primary.
+    """
+
+    def __init__(self, urls: list[str]):
+        self.replicas = [Replica(url) for url in urls]
+        self._turn = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+
+    def choose(self) -> Optional[Replica]:
+        """
+        Next healthy replica in turn, or None if there is none.
+        """
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        return healthy[next(self._turn) % len(healthy)]
+
+    def mark_down(self, replica: Replica, error: Exception):
+        if replica.healthy:
+            logger.warning("Read replica %s is down: %s", replica.status()["url"], error)
+        replica.healthy = False
+        replica.last_error = str(error)
+
+    async def _probe(self, replica: Replica):
+        async with replica.engine.connect() as conn:
+            lag = float((await conn.execute(text(REPLICA_LAG_SQL))).scalar())
+        replica.lag_seconds = round(lag, 3)
+        if config.REPLICA_MAX_LAG_SECONDS and lag > config.REPLICA_MAX_LAG_SECONDS:
+            self.mark_down(replica, RuntimeError(f"replication lag {lag:.1f}s"))
+            return
+        if not replica.healthy:
+            logger.info("Read replica %s is back", replica.status()["url"])
+        replica.healthy = True
+        replica.last_error = None
+
+    async def check(self):
+        """
+        Probe every replica once and update its health.
+        """
+        for replica in self.replicas:
+            try:
+                await asyncio.wait_for(self._probe(replica), config.REPLICA_HEALTH_CHECK_SECONDS)
+            except (OSError, asyncio.TimeoutError, exc.DBAPIError) as error:
+                self.mark_down(replica, error)
+
+    async def _monitor(self):
+        while True:
+            await self.check()
+            await asyncio.sleep(config.REPLICA_HEALTH_CHECK_SECONDS)
+
+    def start(self):
+        """
+        Start the health checks; called at application startup.
+        """
+        if self.replicas and self._task is None:
+            self._task = asyncio.create_task(self._monitor())
+
+    async def close(self):
+        """
+        Stop the health checks and close the replica pools; called at shutdown.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+    def status(self) -> list[dict]:
+        return [replica.status() for replica in self.replicas]
+
+replica_set = ReplicaSet(config.DATABASE_REPLICA_URLS)
+
+@asynccontextmanager
+async def read_session_scope():
+    """
+    Open an AsyncSession for read-only queries.
+
+    The session is bound to the next healthy replica, or to the primary when
+    there is none, the replica cannot be reached or its pool is exhausted, or
+    the request is pinned to the primary (see :class:`PrimaryReadMiddleware`).
+    An exhausted replica pool is given up on after ``REPLICA_POOL_TIMEOUT``
+    seconds rather than the primary's ``DB_POOL_TIMEOUT``.
+    """
+    replica = None if _read_from_primary.get() else replica_set.choose()
+    if replica is not None:
+        async with replica.sessionmaker() as db:
+            try:
+                await db.connection()
+            except (OSError, exc.DBAPIError) as error:
+                replica_set.mark_down(replica, error)
+            except exc.TimeoutError:
+                pass  # pool exhausted: the replica is busy, not down
+            else:
+                yield db
+                return
+    async with session_scope() as db:
+        yield db
+
+@contextmanager
+def pinned_to_primary():
+    """
+    Send the reads made inside a ``with`` block to the primary.
+    """
+    token = _read_from_primary.set(True)
+    try:
+        yield
+    finally:
+        _read_from_primary.reset(token)
+
+async def get_read_db():
+    """
+    FastAPI dependency yielding a read-only AsyncSession, see :func:`read_session_scope`.
+    """
+    async with read_session_scope() as db:
+        yield db
+
+class PrimaryReadMiddleware:
+    """
+    ASGI middleware pinning a request's reads to the primary when it sends
+    ``X-Read-From-Primary: true``, for read-your-writes consistency.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        pinned = any(
+            name == PRIMARY_READ_HEADER and value.lower() in (b"1", b"true", b"yes")
+            for name, value in scope["headers"]
+        )
+        if not pinned:
+            await self.app(scope, receive, send)
+            return
+        with pinned_to_primary():
+            await self.app(scope, receive, send)
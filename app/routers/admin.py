@@ -0,0 +1,40 @@
+from fastapi import APIRouter
+from app.cache import report_cache
+from app.database import async_engine, engine, pool_status, pool_wait_stats
+from app.jobs import report_jobs
+from app.replicas import replica_set
+
+router = APIRouter()
+
+@router.get("/pool")
+async def read_pool_status():
+    """
+    Report connection pool occupancy and checkout wait times.
+
+    ``api`` is the async pool serving requests in this worker; ``sync`` is the
+    psycopg2 pool used by scripts and background reports, whose thread pool
+    is under ``report_jobs``; ``replicas`` lists the read replicas with
+    their health, replication lag and pool. Rising ``checked_out`` + ``overflow`` near
+    ``size`` + ``max_overflow``, or a growing ``max_wait_ms``, signals
+    exhaustion before requests start timing out.
+
+    Returns:
+        dict: Pool status per engine and request checkout wait statistics.
+    """
+    return {
+        "api": {**pool_status(async_engine.sync_engine.pool), "wait": pool_wait_stats.as_dict()},
+        "sync": pool_status(engine.pool),
+        "report_jobs": report_jobs.status(),
+        "replicas": replica_set.status(),
+    }
+
+@router.get("/cache")
+async def read_cache_stats():
+    """
+    Report hit, miss, eviction, expiration and invalidation counters of the
+    revenue report cache in this worker.
+
+    Returns:
+        dict: Cache occupancy, configuration and counters.
+    """
+    return report_cache.stats()
@@ -1,40 +1,175 @@
-from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from app import crud, schemas
-from app.database import SessionLocal
+import asyncio
+from datetime import datetime, timezone
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import async_crud, crud, schemas
+from app.database import get_db
+from app.etags import make_etag, not_modified
+from app.replicas import get_read_db
+from app.notifications import low_stock_feed
 
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+SSE_KEEPALIVE_SECONDS = 15  # comment lines keep proxies from timing out idle streams
+
+def _utc_naive(value: Optional[datetime]) -> Optional[datetime]:
+    """
+    Convert a timezone-aware query parameter to the naive UTC the timestamp
+    columns hold; naive values are taken as UTC already.
+    """
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
 
 @router.get("/", response_model=list[schemas.Product])
-def read_inventory(
+async def read_inventory(
+    request: Request,
     low_stock_threshold: Optional[int] = Query(None, description="Filter products with stock less or equal to this value"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Retrieve a list of products in inventory.
 
+    The response carries an ETag derived from the ``products`` watermark; a
+    request whose ``If-None-Match`` still matches gets a 304 without the
+    products being read.
+
     Args:
+        request (Request): Incoming request, for conditional GET.
         low_stock_threshold (Optional[int]): Optional threshold to filter products with stock less than or equal to this value.
-        db (Session): Database session dependency.
+        db (AsyncSession): Database session dependency.
+
+    Returns:
+        ORJSONResponse: A list of schemas.Product matching the criteria,
+        serialized from plain rows without response-model validation, or an
+        empty 304 response.
+    """
+    etag = make_etag(request, await async_crud.get_watermark(db, "products"))
+    unchanged = not_modified(request, etag)
+    if unchanged is not None:
+        return unchanged
+    return ORJSONResponse(await async_crud.get_inventory(db, low_stock_threshold), headers={"ETag": etag})
+
+@router.get("/low-stock", response_model=schemas.ProductPage)
+async def read_low_stock(
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Retrieve a page of the low-stock watchlist: products whose stock is at or
+    below their reorder level, by ascending ID.
+
+    Args:
+        limit (int): Maximum number of products to return.
+        cursor (Optional[str]): Cursor of the page to fetch, as returned in ``next_cursor``.
+        db (AsyncSession): Database session dependency.
 
     Returns:
-        List[schemas.Product]: List of products matching the criteria.
+        ORJSONResponse: A schemas.ProductPage with the low-stock products and
+        the cursor of the next page.
+
+    Raises:
+        HTTPException: If the cursor is malformed.
+    """
+    try:
+        page = await async_crud.get_low_stock(db, limit, cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return ORJSONResponse(page)
+
+async def low_stock_events():
+    """
+    Yield Server-Sent Events for products entering or leaving the watchlist.
+
+    Each crossing is sent as a ``low_stock`` or ``restocked`` event whose data
+    is a :class:`schemas.LowStockEvent`; comment lines are sent while idle.
     """
-    return crud.get_inventory(db, low_stock_threshold)
+    async with low_stock_feed.subscribe() as queue:
+        yield ": subscribed\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield f"event: {'low_stock' if event.low else 'restocked'}\ndata: {event.model_dump_json()}\n\n"
+
+@router.get("/low-stock/stream")
+async def stream_low_stock():
+    """
+    Push low-stock crossings as they are committed, instead of polling.
+
+    Subscribe first, then read ``GET /inventory/low-stock`` for the current
+    watchlist, so no crossing falls between the two.
+
+    Returns:
+        StreamingResponse: A ``text/event-stream`` of ``low_stock`` and ``restocked`` events.
+    """
+    return StreamingResponse(
+        low_stock_events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/as-of", response_model=schemas.StockAsOfPage)
+async def read_stock_as_of(
+    ts: datetime = Query(..., description="Point in time; naive timestamps are UTC"),
+    limit: int = Query(1000, ge=1, le=10000),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Retrieve the stock every product had at a point in time, by ascending ID.
+
+    Rebuilt from the nearest inventory snapshot and the changes since, so the
+    cost does not grow with the length of the history.
+
+    Args:
+        ts (datetime): Point in time to reconstruct.
+        limit (int): Maximum number of products to return.
+        cursor (Optional[str]): Cursor of the page to fetch, as returned in ``next_cursor``.
+        db (AsyncSession): Database session dependency.
+
+    Returns:
+        schemas.StockAsOfPage: Stock per product, the snapshot used and the cursor of the next page.
+
+    Raises:
+        HTTPException: If the cursor is malformed.
+    """
+    try:
+        return await async_crud.get_stock_as_of(db, _utc_naive(ts), limit, cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.put("/stock", response_model=list[schemas.StockUpdateResult])
+async def update_stock_batch(
+    updates: list[schemas.StockUpdateItem],
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Set the stock of many products at once, e.g. from a warehouse sync.
+
+    Unknown product IDs are reported per item and do not abort the batch.
+
+    Args:
+        updates (list[schemas.StockUpdateItem]): Product IDs and their new stock values.
+        db (AsyncSession): Database session dependency.
+
+    Returns:
+        List[schemas.StockUpdateResult]: Outcome of each item, in request order.
+    """
+    if not updates:
+        return []
+    return await async_crud.update_inventory_batch(db, updates)
 
 @router.put("/{product_id}/stock", response_model=schemas.Product)
-def update_stock(
+async def update_stock(
     product_id: int,
     payload: schemas.InventoryUpdateRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Update the stock quantity of a specific product.
@@ -42,7 +177,7 @@ def update_stock(
     Args:
         product_id (int): ID of the product to update.
         payload (schemas.InventoryUpdateRequest): Request body containing the new stock value.
-        db (Session): Database session dependency.
+        db (AsyncSession): Database session dependency.
 
     Returns:
         schemas.Product: The updated product object.
@@ -50,22 +185,114 @@ def update_stock(
     Raises:
         HTTPException: If the product is not found.
     """
-    product = crud.get_product(db, product_id)
+    product = await async_crud.get_product(db, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
 
-    return crud.update_inventory(db, product, payload.new_stock)
+    return await async_crud.update_inventory(db, product, payload.new_stock)
+
+@router.post("/{product_id}/adjust", response_model=schemas.StockAdjustResult)
+async def adjust_stock(
+    product_id: int,
+    payload: schemas.StockAdjustRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Add to or remove from the stock of a product atomically.
+
+    Concurrent adjustments of the same product are all applied, which is not
+    the case for read-then-set updates through ``PUT /{product_id}/stock``.
+
+    Args:
+        product_id (int): ID of the product to adjust.
+        payload (schemas.StockAdjustRequest): Signed stock delta and whether negative stock is allowed.
+        db (AsyncSession): Database session dependency.
+
+    Returns:
+        schemas.StockAdjustResult: Stock before and after the adjustment.
+
+    Raises:
+        HTTPException: 404 if the product is not found, 409 if negative stock
+            is refused and the stock is too low.
+    """
+    try:
+        result = await async_crud.adjust_inventory(db, product_id, payload.delta, payload.allow_negative)
+    except crud.InsufficientStockError as exc:
+        raise HTTPException(status_code=409, detail={"message": "Insufficient stock", "stock": exc.stock})
+    if result is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return result
+
+@router.get("/{product_id}/changes", response_model=schemas.InventoryChangePage)
+async def get_inventory_changes(
+    product_id: int,
+    request: Request,
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    since: Optional[datetime] = Query(None, description="Only changes at or after this time; naive timestamps are UTC"),
+    until: Optional[datetime] = Query(None, description="Only changes before this time; naive timestamps are UTC"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Retrieve a page of the inventory change history of a product, newest first.
+
+    The response carries an ETag derived from the ``inventory_changes``
+    watermark; a request whose ``If-None-Match`` still matches gets a 304
+    without the history being read.
 
-@router.get("/{product_id}/changes", response_model=list[schemas.InventoryChangeResponse])
-def get_inventory_changes(product_id: int, db: Session = Depends(get_db)):
+    Args:
+        product_id (int): ID of the product.
+        request (Request): Incoming request, for conditional GET.
+        response (Response): Outgoing response, carrying the ETag.
+        limit (int): Maximum number of records to return.
+        cursor (Optional[str]): Cursor of the page to fetch, as returned in ``next_cursor``.
+        since (Optional[datetime]): Only changes at or after this time.
+        until (Optional[datetime]): Only changes before this time.
+        db (AsyncSession): Database session dependency.
+
+    Returns:
+        schemas.InventoryChangePage: Inventory change records and the cursor of
+        the next page, or an empty 304 response.
+
+    Raises:
+        HTTPException: If the cursor is malformed.
+    """
+    etag = make_etag(request, await async_crud.get_watermark(db, "inventory_changes"))
+    unchanged = not_modified(request, etag)
+    if unchanged is not None:
+        return unchanged
+    response.headers["ETag"] = etag
+    try:
+        return await async_crud.get_inventory_changes(
+            db, product_id, limit, _utc_naive(since), _utc_naive(until), cursor
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("/{product_id}/changes/net", response_model=list[schemas.InventoryNetChange])
+async def get_inventory_net_changes(
+    product_id: int,
+    bucket: Literal["hour", "day"] = Query("day", description="Aggregate per hour or per day"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of buckets"),
+    since: Optional[datetime] = Query(None, description="Only changes at or after this time; naive timestamps are UTC"),
+    until: Optional[datetime] = Query(None, description="Only changes before this time; naive timestamps are UTC"),
+    db: AsyncSession = Depends(get_read_db)
+):
     """
-    Retrieve the history of inventory changes for a specific product.
+    Summarize the inventory history of a product as net stock change per hour or day.
 
     Args:
         product_id (int): ID of the product.
-        db (Session): Database session dependency.
+        bucket (str): 'hour' or 'day'.
+        limit (int): Maximum number of buckets to return, newest first.
+        since (Optional[datetime]): Only changes at or after this time.
+        until (Optional[datetime]): Only changes before this time.
+        db (AsyncSession): Database session dependency.
 
     Returns:
-        List[schemas.InventoryChangeResponse]: List of inventory change records.
+        List[schemas.InventoryNetChange]: Net change and number of changes per bucket with changes.
     """
-    return crud.get_inventory_changes(db, product_id)
+    return await async_crud.get_inventory_net_changes(
+        db, product_id, bucket, limit, _utc_naive(since), _utc_naive(until)
+    )
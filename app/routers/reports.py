@@ -0,0 +1,88 @@
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import async_crud, config, schemas
+from app.database import get_db
+from app.jobs import report_jobs
+
+router = APIRouter()
+
+POLL_AFTER_SECONDS = 1  # Retry-After sent while a job is queued or running
+
+# Job rows are read and written on the primary: a replica could still show a
+# job as queued after it finished.
+
+@router.post("", response_model=schemas.ReportJob, status_code=202)
+async def create_report(report: schemas.ReportRequest, response: Response, db: AsyncSession = Depends(get_db)):
+    """
+    Queue a revenue, period comparison or top-N report to be computed in the background.
+
+    An identical request (same kind and parameters) that is queued or running
+    (for less than ``REPORT_JOB_STALE_SECONDS``), or succeeded less than
+    ``REPORT_JOB_REUSE_SECONDS`` ago, is not queued again: its job is
+    returned instead. Poll the job at the ``Location``
+    returned until its status is 'succeeded', 'failed' or 'cancelled'.
+
+    Args:
+        report (schemas.ReportRequest): Report kind and parameters.
+
+    Returns:
+        schemas.ReportJob: The new or shared job.
+
+    Raises:
+        HTTPException: If a comparison period ends before it starts.
+    """
+    if report.kind == "compare" and any(end < start for start, end in report.periods):
+        raise HTTPException(status_code=400, detail="Periods must end on or after their start")
+
+    params = report.model_dump(mode="json", exclude={"kind"})
+    job, created = await async_crud.create_report_job(
+        db, report.kind, params, config.REPORT_JOB_REUSE_SECONDS, config.REPORT_JOB_STALE_SECONDS
+    )
+    if created:
+        report_jobs.submit(job["id"])
+    response.headers["Location"] = f"/reports/{job['id']}"
+    return job
+
+@router.get("/{job_id}", response_model=schemas.ReportJob)
+async def read_report(job_id: int, response: Response, db: AsyncSession = Depends(get_db)):
+    """
+    Get the status and timing of a background report, and its result once it succeeded.
+
+    Args:
+        job_id (int): Job ID.
+
+    Returns:
+        schemas.ReportJob: The job.
+
+    Raises:
+        HTTPException: If the job does not exist.
+    """
+    job = await async_crud.get_report_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Report job not found")
+    if job["status"] in ("queued", "running"):
+        response.headers["Retry-After"] = str(POLL_AFTER_SECONDS)
+    return job
+
+@router.post("/{job_id}/cancel", response_model=schemas.ReportJob)
+async def cancel_report(job_id: int, db: AsyncSession = Depends(get_db)):
+    """
+    Cancel a queued or running report; a running query is interrupted.
+
+    Cancelling a job also cancels it for every request that shared it.
+
+    Args:
+        job_id (int): Job ID.
+
+    Returns:
+        schemas.ReportJob: The cancelled job.
+
+    Raises:
+        HTTPException: If the job does not exist, or already succeeded or failed.
+    """
+    job = await async_crud.cancel_report_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Report job not found")
+    if job["status"] != "cancelled":
+        raise HTTPException(status_code=409, detail=f"Report job already {job['status']}")
+    return job
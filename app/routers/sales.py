@@ -1,96 +1,415 @@
-from datetime import date
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from app import schemas, crud
-from app.database import SessionLocal
-from typing import Optional
+import csv
+import io
+import json
+from datetime import date, datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import config, schemas, crud, async_crud
+from app.analytics import sales_snapshot
+from app.cache import parse_day, report_cache
+from app.database import get_db
+from app.embedded import embedded_analytics
+from app.etags import make_etag, not_modified
+from app.replicas import get_read_db, read_session_scope
+from typing import Literal, Optional
 
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-@router.get("/", response_model=list[schemas.Sale])
-def read_sales(
-    skip: int = 0,
-    limit: int = 100,
+MAX_COMPARE_PERIODS = 104  # two years of weeks
+
+def report_session_scope():
+    """
+    Session the SQL report functions run on: the embedded SQLite copy with
+    ``ANALYTICS_BACKEND=sqlite``, otherwise a read replica or the primary.
+    """
+    if config.ANALYTICS_BACKEND == "sqlite":
+        return embedded_analytics.session_scope()
+    return read_session_scope()
+
+@router.get("/", response_model=schemas.SalePage)
+async def read_sales(
+    skip: int = Query(0, deprecated=True, description="Records to skip; use cursor instead"),
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
     start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
     product_id: Optional[int] = Query(None, description="Product ID"),
     category: Optional[str] = Query(None, description="Product category"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
-    Retrieve a list of sales records with optional filters and pagination.
+    Retrieve a page of sales records, newest first, with optional filters.
 
     Args:
-        skip (int): Number of records to skip.
+        skip (int): Number of records to skip (deprecated).
         limit (int): Maximum number of records to return.
+        cursor (Optional[str]): Cursor of the page to fetch, as returned in ``next_cursor``.
+        start_date (Optional[str]): Start date to filter sales (YYYY-MM-DD).
+        end_date (Optional[str]): End date to filter sales (YYYY-MM-DD).
+        product_id (Optional[int]): Filter by product ID.
+        category (Optional[str]): Filter by product category.
+        db (AsyncSession): Database session dependency.
+
+    Returns:
+        ORJSONResponse: A schemas.SalePage with the sales records and the
+        cursor of the next page, serialized from plain rows without
+        response-model validation.
+
+    Raises:
+        HTTPException: If the cursor is malformed.
+    """
+    try:
+        page = await async_crud.get_sales(
+            db,
+            skip=skip,
+            limit=limit,
+            start_date=start_date,
+            end_date=end_date,
+            product_id=product_id,
+            category=category,
+            cursor=cursor
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return ORJSONResponse(page)
+
+async def export_sales_chunks(export_format: str, **filters):
+    """
+    Yield an export of the sales matching ``filters`` as text chunks.
+
+    The generator owns its session: FastAPI closes ``get_db`` sessions before a
+    StreamingResponse body is consumed, so the stream cannot borrow one.
+
+    Args:
+        export_format (str): Either 'csv' or 'ndjson'.
+        **filters: Filters accepted by :func:`async_crud.stream_sales`.
+
+    Yields:
+        str: One chunk per cursor batch.
+    """
+    async with read_session_scope() as db:
+        if export_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(crud.SALE_COLUMNS)
+            async for batch in async_crud.stream_sales(db, **filters):
+                writer.writerows(batch)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue()  # header only, nothing matched
+        else:
+            async for batch in async_crud.stream_sales(db, **filters):
+                yield "".join(
+                    json.dumps(dict(zip(crud.SALE_COLUMNS, row)), default=datetime.isoformat) + "\n"
+                    for row in batch
+                )
+
+@router.get("/export")
+async def export_sales(
+    export_format: Literal["csv", "ndjson"] = Query("csv", alias="format", description="csv or ndjson"),
+    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
+    product_id: Optional[int] = Query(None, description="Product ID"),
+    category: Optional[str] = Query(None, description="Product category"),
+):
+    """
+    Export every sale matching the filters as a streamed CSV or NDJSON file.
+
+    Args:
+        export_format (str): Output format, 'csv' or 'ndjson'.
         start_date (Optional[str]): Start date to filter sales (YYYY-MM-DD).
         end_date (Optional[str]): End date to filter sales (YYYY-MM-DD).
         product_id (Optional[int]): Filter by product ID.
         category (Optional[str]): Filter by product category.
-        db (Session): Database session dependency.
 
     Returns:
-        List[schemas.Sale]: List of sales records.
-    """
-    return crud.get_sales(
-        db,
-        skip=skip,
-        limit=limit,
-        start_date=start_date,
-        end_date=end_date,
-        product_id=product_id,
-        category=category
+        StreamingResponse: Sales ordered by sale date, streamed in batches.
+    """
+    media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        export_sales_chunks(
+            export_format,
+            start_date=start_date,
+            end_date=end_date,
+            product_id=product_id,
+            category=category,
+        ),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="sales.{export_format}"'},
     )
 
+@router.post("/bulk", response_model=schemas.SaleBulkResult, status_code=201)
+async def create_sales_bulk(
+    sales: list[schemas.SaleCreate],
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Record a batch of sales and decrement product stock, all in one transaction.
+
+    Args:
+        sales (list[schemas.SaleCreate]): Sales to record, typically thousands per request.
+        db (AsyncSession): Database session dependency.
+
+    Returns:
+        schemas.SaleBulkResult: Number of sales inserted and products updated.
+
+    Raises:
+        HTTPException: If any sale references an unknown product; nothing is recorded.
+    """
+    if not sales:
+        return {"inserted": 0, "products_updated": 0}
+    try:
+        return await async_crud.bulk_create_sales(db, sales)
+    except crud.UnknownProductsError as exc:
+        raise HTTPException(status_code=404, detail={"message": "Product not found", "product_ids": exc.product_ids})
+
 @router.get("/revenue/{period}")
-def get_revenue_report(
+async def get_revenue_report(
     period: str,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
+    category: Optional[str] = Query(None, description="Only count sales of this product category"),
+    product_id: Optional[int] = Query(None, description="Only count sales of this product"),
 ):
     """
     Generate a revenue report for a specified period.
 
+    Every period in the range is returned, with zero revenue where there were
+    no sales. Results are served from the report cache when possible; on a
+    miss they are computed by the configured analytics backend (SQL, NumPy
+    snapshot or embedded SQLite copy).
+
+    With the SQL backend the report carries an ETag derived from the
+    ``sales`` watermark, which is also part of the cache key: a request whose
+    ``If-None-Match`` still matches gets a 304 without the report being
+    computed, and a cached report is never older than its tag. The NumPy and
+    SQLite copies lag the table, so their reports carry no ETag.
+
     Args:
         period (str): Time period for revenue aggregation (e.g., daily, monthly).
-        db (Session): Database session dependency.
+        request (Request): Incoming request, for conditional GET.
+        response (Response): Outgoing response, carrying the ETag.
+        start_date (Optional[date]): Optional start date filter.
+        end_date (Optional[date]): Optional end date filter.
+        category (Optional[str]): Optional product category filter.
+        product_id (Optional[int]): Optional product filter.
+
+    Returns:
+        Any: Revenue data grouped by the specified period, or an empty 304 response.
+    """
+    key = ("revenue", period, start_date, end_date, category, product_id)
+    if config.ANALYTICS_BACKEND != "sql":
+        generation = report_cache.generation
+        cached = report_cache.get(key)
+        if cached is not None:
+            return cached
+        if config.ANALYTICS_BACKEND == "numpy":
+            await sales_snapshot.ensure_fresh()
+            result = sales_snapshot.revenue_by_period(period, start_date, end_date, category, product_id)
+        else:
+            async with report_session_scope() as db:
+                result = await async_crud.get_revenue_by_period(db, period, start_date, end_date, category, product_id)
+        if isinstance(result, list):  # not the invalid-period error
+            report_cache.set(key, result, [(start_date, end_date)], generation)
+        return result
+
+    async with read_session_scope() as db:
+        version = await async_crud.get_watermark(db, "sales")
+        etag = make_etag(request, version)
+        unchanged = not_modified(request, etag)
+        if unchanged is not None:
+            return unchanged
+        key += (version,)
+        generation = report_cache.generation
+        result = report_cache.get(key)
+        if result is None:
+            result = await async_crud.get_revenue_by_period(db, period, start_date, end_date, category, product_id)
+            if isinstance(result, list):
+                report_cache.set(key, result, [(start_date, end_date)], generation)
+    if isinstance(result, list):
+        response.headers["ETag"] = etag
+    return result
+
+@router.get("/categories/revenue", response_model=list[schemas.CategoryRevenue])
+async def get_category_revenue(
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+):
+    """
+    Break revenue and units sold down by product category, highest revenue first.
+
+    Args:
+        start_date (Optional[date]): Optional start date filter.
+        end_date (Optional[date]): Optional end date filter.
+
+    Returns:
+        List[schemas.CategoryRevenue]: Revenue and quantity per category.
+    """
+    key = ("categories", start_date, end_date)
+    generation = report_cache.generation
+    cached = report_cache.get(key)
+    if cached is not None:
+        return cached
+
+    if config.ANALYTICS_BACKEND == "numpy":
+        await sales_snapshot.ensure_fresh()
+        result = sales_snapshot.revenue_by_category(start_date, end_date)
+    else:
+        async with report_session_scope() as db:
+            result = await async_crud.get_revenue_by_category(db, start_date, end_date)
+    report_cache.set(key, result, [(start_date, end_date)], generation)
+    return result
+
+@router.get("/top", response_model=list[schemas.TopSalesEntry], response_model_exclude_none=True)
+async def get_top_sales(
+    by: Literal["product", "category"] = Query("product", description="Rank products or categories"),
+    metric: Literal["revenue", "quantity"] = Query("revenue", description="Rank by revenue or units sold"),
+    limit: int = Query(20, ge=1, le=1000),
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    category: Optional[str] = Query(None, description="Only rank sales of this category"),
+):
+    """
+    Rank the best-selling products or categories in a date range.
+
+    Results are served from the report cache when possible; on a miss they are
+    computed by the configured analytics backend (SQL, NumPy snapshot or
+    embedded SQLite copy).
+
+    Args:
+        by (str): Rank 'product' or 'category'.
+        metric (str): Rank by 'revenue' or 'quantity'.
+        limit (int): Number of entries to return.
         start_date (Optional[date]): Optional start date filter.
         end_date (Optional[date]): Optional end date filter.
+        category (Optional[str]): Optional product category filter.
 
     Returns:
-        Any: Revenue data grouped by the specified period.
+        List[schemas.TopSalesEntry]: Entries ordered from best to worst.
     """
-    return crud.get_revenue_by_period(db, period, start_date, end_date)
+    key = ("top", by, metric, limit, start_date, end_date, category)
+    generation = report_cache.generation
+    cached = report_cache.get(key)
+    if cached is not None:
+        return cached
+
+    if config.ANALYTICS_BACKEND == "numpy":
+        await sales_snapshot.ensure_fresh()
+        result = sales_snapshot.top_sales(by, metric, limit, start_date, end_date, category)
+    else:
+        async with report_session_scope() as db:
+            result = await async_crud.get_top_sales(db, by, metric, limit, start_date, end_date, category)
+    report_cache.set(key, result, [(start_date, end_date)], generation)
+    return result
 
 @router.get("/compare/revenue", response_model=schemas.RevenueComparisonResponse)
-def compare(
+async def compare(
     start1: str,
     end1: str,
     start2: str,
     end2: str,
     category: Optional[str] = None,
-    db: Session = Depends(get_db)
 ):
     """
     Compare revenue between two different date ranges, optionally filtered by category.
 
+    Results are served from the report cache when possible; on a miss they are
+    computed by the configured analytics backend (SQL, NumPy snapshot or
+    embedded SQLite copy).
+
     Args:
         start1 (str): Start date of the first period (YYYY-MM-DD).
         end1 (str): End date of the first period (YYYY-MM-DD).
         start2 (str): Start date of the second period (YYYY-MM-DD).
         end2 (str): End date of the second period (YYYY-MM-DD).
         category (Optional[str]): Optional product category filter.
-        db (Session): Database session dependency.
 
     Returns:
         schemas.RevenueComparisonResponse: Revenue comparison data.
+
+    Raises:
+        HTTPException: If a date is not an ISO date.
+    """
+    try:
+        ranges = [(parse_day(start1), parse_day(end1)), (parse_day(start2), parse_day(end2))]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be ISO dates (YYYY-MM-DD)")
+    key = ("compare", *ranges, category)
+
+    generation = report_cache.generation
+    cached = report_cache.get(key)
+    if cached is not None:
+        return cached
+
+    if config.ANALYTICS_BACKEND == "numpy":
+        await sales_snapshot.ensure_fresh()
+        result = sales_snapshot.compare_revenue(*ranges[0], *ranges[1], category)
+    else:
+        async with report_session_scope() as db:
+            result = await async_crud.compare_revenue(db, *ranges[0], *ranges[1], category)
+    report_cache.set(key, result, ranges, generation)
+    return result
+
+def parse_period(value: str) -> tuple[date, date]:
+    """
+    Parse an ISO 8601 date interval such as '2025-01-06/2025-01-12'.
+
+    Raises:
+        ValueError: If the value is not two ISO dates separated by '/' in order.
+    """
+    start, separator, end = value.partition("/")
+    start, end = date.fromisoformat(start), date.fromisoformat(end)
+    if not separator or end < start:
+        raise ValueError(value)
+    return start, end
+
+@router.get("/compare/revenue/periods", response_model=schemas.RevenuePeriodsComparison)
+async def compare_periods(
+    periods: list[str] = Query(..., description="Repeatable start/end interval, e.g. 2025-01-06/2025-01-12"),
+    category: Optional[str] = Query(None, description="Only count sales of this category"),
+    by_category: bool = Query(False, description="Also break every period down by category"),
+):
+    """
+    Compare revenue across any number of periods in one scan, optionally per category.
+
+    Each period reports its revenue and its change from the previous period,
+    absolute and in percent. Results are served from the report cache when
+    possible; on a miss they are computed by the configured analytics backend.
+
+    Args:
+        periods (list[str]): Inclusive date intervals, in report order.
+        category (Optional[str]): Optional product category filter.
+        by_category (bool): Include the per-category breakdown.
+
+    Returns:
+        schemas.RevenuePeriodsComparison: Revenue and deltas per period (and category).
+
+    Raises:
+        HTTPException: If a period is malformed or too many periods are requested.
     """
-    return crud.compare_revenue(db, start1, end1, start2, end2, category)
+    if len(periods) > MAX_COMPARE_PERIODS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_COMPARE_PERIODS} periods can be compared")
+    try:
+        ranges = [parse_period(value) for value in periods]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Periods must be start/end date intervals (YYYY-MM-DD/YYYY-MM-DD)")
+
+    key = ("compare_periods", tuple(ranges), category, by_category)
+    generation = report_cache.generation
+    cached = report_cache.get(key)
+    if cached is not None:
+        return cached
+
+    if config.ANALYTICS_BACKEND == "numpy":
+        await sales_snapshot.ensure_fresh()
+        result = sales_snapshot.compare_revenue_periods(ranges, category, by_category)
+    else:
+        async with report_session_scope() as db:
+            result = await async_crud.compare_revenue_periods(db, ranges, category, by_category)
+    report_cache.set(key, result, ranges, generation)
+    return result
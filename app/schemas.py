@@ -1,5 +1,6 @@
-from pydantic import BaseModel
-from datetime import datetime
+from pydantic import BaseModel, Field
+from datetime import date, datetime
+from typing import Annotated, Any, Literal, Optional, Union
 
 class ProductBase(BaseModel):
     """
@@ -9,6 +10,7 @@ class ProductBase(BaseModel):
     category: str
     price: float
     stock: int
+    reorder_level: int = 10
 
 class ProductCreate(ProductBase):
     """
@@ -26,6 +28,24 @@ class Product(ProductBase):
     class Config:
         orm_mode = True
 
+class ProductPage(BaseModel):
+    """
+    Schema for one page of products.
+    """
+    items: list[Product]
+    next_cursor: Optional[str] = None
+
+class LowStockEvent(BaseModel):
+    """
+    Schema for a product entering (low=True) or leaving the low-stock watchlist.
+    """
+    product_id: int
+    name: Optional[str] = None
+    category: Optional[str] = None
+    stock: Optional[int] = None
+    reorder_level: int
+    low: bool
+
 class SaleBase(BaseModel):
     """
     Base schema for sale-related data.
@@ -34,6 +54,21 @@ class SaleBase(BaseModel):
     quantity: int
     total_price: float
 
+class SaleCreate(SaleBase):
+    """
+    Schema for recording a sale. sale_date defaults to the time of ingestion;
+    returns are not recorded as sales, so at least one unit is sold.
+    """
+    quantity: int = Field(ge=1)
+    sale_date: Optional[datetime] = None
+
+class SaleBulkResult(BaseModel):
+    """
+    Schema for the outcome of a bulk sale ingestion.
+    """
+    inserted: int
+    products_updated: int
+
 class Sale(SaleBase):
     """
     Schema for reading a sale record.
@@ -45,6 +80,13 @@ class Sale(SaleBase):
     class Config:
         orm_mode = True
 
+class SalePage(BaseModel):
+    """
+    Schema for a page of sale records with the cursor of the next page.
+    """
+    items: list[Sale]
+    next_cursor: Optional[str] = None
+
 class InventoryChange(BaseModel):
     """
     Schema for summarizing inventory changes.
@@ -67,12 +109,154 @@ class RevenueComparisonResponse(BaseModel):
     class Config:
         orm_mode = True
 
+class PeriodRevenue(BaseModel):
+    """
+    Schema for the revenue of one period and its change from the period before.
+    """
+    start: date
+    end: date
+    revenue: float
+    delta: Optional[float] = None
+    delta_pct: Optional[float] = None
+
+class CategoryPeriodRevenue(BaseModel):
+    """
+    Schema for the per-period revenue of one category.
+    """
+    category: str
+    periods: list[PeriodRevenue]
+
+class RevenuePeriodsComparison(BaseModel):
+    """
+    Schema for comparing revenue across any number of periods.
+    """
+    category: Optional[str] = None
+    periods: list[PeriodRevenue]
+    categories: Optional[list[CategoryPeriodRevenue]] = None
+
+class CategoryRevenue(BaseModel):
+    """
+    Schema for the revenue and units sold of one product category.
+    """
+    category: str
+    total_revenue: float
+    total_quantity: int
+
+class TopSalesEntry(BaseModel):
+    """
+    Schema for one ranked product or category of a top-N report.
+    """
+    product_id: Optional[int] = None  # only when ranking products
+    name: Optional[str] = None
+    category: Optional[str] = None
+    total_revenue: float
+    total_quantity: int
+
+class RevenueReportRequest(BaseModel):
+    """
+    Schema for a background revenue-by-period report, see GET /sales/revenue/{period}.
+    """
+    kind: Literal["revenue"]
+    period: Literal["daily", "weekly", "monthly", "annual"]
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    category: Optional[str] = None
+    product_id: Optional[int] = None
+
+class CompareReportRequest(BaseModel):
+    """
+    Schema for a background period comparison, see GET /sales/compare/revenue/periods.
+    """
+    kind: Literal["compare"]
+    periods: list[tuple[date, date]] = Field(min_length=1, max_length=104)  # inclusive (start, end) intervals
+    category: Optional[str] = None
+    by_category: bool = False
+
+class TopReportRequest(BaseModel):
+    """
+    Schema for a background top-N report, see GET /sales/top.
+    """
+    kind: Literal["top"]
+    by: Literal["product", "category"] = "product"
+    metric: Literal["revenue", "quantity"] = "revenue"
+    limit: int = Field(20, ge=1, le=1000)
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    category: Optional[str] = None
+
+ReportRequest = Annotated[
+    Union[RevenueReportRequest, CompareReportRequest, TopReportRequest],
+    Field(discriminator="kind"),
+]
+
+class ReportJob(BaseModel):
+    """
+    Schema for the status, timing and result of a background report.
+    """
+    id: int
+    kind: str
+    params: dict
+    status: str  # 'queued', 'running', 'succeeded', 'failed' or 'cancelled'
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    duration_ms: Optional[float] = None  # from start to finish
+    result: Optional[Any] = None  # the report, once succeeded
+    error: Optional[str] = None
+
+class StockAsOf(BaseModel):
+    """
+    Schema for the stock of one product at a point in time.
+    """
+    product_id: int
+    name: Optional[str] = None
+    stock: int
+
+class StockAsOfPage(BaseModel):
+    """
+    Schema for one page of point-in-time stock, with the checkpoint it was rebuilt from.
+    """
+    items: list[StockAsOf]
+    snapshot_taken_at: Optional[datetime] = None
+    next_cursor: Optional[str] = None
+
 class InventoryUpdateRequest(BaseModel):
     """
     Schema for updating the stock value of a product.
     """
     new_stock: int
 
+class StockAdjustRequest(BaseModel):
+    """
+    Schema for a relative stock adjustment.
+    """
+    delta: int  # added to the stock; negative to remove stock
+    allow_negative: bool = True  # False refuses adjustments leaving the stock below zero
+
+class StockAdjustResult(BaseModel):
+    """
+    Schema for the outcome of a relative stock adjustment.
+    """
+    product_id: int
+    previous_stock: int
+    new_stock: int
+
+class StockUpdateItem(BaseModel):
+    """
+    Schema for one entry of a batch stock update.
+    """
+    product_id: int
+    new_stock: int
+
+class StockUpdateResult(BaseModel):
+    """
+    Schema for the outcome of one entry of a batch stock update.
+    """
+    product_id: int
+    status: str  # 'updated' or 'not_found'
+    previous_stock: Optional[int] = None
+    new_stock: Optional[int] = None
+
 class InventoryChangeResponse(BaseModel):
     """
     Schema for returning inventory change history.
@@ -86,3 +270,18 @@ class InventoryChangeResponse(BaseModel):
 
     class Config:
         orm_mode = True
+
+class InventoryChangePage(BaseModel):
+    """
+    Schema for one page of a product's inventory change history.
+    """
+    items: list[InventoryChangeResponse]
+    next_cursor: Optional[str] = None
+
+class InventoryNetChange(BaseModel):
+    """
+    Schema for the net stock change of a product over one hour or day.
+    """
+    period_start: datetime
+    net_change: int
+    changes: int
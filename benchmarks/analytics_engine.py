@@ -0,0 +1,118 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import datetime
+import statistics
+import time
+
+import numpy as np
+
+from app.analytics import EPOCH, SalesSnapshot
+
+def timed(call, repeat):
+    """
+    Median wall time of ``call()`` over ``repeat`` runs, in milliseconds.
+    """
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+def synthetic_snapshot(rows, products, categories, years, seed):
+    """
+    Build a snapshot of ``rows`` random sales spread over ``years`` of history.
+    """
+    rng = np.random.default_rng(seed)
+    last_day = (datetime.date.today() - EPOCH).days
+    day = rng.integers(last_day - 365 * years, last_day + 1, rows, dtype=np.int32)
+    product_id = rng.integers(1, products + 1, rows, dtype=np.int32)
+    quantity = rng.integers(1, 6, rows, dtype=np.int32)
+    total_price = quantity * rng.uniform(5, 500, rows)
+    product_categories = {pid: f"Category {pid % categories}" for pid in range(1, products + 1)}
+    return SalesSnapshot.from_arrays(product_id, day, total_price, quantity, product_categories)
+
+def workload(end):
+    """
+    (name, numpy call, sql call) pairs covering the revenue endpoints.
+    """
+    quarter = end - datetime.timedelta(days=90)
+    year = end - datetime.timedelta(days=365)
+    prev_start, prev_end = year - datetime.timedelta(days=365), year - datetime.timedelta(days=1)
+    return [
+        ("revenue daily (90d)",
+         lambda s: s.revenue_by_period("daily", quarter, end),
+         lambda db, crud: crud.get_revenue_by_period(db, "daily", quarter, end)),
+        ("revenue weekly (1y)",
+         lambda s: s.revenue_by_period("weekly", year, end),
+         lambda db, crud: crud.get_revenue_by_period(db, "weekly", year, end)),
+        ("revenue monthly (all)",
+         lambda s: s.revenue_by_period("monthly"),
+         lambda db, crud: crud.get_revenue_by_period(db, "monthly")),
+        ("compare year over year",
+         lambda s: s.compare_revenue(prev_start, prev_end, year, end),
+         lambda db, crud: crud.compare_revenue(db, prev_start, prev_end, year, end)),
+        ("compare yoy, one category",
+         lambda s: s.compare_revenue(prev_start, prev_end, year, end, "Category 1"),
+         lambda db, crud: crud.compare_revenue(db, prev_start, prev_end, year, end, "Category 1")),
+        ("revenue by category (1y)",
+         lambda s: s.revenue_by_category(year, end),
+         lambda db, crud: crud.get_revenue_by_category(db, year, end)),
+    ]
+
+def main():
+    """
+    Benchmarks the NumPy analytics snapshot against the SQL path.
+
+    By default the snapshot is built from synthetic arrays (10M rows) so the
+    NumPy numbers need no database. With --sql the same queries also run
+    through app.crud against the configured database, and with --from-db the
+    snapshot is loaded from it instead, reporting the median time of a full
+    reload (SalesSnapshot.refresh) over --repeat loads; seed the database
+    with the same number of sales for a like-for-like comparison.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark NumPy analytics against SQL.")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--products", type=int, default=5_000)
+    parser.add_argument("--categories", type=int, default=25)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--sql", action="store_true", help="Also time the SQL path")
+    parser.add_argument("--from-db", action="store_true", help="Load the snapshot from the database")
+    args = parser.parse_args()
+
+    if args.from_db:
+        snapshot = SalesSnapshot()
+        load_ms = timed(lambda: snapshot.refresh(full=True), args.repeat)
+        print(f"snapshot: {snapshot.rows:,} rows from database in {load_ms / 1000:.2f}s "
+              f"({snapshot.rows / load_ms * 1000:,.0f} rows/s, median of {args.repeat} full loads)")
+    else:
+        started = time.perf_counter()
+        snapshot = synthetic_snapshot(args.rows, args.products, args.categories, args.years, args.seed)
+        print(f"snapshot: {snapshot.rows:,} rows from synthetic data in {time.perf_counter() - started:.2f}s")
+
+    session = crud = None
+    if args.sql:
+        from app import crud
+        from app.database import SessionLocal
+        session = SessionLocal()
+
+    print(f"{'query':<28}{'numpy ms':>10}{'sql ms':>10}{'speedup':>9}")
+    try:
+        for name, numpy_call, sql_call in workload(datetime.date.today()):
+            numpy_ms = timed(lambda: numpy_call(snapshot), args.repeat)
+            if session is not None:
+                sql_ms = timed(lambda: sql_call(session, crud), args.repeat)
+                print(f"{name:<28}{numpy_ms:>10.2f}{sql_ms:>10.2f}{sql_ms / numpy_ms:>8.1f}x")
+            else:
+                print(f"{name:<28}{numpy_ms:>10.2f}{'-':>10}{'-':>9}")
+    finally:
+        if session is not None:
+            session.close()
+
+if __name__ == "__main__":
+    main()
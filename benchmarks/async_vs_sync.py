@@ -0,0 +1,104 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app import async_crud, crud
+from app.database import AsyncSessionLocal, SessionLocal, async_engine, engine
+
+# (name, sync call, async call) for the endpoints the dashboard hits most.
+WORKLOAD = [
+    ("sales_page",
+     lambda db: crud.get_sales(db, limit=100),
+     lambda db: async_crud.get_sales(db, limit=100)),
+    ("revenue_monthly",
+     lambda db: crud.get_revenue_by_period(db, "monthly"),
+     lambda db: async_crud.get_revenue_by_period(db, "monthly")),
+    ("inventory",
+     lambda db: crud.get_inventory(db, 10),
+     lambda db: async_crud.get_inventory(db, 10)),
+]
+
+def summarize(path, latencies, elapsed):
+    """
+    Format throughput and latency percentiles for one run.
+    """
+    latencies = sorted(latencies)
+    quantiles = statistics.quantiles(latencies, n=100)
+    return (
+        f"{path:<6}{len(latencies):>9}{len(latencies) / elapsed:>12.1f}"
+        f"{quantiles[49] * 1000:>10.2f}{quantiles[94] * 1000:>10.2f}{quantiles[98] * 1000:>10.2f}"
+    )
+
+def run_sync(requests, concurrency):
+    """
+    Replay the workload through the sync crud functions on a thread pool,
+    the way FastAPI runs plain ``def`` endpoints.
+    """
+    def one(call):
+        started = time.perf_counter()
+        db = SessionLocal()
+        try:
+            call(db)
+        finally:
+            db.close()
+        return time.perf_counter() - started
+
+    calls = [WORKLOAD[i % len(WORKLOAD)][1] for i in range(requests)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(one, calls))
+    return latencies, time.perf_counter() - started
+
+async def run_async(requests, concurrency):
+    """
+    Replay the workload through async_crud on the event loop, with at most
+    ``concurrency`` requests in flight.
+    """
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one(call):
+        async with gate:
+            started = time.perf_counter()
+            async with AsyncSessionLocal() as db:
+                await call(db)
+            return time.perf_counter() - started
+
+    calls = [WORKLOAD[i % len(WORKLOAD)][2] for i in range(requests)]
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(one(call) for call in calls))
+    elapsed = time.perf_counter() - started
+    await async_engine.dispose()
+    return latencies, elapsed
+
+def main():
+    """
+    Load test comparing the sync (psycopg2 + threadpool) and async (asyncpg +
+    event loop) database paths on the same mixed dashboard workload. Prints
+    throughput and p50/p95/p99 latency for each path. Size both pools with
+    DB_POOL_SIZE / DB_MAX_OVERFLOW when testing high concurrency.
+    """
+    parser = argparse.ArgumentParser(description="Compare sync and async database paths.")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=40, help="40 matches FastAPI's default threadpool")
+    parser.add_argument("--warmup", type=int, default=50)
+    args = parser.parse_args()
+
+    run_sync(args.warmup, args.concurrency)
+    sync_latencies, sync_elapsed = run_sync(args.requests, args.concurrency)
+    engine.dispose()
+
+    asyncio.run(run_async(args.warmup, args.concurrency))
+    async_latencies, async_elapsed = asyncio.run(run_async(args.requests, args.concurrency))
+
+    print(f"{'path':<6}{'requests':>9}{'req/sec':>12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    print(summarize("sync", sync_latencies, sync_elapsed))
+    print(summarize("async", async_latencies, async_elapsed))
+
+if __name__ == "__main__":
+    main()
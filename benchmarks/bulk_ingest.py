@@ -0,0 +1,69 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import datetime
+import random
+import time
+
+from sqlalchemy import select
+
+from app import async_crud, models, schemas
+from app.database import AsyncSessionLocal, async_engine
+
+def make_batch(product_ids, size):
+    """
+    Build ``size`` random sales for the given products, as the endpoint would
+    receive them after request validation.
+    """
+    now = datetime.datetime.utcnow()
+    return [
+        schemas.SaleCreate(
+            product_id=random.choice(product_ids),
+            quantity=random.randint(1, 5),
+            total_price=round(random.uniform(5, 500), 2),
+            sale_date=now - datetime.timedelta(seconds=random.randint(0, 86400)),
+        )
+        for _ in range(size)
+    ]
+
+async def run(total, batch_size):
+    """
+    Ingest ``total`` sales through async_crud.bulk_create_sales and time it.
+    """
+    async with AsyncSessionLocal() as db:
+        product_ids = (await db.execute(select(models.Product.id))).scalars().all()
+    if not product_ids:
+        raise SystemExit("No products found; populate the database first.")
+
+    batches = [make_batch(product_ids, batch_size) for _ in range(max(total // batch_size, 1))]
+    inserted = 0
+    started = time.perf_counter()
+    for batch in batches:
+        async with AsyncSessionLocal() as db:
+            result = await async_crud.bulk_create_sales(db, batch)
+            inserted += result["inserted"]
+    elapsed = time.perf_counter() - started
+    await async_engine.dispose()
+    return inserted, elapsed
+
+def main():
+    """
+    Measures bulk sale ingestion throughput (COPY into staging, set-based
+    stock decrement and inventory rows) on a single process. Request parsing
+    and validation are excluded; the rows written are real, so run it against
+    a scratch database.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark POST /sales/bulk ingestion.")
+    parser.add_argument("--total", type=int, default=500_000, help="Sales to ingest")
+    parser.add_argument("--batch-size", type=int, default=10_000, help="Sales per request")
+    args = parser.parse_args()
+
+    inserted, elapsed = asyncio.run(run(args.total, args.batch_size))
+    print(f"inserted {inserted} sales in {elapsed:.2f}s: {inserted / elapsed:,.0f} sales/sec "
+          f"({args.batch_size} per batch, {elapsed / max(inserted // args.batch_size, 1) * 1000:.1f} ms per batch)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import datetime
+import math
+import statistics
+import time
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app import crud, models
+from app.database import SessionLocal
+from app.embedded import EmbeddedAnalytics
+
+def timed(call, repeat):
+    """
+    Median wall time of ``call()`` over ``repeat`` runs, in milliseconds, and its last result.
+    """
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = call()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), result
+
+def same(a, b):
+    """
+    Whether two reports are equal, allowing for float summation order.
+    """
+    if isinstance(a, float) and isinstance(b, float):
+        return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-6)
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(same(a[key], b[key]) for key in a)
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return len(a) == len(b) and all(same(x, y) for x, y in zip(a, b))
+    return a == b
+
+def workload(end, category):
+    """
+    (name, call(db)) pairs covering the analytics endpoints.
+    """
+    quarter = end - datetime.timedelta(days=90)
+    year = end - datetime.timedelta(days=365)
+    weeks = [(end - datetime.timedelta(days=7 * (n + 1) - 1), end - datetime.timedelta(days=7 * n)) for n in range(52)][::-1]
+    return [
+        ("revenue daily (90d)", lambda db: crud.get_revenue_by_period(db, "daily", quarter, end)),
+        ("revenue weekly (1y)", lambda db: crud.get_revenue_by_period(db, "weekly", year, end)),
+        ("revenue monthly (all)", lambda db: crud.get_revenue_by_period(db, "monthly")),
+        ("revenue monthly, category", lambda db: crud.get_revenue_by_period(db, "monthly", category=category)),
+        ("compare 52 weeks", lambda db: crud.compare_revenue_periods(db, weeks)),
+        ("compare 52 weeks by cat.", lambda db: crud.compare_revenue_periods(db, weeks, by_category=True)),
+        ("revenue by category (1y)", lambda db: crud.get_revenue_by_category(db, year, end)),
+        ("top 20 products (1y)", lambda db: crud.get_top_sales(db, "product", "revenue", 20, year, end)),
+        ("top 10 categories", lambda db: crud.get_top_sales(db, "category", "quantity", 10)),
+    ]
+
+def main():
+    """
+    Benchmarks the embedded SQLite analytics backend against PostgreSQL.
+
+    The embedded copy is loaded from the configured database (the load time
+    and size are reported), then every query runs through the same app.crud
+    function on both, so both answer over the same data; seed the database
+    with demo_data/generate_sales_data.py first for a synthetic dataset of
+    the size to compare. Reports that differ between the two fail the run.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark embedded SQLite analytics against PostgreSQL.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per query (median reported)")
+    parser.add_argument("--path", default="", help="SQLite file of the copy (default: a temporary file)")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        end = db.execute(select(func.max(models.SalesDailyRollup.day))).scalar()
+        category = db.execute(select(func.min(models.Product.category))).scalar()
+    if end is None:
+        raise SystemExit("The database has no sales; seed it first (see demo_data/generate_sales_data.py).")
+
+    embedded = EmbeddedAnalytics(args.path)
+    started = time.perf_counter()
+    embedded.refresh(full=True)
+    load_seconds = time.perf_counter() - started
+    refresh_ms, _ = timed(embedded.refresh, args.repeat)
+    with Session(embedded.engine) as db:
+        rows = db.execute(select(func.count()).select_from(models.SalesDailyRollup)).scalar()
+    print(f"embedded copy: {rows:,} rollup rows, {os.path.getsize(embedded.path) / 2**20:.1f} MiB, "
+          f"full load {load_seconds:.2f}s, refresh without new sales {refresh_ms:.1f}ms")
+
+    mismatched = []
+    print(f"{'query':<28}{'postgres ms':>13}{'sqlite ms':>11}{'ratio':>8}")
+    try:
+        with SessionLocal() as postgres, Session(embedded.engine) as sqlite:
+            for name, call in workload(end, category):
+                postgres_ms, expected = timed(lambda: call(postgres), args.repeat)
+                sqlite_ms, result = timed(lambda: call(sqlite), args.repeat)
+                print(f"{name:<28}{postgres_ms:>13.2f}{sqlite_ms:>11.2f}{postgres_ms / sqlite_ms:>7.1f}x")
+                if not same(expected, result):
+                    mismatched.append(name)
+    finally:
+        asyncio.run(embedded.close())
+
+    if mismatched:
+        print(f"Reports differ between backends: {', '.join(mismatched)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
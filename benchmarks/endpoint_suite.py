@@ -0,0 +1,247 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import datetime
+import json
+import random
+import statistics
+import subprocess
+import time
+
+from sqlalchemy import func
+
+from app import config, models
+from app.analytics import sales_snapshot
+from app.cache import report_cache
+from app.database import SessionLocal, async_engine
+from app.embedded import embedded_analytics
+from app.main import app
+from app.metrics import registry, route_template
+
+GENERATOR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "demo_data", "generate_sales_data.py")
+
+# Compared against the baseline: (result key, True if higher is better).
+COMPARED = [("p95_ms", False), ("rps", True), ("queries_per_request", False)]
+
+def workload(product_ids, last_day):
+    """
+    (name, request factory) per route; factories return (method, path, query, body).
+    """
+    def day(offset):
+        return (last_day - datetime.timedelta(days=offset)).isoformat()
+
+    def product():
+        return random.choice(product_ids)
+
+    return [
+        ("GET /sales/", lambda: ("GET", "/sales/", "limit=100", None)),
+        ("GET /sales/ (month, product)", lambda: (
+            "GET", "/sales/", f"limit=100&start_date={day(30)}&end_date={day(0)}&product_id={product()}", None)),
+        ("GET /sales/revenue/daily", lambda: ("GET", "/sales/revenue/daily", f"start_date={day(90)}&end_date={day(0)}", None)),
+        ("GET /sales/revenue/monthly", lambda: ("GET", "/sales/revenue/monthly", "", None)),
+        ("GET /sales/compare/revenue", lambda: (
+            "GET", "/sales/compare/revenue",
+            f"start1={day(729)}&end1={day(365)}&start2={day(364)}&end2={day(0)}", None)),
+        ("GET /sales/compare/revenue/periods", lambda: (
+            "GET", "/sales/compare/revenue/periods",
+            "&".join(f"periods={day(7 * week + 6)}/{day(7 * week)}" for week in range(12)) + "&by_category=true", None)),
+        ("GET /sales/top", lambda: ("GET", "/sales/top", f"start_date={day(365)}&end_date={day(0)}", None)),
+        ("GET /sales/categories/revenue", lambda: ("GET", "/sales/categories/revenue", f"start_date={day(365)}", None)),
+        ("GET /inventory/", lambda: ("GET", "/inventory/", "low_stock_threshold=50", None)),
+        ("PUT /inventory/{id}/stock", lambda: (
+            "PUT", f"/inventory/{product()}/stock", "", {"new_stock": random.randint(20, 500)})),
+        ("POST /inventory/{id}/adjust", lambda: (
+            "POST", f"/inventory/{product()}/adjust", "", {"delta": random.randint(-5, 5)})),
+        ("GET /inventory/{id}/changes", lambda: ("GET", f"/inventory/{product()}/changes", "", None)),
+        ("POST /products/", lambda: (
+            "POST", "/products/", "",
+            {"name": f"Bench {random.getrandbits(32):08x}", "category": "Benchmark", "price": 9.99, "stock": 10})),
+    ]
+
+async def asgi_request(method, path, query="", body=None):
+    """
+    Send one request straight into the ASGI app and return the response status.
+    Bypasses the network and server so the numbers isolate app and database time.
+    """
+    payload = json.dumps(body).encode() if body is not None else b""
+    headers = [(b"host", b"bench")]
+    if body is not None:
+        headers.append((b"content-type", b"application/json"))
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "scheme": "http",
+        "method": method, "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+        "root_path": "", "headers": headers, "client": ("127.0.0.1", 0), "server": ("bench", 80),
+        "app": app,
+    }
+    status = None
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            await asyncio.Event().wait()  # the client never disconnects
+        sent = True
+        return {"type": "http.request", "body": payload, "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+async def run_route(make_request, requests, concurrency):
+    """
+    Fire ``requests`` requests at one route with at most ``concurrency`` in flight.
+
+    Returns:
+        tuple: Latencies in seconds, number of non-2xx responses and elapsed time.
+    """
+    gate = asyncio.Semaphore(concurrency)
+    errors = 0
+
+    async def one():
+        nonlocal errors
+        async with gate:
+            started = time.perf_counter()
+            status = await asgi_request(*make_request())
+            if not 200 <= status < 300:
+                errors += 1
+            return time.perf_counter() - started
+
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(one() for _ in range(requests)))
+    return latencies, errors, time.perf_counter() - started
+
+def route_label(method, path):
+    return route_template({"type": "http", "method": method, "path": path, "app": app, "root_path": ""})
+
+async def run_suite(requests, concurrency, warmup, only):
+    """
+    Benchmark every route against the data currently in the database.
+
+    Returns:
+        dict: Results per route name.
+    """
+    with SessionLocal() as db:
+        product_ids = [row.id for row in db.query(models.Product.id).limit(10_000)]
+        last_sale = db.query(func.max(models.Sale.sale_date)).scalar()
+    if not product_ids or last_sale is None:
+        raise SystemExit("The database has no products or sales; seed it first (see --sizes).")
+    if config.ANALYTICS_BACKEND == "numpy":
+        await asyncio.to_thread(sales_snapshot.refresh, True)
+    elif config.ANALYTICS_BACKEND == "sqlite":
+        await asyncio.to_thread(embedded_analytics.refresh, True)
+
+    results = {}
+    for name, make_request in workload(product_ids, last_sale.date()):
+        if only and name not in only:
+            continue
+        route = route_label(*make_request()[:2])
+        report_cache.clear()
+        await run_route(make_request, warmup, concurrency)
+        statements_before = registry.sql_statements[route]
+        latencies, errors, elapsed = await run_route(make_request, requests, concurrency)
+        quantiles = statistics.quantiles(latencies, n=100)
+        results[name] = {
+            "requests": requests,
+            "errors": errors,
+            "rps": round(requests / elapsed, 1),
+            "p50_ms": round(quantiles[49] * 1000, 2),
+            "p95_ms": round(quantiles[94] * 1000, 2),
+            "p99_ms": round(quantiles[98] * 1000, 2),
+            "queries_per_request": round((registry.sql_statements[route] - statements_before) / requests, 2),
+        }
+        print(format_row(name, results[name]), flush=True)
+    await async_engine.dispose()
+    return results
+
+def format_row(name, result):
+    return (
+        f"{name:<32}{result['rps']:>10.1f}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}"
+        f"{result['p99_ms']:>10.2f}{result['queries_per_request']:>9.2f}{result['errors']:>8}"
+    )
+
+def compare(results, baseline, threshold):
+    """
+    List the regressions of ``results`` beyond ``threshold`` percent of ``baseline``.
+    """
+    regressions = []
+    for size, routes in results.items():
+        for name, result in routes.items():
+            if result["errors"]:
+                regressions.append(f"{size} {name}: {result['errors']} failed requests")
+            before = baseline.get(size, {}).get(name)
+            if before is None:
+                continue
+            for key, higher_is_better in COMPARED:
+                old, new = before[key], result[key]
+                if not old:
+                    continue
+                change = (old - new if higher_is_better else new - old) / old * 100
+                if change > threshold:
+                    regressions.append(f"{size} {name}: {key} {old} -> {new} ({change:.0f}% worse)")
+    return regressions
+
+def main():
+    """
+    Benchmarks every API route in-process against a local Postgres and
+    compares the results with a stored baseline.
+
+    For each --sizes scale factor the database is reseeded with
+    demo_data/generate_sales_data.py (destroying its data), then every route
+    is driven with --concurrency requests in flight. Throughput, p50/p95/p99
+    latency and SQL statements per request (from app.metrics) are recorded.
+    Without --sizes the data already in the database is used. The report
+    cache is cleared before each route and disabled unless --cache is given,
+    so the numbers reflect the database path.
+
+    With --baseline the run exits with status 1 when any route's p95 latency,
+    throughput or queries per request is worse than the baseline by more
+    than --threshold percent, or when any request fails.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark every route and check for regressions.")
+    parser.add_argument("--sizes", help="Comma-separated generator scale factors to seed, e.g. 0.1,1,10 (destroys data)")
+    parser.add_argument("--requests", type=int, default=500, help="Measured requests per route")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests per route")
+    parser.add_argument("--routes", help="Comma-separated route names to run (default: all)")
+    parser.add_argument("--cache", action="store_true", help="Keep the report cache enabled")
+    parser.add_argument("--output", help="Write the results as JSON")
+    parser.add_argument("--baseline", help="Baseline JSON written earlier with --output")
+    parser.add_argument("--threshold", type=float, default=20.0, help="Allowed regression in percent")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    if not args.cache:
+        report_cache.max_entries = 0
+    only = set(args.routes.split(",")) if args.routes else None
+
+    results = {}
+    for size in (args.sizes.split(",") if args.sizes else ["current"]):
+        if size != "current":
+            subprocess.run([sys.executable, GENERATOR, "--scale", size, "--defer-indexes", "--seed", str(args.seed)], check=True)
+        print(f"\n== {size} ==")
+        print(f"{'route':<32}{'req/sec':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>9}{'errors':>8}")
+        results[size] = asyncio.run(run_suite(args.requests, args.concurrency, args.warmup, only))
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            regressions = compare(results, json.load(fh), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No route regressed by more than {args.threshold:.0f}%.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import json
+import resource
+import subprocess
+import time
+
+def peak_rss_mb():
+    """
+    Peak resident set size of this process in MiB (ru_maxrss is KiB on Linux).
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def run_mode(mode, export_format, filters):
+    """
+    Export the matching sales once in this process and return the measurements.
+
+    'stream' consumes GET /sales/export's generator; 'list' loads the same rows
+    through crud.get_sales and schemas.Sale like paging /sales/ does.
+    """
+    from app import crud, schemas
+    from app.database import SessionLocal
+    from app.routers.sales import export_sales_chunks
+
+    baseline = peak_rss_mb()
+    started = time.perf_counter()
+    rows = 0
+    size = 0
+
+    if mode == "stream":
+        async def consume():
+            nonlocal rows, size
+            async for chunk in export_sales_chunks(export_format, **filters):
+                size += len(chunk)
+                rows += chunk.count("\n")
+
+        asyncio.run(consume())
+        if export_format == "csv":
+            rows -= 1  # header line
+    else:
+        db = SessionLocal()
+        try:
+            page = crud.get_sales(db, limit=10 ** 9, **filters)
+            payload = [schemas.Sale.model_validate(sale, from_attributes=True).model_dump_json() for sale in page["items"]]
+            rows = len(payload)
+            size = sum(len(line) + 1 for line in payload)
+        finally:
+            db.close()
+
+    elapsed = time.perf_counter() - started
+    return {
+        "mode": mode,
+        "rows": rows,
+        "seconds": round(elapsed, 3),
+        "rows_per_sec": round(rows / elapsed) if elapsed else 0,
+        "bytes": size,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "rss_growth_mb": round(peak_rss_mb() - baseline, 1),
+    }
+
+def main():
+    """
+    Benchmarks the streaming sales export against loading the same rows in
+    memory. Each mode runs in its own subprocess because peak RSS never goes
+    down within a process. Requires a database populated with sales, e.g.
+    through demo_data.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the streaming sales export.")
+    parser.add_argument("--format", default="csv", choices=["csv", "ndjson"])
+    parser.add_argument("--start-date")
+    parser.add_argument("--end-date")
+    parser.add_argument("--category")
+    parser.add_argument("--modes", default="stream,list", help="Comma separated: stream, list")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    filters = {"start_date": args.start_date, "end_date": args.end_date, "category": args.category}
+
+    if args.child:
+        print(json.dumps(run_mode(args.child, args.format, filters)))
+        return
+
+    print(f"{'mode':<8}{'rows':>12}{'seconds':>10}{'rows/sec':>12}{'peak RSS MiB':>14}{'RSS growth MiB':>16}")
+    for mode in args.modes.split(","):
+        child = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", mode] + sys.argv[1:],
+            capture_output=True, text=True, check=True,
+        )
+        result = json.loads(child.stdout.strip().splitlines()[-1])
+        print(
+            f"{result['mode']:<8}{result['rows']:>12}{result['seconds']:>10}"
+            f"{result['rows_per_sec']:>12}{result['peak_rss_mb']:>14}{result['rss_growth_mb']:>16}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import statistics
+import time
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+
+from app import crud, models, schemas
+from app.database import SessionLocal
+
+def orm_sales(db, rows):
+    """
+    The previous /sales/ path: ORM objects, response-model validation and the
+    standard JSON encoder.
+    """
+    sales = (
+        db.query(models.Sale).join(models.Product)
+        .order_by(models.Sale.sale_date.desc(), models.Sale.id.desc())
+        .limit(rows).all()
+    )
+    adapter = TypeAdapter(schemas.SalePage)
+    page = adapter.validate_python({"items": sales, "next_cursor": None}, from_attributes=True)
+    return JSONResponse(adapter.dump_python(page, mode="json")).body
+
+def core_sales(db, rows):
+    """
+    The current /sales/ path: Core rows serialized with orjson.
+    """
+    page = crud.get_sales(db, limit=rows)
+    page["next_cursor"] = None
+    return ORJSONResponse(page).body
+
+def orm_inventory(db, rows):
+    """
+    The previous /inventory/ path, limited to ``rows`` products.
+    """
+    products = db.query(models.Product).order_by(models.Product.id.desc()).limit(rows).all()
+    adapter = TypeAdapter(list[schemas.Product])
+    return JSONResponse(adapter.dump_python(adapter.validate_python(products, from_attributes=True), mode="json")).body
+
+def core_inventory(db, rows):
+    """
+    The current /inventory/ path, limited to ``rows`` products.
+    """
+    return ORJSONResponse(crud.get_inventory(db)[:rows]).body
+
+PATHS = [
+    ("sales", orm_sales, core_sales),
+    ("inventory", orm_inventory, core_inventory),
+]
+
+def measure(build, rows, repeat):
+    """
+    Build the response body ``repeat`` times in a fresh session each time.
+
+    Returns:
+        tuple: Median seconds per response and the last body.
+    """
+    timings = []
+    for _ in range(repeat):
+        db = SessionLocal()
+        try:
+            started = time.perf_counter()
+            body = build(db, rows)
+            timings.append(time.perf_counter() - started)
+        finally:
+            db.close()
+    return statistics.median(timings), body
+
+def main():
+    """
+    Compares the ORM + response-model list path with the Core + orjson path
+    for GET /sales/ and GET /inventory/, timing query, row handling and JSON
+    rendering of one response of --rows rows. Both bodies are decoded and
+    compared, so a difference in the JSON returned fails the run. Requires a
+    database with at least --rows sales (e.g. from demo_data); /inventory/
+    returns the whole catalog, so it is capped at the same number of rows.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark ORM vs Core+orjson list responses.")
+    parser.add_argument("--rows", type=int, default=10_000, help="Rows per response")
+    parser.add_argument("--repeat", type=int, default=20, help="Responses per path (median reported)")
+    args = parser.parse_args()
+
+    print(f"{'endpoint':<12}{'rows':>8}{'orm ms':>10}{'core ms':>10}{'speedup':>9}{'KiB':>9}")
+    mismatched = []
+    for name, orm_path, core_path in PATHS:
+        orm_seconds, orm_body = measure(orm_path, args.rows, args.repeat)
+        core_seconds, core_body = measure(core_path, args.rows, args.repeat)
+        decoded = json.loads(core_body)
+        rows = len(decoded["items"] if isinstance(decoded, dict) else decoded)
+        print(f"{name:<12}{rows:>8}{orm_seconds * 1000:>10.1f}{core_seconds * 1000:>10.1f}"
+              f"{orm_seconds / core_seconds:>8.1f}x{len(core_body) / 1024:>9.0f}")
+        if json.loads(orm_body) != decoded:
+            mismatched.append(name)
+
+    if mismatched:
+        print(f"Responses differ between paths: {', '.join(mismatched)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+import random
+import time
+
+from sqlalchemy import func, select
+
+from app import async_crud, models, schemas
+from app.database import AsyncSessionLocal, async_engine
+
+INITIAL_STOCK = 1_000_000
+
+async def put_delta(product_id, delta):
+    """
+    What a client of PUT /inventory/{id}/stock has to do: read the stock,
+    then write back the adjusted value.
+    """
+    async with AsyncSessionLocal() as db:
+        product = await async_crud.get_product(db, product_id)
+        await async_crud.update_inventory(db, product, product.stock + delta)
+
+async def adjust_delta(product_id, delta):
+    """
+    POST /inventory/{id}/adjust: one atomic statement.
+    """
+    async with AsyncSessionLocal() as db:
+        await async_crud.adjust_inventory(db, product_id, delta)
+
+async def run_path(name, apply, deltas, concurrency):
+    """
+    Apply ``deltas`` to a fresh product with at most ``concurrency`` in flight
+    and compare the final stock and the logged changes with the expected total.
+    """
+    async with AsyncSessionLocal() as db:
+        product = await async_crud.create_product(db, schemas.ProductCreate(
+            name=f"Bench stock {name} {random.getrandbits(32):08x}", category="Benchmark",
+            price=1.0, stock=INITIAL_STOCK,
+        ))
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one(delta):
+        async with gate:
+            await apply(product.id, delta)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(delta) for delta in deltas))
+    elapsed = time.perf_counter() - started
+
+    async with AsyncSessionLocal() as db:
+        stock = await db.scalar(select(models.Product.stock).where(models.Product.id == product.id))
+        logged = await db.scalar(
+            select(func.count()).select_from(models.InventoryChange)
+            .where(models.InventoryChange.product_id == product.id)
+        )
+    expected = INITIAL_STOCK + sum(deltas)
+    print(f"{name:<8}{len(deltas) / elapsed:>12.1f}{expected:>12}{stock:>12}{stock - expected:>+12}{logged:>10}")
+    return stock == expected
+
+async def run(operations, concurrency):
+    deltas = [random.choice((-1, 1)) * random.randint(1, 5) for _ in range(operations)]
+    print(f"{'path':<8}{'ops/sec':>12}{'expected':>12}{'final':>12}{'diff':>12}{'logged':>10}")
+    consistent = {
+        "PUT": await run_path("PUT", put_delta, deltas, concurrency),
+        "adjust": await run_path("adjust", adjust_delta, deltas, concurrency),
+    }
+    await async_engine.dispose()
+    return consistent
+
+def main():
+    """
+    Applies the same random stock deltas concurrently to one product, once
+    through read-then-set updates (the PUT endpoint) and once through atomic
+    adjustments, and reports throughput and lost updates for each. Exits with
+    status 1 if any adjustment is lost; the PUT path is expected to lose some
+    under concurrency. Each run creates a product in the "Benchmark" category,
+    so use a scratch database.
+    """
+    parser = argparse.ArgumentParser(description="Compare PUT and atomic stock adjustments on one product.")
+    parser.add_argument("--operations", type=int, default=2000, help="Stock changes per path")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    consistent = asyncio.run(run(args.operations, args.concurrency))
+    if not consistent["adjust"]:
+        print("Atomic adjustments lost updates.")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
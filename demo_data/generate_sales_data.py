@@ -0,0 +1,263 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import datetime
+import io
+import multiprocessing
+import time
+
+import numpy as np
+from sqlalchemy import text
+
+from app import crud, models
+from app.database import SessionLocal, engine
+
+PRODUCT_COPY = "COPY products (id, name, category, price, stock) FROM STDIN"
+SALE_COPY = "COPY sales (id, product_id, quantity, total_price, sale_date) FROM STDIN"
+CHANGE_COPY = "COPY inventory_changes (product_id, previous_stock, new_stock, change_amount, timestamp) FROM STDIN"
+LOG_COPY = "COPY inventory_logs (product_id, change, reason, timestamp) FROM STDIN"
+
+WEEKDAY_WEIGHTS = np.array([0.9, 0.9, 0.95, 1.0, 1.1, 1.3, 1.2])  # Monday..Sunday
+SEASON_PEAK_DAY = 350  # day of year with the most sales (mid December)
+
+# Set in every worker by init_worker(), so the catalog is pickled once per process.
+_worker = {}
+
+def copy_buffer(*columns):
+    """
+    Render equally long columns as a COPY text-format buffer.
+    """
+    rendered = [np.asarray(column).astype(str) for column in columns]
+    return io.StringIO("\n".join(map("\t".join, zip(*rendered))) + "\n")
+
+def build_catalog(rng, products, categories, popularity_skew):
+    """
+    Random products with skewed category sizes and Zipf-like popularity.
+
+    Returns:
+        dict: Per-product arrays indexed by product_id - 1.
+    """
+    category_weights = 1 / np.arange(1, categories + 1) ** 0.8
+    category = rng.choice(categories, size=products, p=category_weights / category_weights.sum())
+    price = np.round(np.exp(rng.normal(3.5, 1.0, products)), 2).clip(0.99, 9999.99)
+    stock = rng.integers(20, 500, products)
+    popularity = 1 / rng.permutation(np.arange(1, products + 1)) ** popularity_skew
+    return {
+        "category": category,
+        "price": price,
+        "stock": stock,
+        "popularity_cdf": np.cumsum(popularity) / popularity.sum(),
+    }
+
+def daily_sales(rng, days, sales_per_day, seasonality, growth):
+    """
+    Number of sales per day: yearly season, weekday pattern and steady growth,
+    scaled so the last day of history averages ``sales_per_day``.
+    """
+    years_before_end = (days[-1] - days).astype(np.int64) / 365.25
+    day_of_year = (days - days.astype("datetime64[Y]")).astype(np.int64)
+    weekday = (days.astype(np.int64) + 3) % 7  # 1970-01-01 was a Thursday
+    expected = (
+        sales_per_day
+        * (1 + growth) ** -years_before_end
+        * (1 + seasonality * np.cos(2 * np.pi * (day_of_year - SEASON_PEAK_DAY) / 365.25))
+        * WEEKDAY_WEIGHTS[weekday] / WEEKDAY_WEIGHTS.mean()
+    )
+    return rng.poisson(expected)
+
+def init_worker(catalog, seed, batch_rows, now):
+    engine.dispose(close=False)  # never share the parent's connections after fork
+    _worker.update(catalog=catalog, seed=seed, batch_rows=batch_rows, now=now)
+
+def inventory_rows(month_start, product_id, quantity, sale_date, stock):
+    """
+    Inventory changes and logs matching one month of sales.
+
+    Every product starts the month at its catalog stock, is restocked at the
+    start of the month by what it sells during it, and gets one 'Sold' entry
+    per day with sales. Stock therefore chains from entry to entry and ends
+    every month back at the catalog stock.
+    """
+    day = (sale_date.astype("datetime64[D]") - month_start).astype(np.int64)
+    order = np.argsort(product_id.astype(np.int64) * 31 + day, kind="stable")  # keeps time order within a day
+    group_key = product_id[order].astype(np.int64) * 31 + day[order]
+    starts = np.flatnonzero(np.r_[True, group_key[1:] != group_key[:-1]])
+    ends = np.r_[starts[1:], len(order)]
+
+    group_product = product_id[order][starts]
+    sold = np.add.reduceat(quantity[order], starts)
+    sold_at = sale_date[order][ends - 1]  # last sale of the day
+
+    product_starts = np.flatnonzero(np.r_[True, group_product[1:] != group_product[:-1]])
+    segment = np.repeat(np.arange(len(product_starts)), np.diff(np.r_[product_starts, len(sold)]))
+    month_sold = np.add.reduceat(sold, product_starts)
+    sold_before = np.cumsum(sold) - sold
+    sold_before -= sold_before[product_starts][segment]
+
+    restock_product = group_product[product_starts]
+    target = stock[restock_product - 1]
+    previous = stock[group_product - 1] + month_sold[segment] - sold_before
+    restocked_at = np.full(len(restock_product), month_start.astype("datetime64[s]"))
+
+    changes = copy_buffer(
+        np.r_[restock_product, group_product],
+        np.r_[target, previous],
+        np.r_[target + month_sold, previous - sold],
+        np.r_[month_sold, -sold],
+        np.r_[restocked_at, sold_at],
+    )
+    logs = copy_buffer(
+        np.r_[restock_product, group_product],
+        np.r_[month_sold, -sold],
+        np.r_[np.full(len(restock_product), "Restock"), np.full(len(group_product), "Sold")],
+        np.r_[restocked_at, sold_at],
+    )
+    return changes, logs
+
+def load_month(task):
+    """
+    Generate and COPY one month of sales with its inventory history, in one
+    transaction. Runs in a worker process.
+
+    Returns:
+        tuple: The month and the number of sales loaded.
+    """
+    month_index, days, counts, first_id = task
+    catalog = _worker["catalog"]
+    rng = np.random.default_rng([_worker["seed"], month_index])
+
+    total = int(counts.sum())
+    sale_date = np.repeat(days.astype("datetime64[s]"), counts)
+    sale_date = np.sort(sale_date + rng.integers(0, 86400, total).astype("timedelta64[s]"))
+    sale_date = np.minimum(sale_date, _worker["now"])
+    product_id = np.minimum(
+        np.searchsorted(catalog["popularity_cdf"], rng.random(total), side="right") + 1,
+        len(catalog["price"]),
+    )
+    quantity = np.minimum(rng.geometric(0.55, total), 10)
+    total_price = np.round(catalog["price"][product_id - 1] * quantity, 2)
+    sale_id = np.arange(first_id, first_id + total)
+
+    conn = engine.raw_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SET statement_timeout = 0")
+        batch_rows = _worker["batch_rows"]
+        for lo in range(0, total, batch_rows):
+            hi = lo + batch_rows
+            cursor.copy_expert(SALE_COPY, copy_buffer(
+                sale_id[lo:hi], product_id[lo:hi], quantity[lo:hi], total_price[lo:hi], sale_date[lo:hi]
+            ))
+        if total:
+            changes, logs = inventory_rows(days[0].astype("datetime64[M]").astype("datetime64[D]"),
+                                           product_id, quantity, sale_date, catalog["stock"])
+            cursor.copy_expert(CHANGE_COPY, changes)
+            cursor.copy_expert(LOG_COPY, logs)
+        conn.commit()
+    finally:
+        conn.close()
+    return str(days[0].astype("datetime64[M]")), total
+
+def reset_tables(db, catalog):
+    """
+    Empty the sales, inventory and product tables and load the catalog.
+    """
+    db.execute(text("SET statement_timeout = 0"))
+    db.execute(text(
+        "TRUNCATE sales, sales_daily_rollup, inventory_changes, inventory_logs, products RESTART IDENTITY CASCADE"
+    ))
+    products = len(catalog["price"])
+    product_id = np.arange(1, products + 1)
+    cursor = db.connection().connection.cursor()
+    cursor.copy_expert(PRODUCT_COPY, copy_buffer(
+        product_id,
+        np.char.add("Product ", product_id.astype(str)),
+        np.char.add("Category ", (catalog["category"] + 1).astype(str)),
+        catalog["price"],
+        catalog["stock"],
+    ))
+    db.execute(text("SELECT setval(pg_get_serial_sequence('products', 'id'), :n)"), {"n": products})
+    db.commit()
+
+def main():
+    """
+    Generates a production-scale dataset: a product catalog with skewed
+    popularity and years of seasonal sales, with inventory_changes and
+    inventory_logs that chain consistently with the sales. Each month is
+    generated with NumPy and streamed with COPY by a pool of worker
+    processes. Clears existing products, sales and inventory history first.
+
+    --scale 1 is about 1M sales; --scale 100 about 100M. Explicit sizes
+    override the scale. Needs a migrated database; monthly partitions for
+    the whole history are created before loading.
+    """
+    parser = argparse.ArgumentParser(description="Load synthetic products, sales and inventory history.")
+    parser.add_argument("--scale", type=float, default=1.0, help="Scale factor (1 = 1,000 products and sales per day)")
+    parser.add_argument("--products", type=int, help="Number of products (default 1,000 x scale)")
+    parser.add_argument("--categories", type=int, default=25)
+    parser.add_argument("--sales-per-day", type=float, help="Average daily sales at the end of history (default 1,000 x scale)")
+    parser.add_argument("--years", type=float, default=3.0, help="Years of history up to today")
+    parser.add_argument("--seasonality", type=float, default=0.35, help="Amplitude of the yearly season, 0 to disable")
+    parser.add_argument("--growth", type=float, default=0.15, help="Yearly growth of sales volume")
+    parser.add_argument("--popularity-skew", type=float, default=1.1, help="Zipf exponent of product popularity")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Loader processes")
+    parser.add_argument("--batch-rows", type=int, default=500_000, help="Sales per COPY statement")
+    parser.add_argument("--defer-indexes", action="store_true",
+                        help="Drop the sales indexes while loading and rebuild them afterwards")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    products = args.products or max(int(1000 * args.scale), 1)
+    sales_per_day = args.sales_per_day or 1000 * args.scale
+    rng = np.random.default_rng(args.seed)
+    now = np.datetime64(datetime.datetime.utcnow().replace(microsecond=0), "s")
+    today = now.astype("datetime64[D]")
+    days = np.arange(today - int(args.years * 365.25) + 1, today + 1)
+
+    catalog = build_catalog(rng, products, args.categories, args.popularity_skew)
+    counts = daily_sales(rng, days, sales_per_day, args.seasonality, args.growth)
+    months = days.astype("datetime64[M]")
+    month_starts = np.flatnonzero(np.r_[True, months[1:] != months[:-1]])
+    month_ends = np.r_[month_starts[1:], len(days)]
+    first_ids = np.r_[0, np.cumsum(counts)][month_starts] + 1  # ids grow with sale_date
+    tasks = [
+        (index, days[lo:hi], counts[lo:hi], int(first_id))
+        for index, (lo, hi, first_id) in enumerate(zip(month_starts, month_ends, first_ids))
+    ]
+    total = int(counts.sum())
+    print(f"{products:,} products, {total:,} sales over {len(days)} days in {len(tasks)} months")
+
+    started = time.perf_counter()
+    sales_indexes = list(models.Sale.__table__.indexes)
+    db = SessionLocal()
+    try:
+        reset_tables(db, catalog)
+        crud.create_sales_partitions(db, since=days[0].item())
+        if args.defer_indexes:
+            for index in sales_indexes:
+                index.drop(bind=db.connection(), checkfirst=True)
+            db.commit()
+
+        with multiprocessing.Pool(args.workers, init_worker, (catalog, args.seed, args.batch_rows, now)) as pool:
+            loaded = 0
+            for month, rows in pool.imap_unordered(load_month, tasks):
+                loaded += rows
+                elapsed = time.perf_counter() - started
+                print(f"{month}: {rows:,} sales ({loaded:,}/{total:,}, {loaded / elapsed:,.0f} rows/s)")
+
+        db.execute(text("SET statement_timeout = 0"))
+        db.execute(text("SELECT setval(pg_get_serial_sequence('sales', 'id'), :n, :called)"),
+                   {"n": max(total, 1), "called": total > 0})
+        if args.defer_indexes:
+            for index in sales_indexes:
+                index.create(bind=db.connection(), checkfirst=True)
+        db.execute(text("ANALYZE products, sales, sales_daily_rollup, inventory_changes, inventory_logs"))
+        db.commit()
+    finally:
+        db.close()
+    print(f"Loaded {total:,} sales in {time.perf_counter() - started:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import datetime
+
+from sqlalchemy import event
+
+from app import crud
+from app.database import SessionLocal, engine
+
+def capture_statements(call):
+    """
+    Run ``call(session)`` and return every (statement, parameters) it executed.
+    """
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    session = SessionLocal()
+    try:
+        call(session)
+    finally:
+        session.close()
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return captured
+
+def explain(statement, parameters):
+    """
+    Return the JSON plan of a captured statement.
+    """
+    with engine.connect() as conn:
+        return conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).scalar()[0]["Plan"]
+
+def plan_nodes(plan):
+    """
+    Yield every node of a JSON plan tree.
+    """
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+def scanned_relations(plan):
+    return {node["Relation Name"] for node in plan_nodes(plan) if "Relation Name" in node}
+
+def sales_partitions(relations):
+    return {name for name in relations if name == "sales" or name.startswith("sales_y") or name == "sales_default"}
+
+def month_partition(day):
+    return f"sales_y{day:%Y}m{day:%m}"
+
+def check(name, call, expect):
+    """
+    Explain every statement ``call`` runs and apply ``expect`` to the scanned
+    relations of the main one (the last statement).
+    """
+    statements = capture_statements(call)
+    if not statements:
+        print(f"SKIP {name}: no statement executed")
+        return True
+    plan = explain(*statements[-1])
+    relations = scanned_relations(plan)
+    problem = expect(relations, plan)
+    print(f"{'FAIL' if problem else 'PASS'} {name}: scans {sorted(relations)}{' - ' + problem if problem else ''}")
+    return not problem
+
+def main():
+    """
+    Verifies with EXPLAIN that the sales queries only touch what they need:
+    get_sales with a date range must be pruned to the partitions of that
+    range, and the revenue reports must be answered from sales_daily_rollup
+    without scanning any sales partition. The revenue-by-period reports must
+    also read the rollup through an index range scan on ``day`` rather than a
+    sequential scan. Exits with status 1 on failure.
+    Needs a migrated database (ideally with data, so plans are realistic).
+    """
+    parser = argparse.ArgumentParser(description="Check partition pruning of the sales queries.")
+    parser.add_argument("--month", type=datetime.date.fromisoformat, default=datetime.date.today().replace(day=1),
+                        help="First day of the month to query (default: this month)")
+    parser.add_argument("--category", default="Category 1", help="Category for the category-filtered checks")
+    args = parser.parse_args()
+
+    start = args.month.replace(day=1)
+    end = (start + datetime.timedelta(days=32)).replace(day=1) - datetime.timedelta(days=1)
+    expected_partition = month_partition(start)
+
+    def pruned_to_month(relations, plan):
+        partitions = sales_partitions(relations)
+        if partitions != {expected_partition}:
+            return f"expected only {expected_partition}, got {sorted(partitions)}"
+        return None
+
+    def rollup_only(relations, plan):
+        if sales_partitions(relations):
+            return f"scans sales partitions {sorted(sales_partitions(relations))}"
+        if "sales_daily_rollup" not in relations:
+            return "does not read sales_daily_rollup"
+        return None
+
+    def rollup_range_scan(relations, plan):
+        problem = rollup_only(relations, plan)
+        if problem:
+            return problem
+        nodes = list(plan_nodes(plan))
+        if any(node["Node Type"] == "Seq Scan" and node.get("Relation Name") == "sales_daily_rollup" for node in nodes):
+            return "sequential scan of sales_daily_rollup"
+        ranges = [
+            node["Index Name"] for node in nodes
+            if "sales_daily_rollup" in node.get("Index Name", "") and "day" in node.get("Index Cond", "")
+        ]
+        if not ranges:
+            return "no index range scan on sales_daily_rollup.day"
+        return None
+
+    results = [
+        check("get_sales (month range)",
+              lambda db: crud.get_sales(db, start_date=start.isoformat(), end_date=end.isoformat()),
+              pruned_to_month),
+        check("get_sales (month range, product)",
+              lambda db: crud.get_sales(db, start_date=start.isoformat(), end_date=end.isoformat(), product_id=1),
+              pruned_to_month),
+        check("stream_sales (month range)",
+              lambda db: list(crud.stream_sales(db, start_date=start.isoformat(), end_date=end.isoformat())),
+              pruned_to_month),
+        check("get_revenue_by_period (daily)",
+              lambda db: crud.get_revenue_by_period(db, "daily", start, end),
+              rollup_range_scan),
+        check("get_revenue_by_period (weekly, category)",
+              lambda db: crud.get_revenue_by_period(db, "weekly", start, end, category=args.category),
+              rollup_range_scan),
+        check("get_revenue_by_period (monthly, product)",
+              lambda db: crud.get_revenue_by_period(db, "monthly", start, end, product_id=1),
+              rollup_range_scan),
+        check("compare_revenue",
+              lambda db: crud.compare_revenue(db, start.isoformat(), end.isoformat(), start.isoformat(), end.isoformat()),
+              rollup_only),
+        check("compare_revenue_periods (by category)",
+              lambda db: crud.compare_revenue_periods(db, [(start, start + datetime.timedelta(days=6)), (start, end)],
+                                                      by_category=True),
+              rollup_only),
+        check("get_top_sales (categories by revenue)",
+              lambda db: crud.get_top_sales(db, "category", "revenue", 20, start, end),
+              rollup_only),
+    ]
+    sys.exit(0 if all(results) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import asyncio
+from collections import Counter
+
+from sqlalchemy import text
+
+from app import config
+from app.database import async_engine
+from app.replicas import ReplicaSet, pinned_to_primary, read_session_scope, replica_set
+
+SERVER_SQL = "SELECT current_database() || '@' || COALESCE(inet_server_port()::text, 'socket')"
+
+async def served_by(reads):
+    """
+    Open ``reads`` read sessions and count the database answering each.
+    """
+    counts = Counter()
+    for _ in range(reads):
+        async with read_session_scope() as db:
+            counts[await db.scalar(text(SERVER_SQL))] += 1
+    return counts
+
+async def run(reads):
+    async with async_engine.connect() as conn:
+        primary = await conn.scalar(text(SERVER_SQL))
+    await replica_set.check()
+    healthy = [replica for replica in replica_set.replicas if replica.healthy]
+    for status in replica_set.status():
+        print(f"replica {status['url']}: healthy={status['healthy']} lag={status['lag_seconds']} {status['last_error'] or ''}")
+
+    ok = True
+    counts = await served_by(reads)
+    print(f"unpinned reads: {dict(counts)}")
+    if healthy and (primary in counts or len(counts) != len(healthy)):
+        print("FAIL: reads should be spread over every healthy replica and never reach the primary")
+        ok = False
+    if not healthy and set(counts) != {primary}:
+        print("FAIL: with no healthy replica, reads should fall back to the primary")
+        ok = False
+    if healthy and max(counts.values()) - min(counts.values()) > 1:
+        print("FAIL: round-robin should spread reads evenly")
+        ok = False
+
+    with pinned_to_primary():
+        pinned = await served_by(reads)
+    print(f"pinned reads:   {dict(pinned)}")
+    if set(pinned) != {primary}:
+        print("FAIL: pinned reads should all reach the primary")
+        ok = False
+
+    unreachable = ReplicaSet(["postgresql://nobody@127.0.0.1:1/none"])
+    await unreachable.check()
+    print(f"unreachable replica healthy after check: {unreachable.replicas[0].healthy}")
+    if unreachable.replicas[0].healthy:
+        print("FAIL: an unreachable replica should be marked down by the health check")
+        ok = False
+
+    await unreachable.close()
+    await replica_set.close()
+    await async_engine.dispose()
+    return ok
+
+def main():
+    """
+    Checks read-replica routing against the configured databases: read
+    sessions rotate over the healthy replicas in DATABASE_REPLICA_URLS,
+    pinned reads and reads with no healthy replica go to the primary, and the
+    health check marks an unreachable replica down.
+
+    Two databases on one local server are enough: create a second database,
+    migrate it, and list its URL in DATABASE_REPLICA_URLS. Its data is never
+    written by this script.
+    """
+    parser = argparse.ArgumentParser(description="Check that reads are routed to the read replicas.")
+    parser.add_argument("--reads", type=int, default=12, help="Read sessions to open per check")
+    args = parser.parse_args()
+
+    if not config.DATABASE_REPLICA_URLS:
+        print("DATABASE_REPLICA_URLS is empty; only the primary fallback is checked.")
+    sys.exit(0 if asyncio.run(run(args.reads)) else 1)
+
+if __name__ == "__main__":
+    main()
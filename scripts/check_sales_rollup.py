@@ -0,0 +1,47 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import datetime
+
+from app import crud
+from app.database import SessionLocal
+
+def main():
+    """
+    Compares the sales_daily_rollup table against the sales table and reports
+    every key that disagrees. Exits with status 1 when mismatches are found,
+    so it can run from cron or CI. With --repair, the affected days are
+    recomputed from sales.
+    """
+    parser = argparse.ArgumentParser(description="Check sales_daily_rollup against sales.")
+    parser.add_argument("--start-date", type=datetime.date.fromisoformat, help="First day to check (YYYY-MM-DD)")
+    parser.add_argument("--end-date", type=datetime.date.fromisoformat, help="Last day to check (YYYY-MM-DD)")
+    parser.add_argument("--repair", action="store_true", help="Rebuild the rollup for mismatching days")
+    args = parser.parse_args()
+
+    session = SessionLocal()
+    try:
+        mismatches = crud.check_sales_rollup(session, args.start_date, args.end_date)
+        for row in mismatches:
+            print(
+                f"{row['day']} product={row['product_id']} category={row['category']!r} "
+                f"revenue sales={row['expected_revenue']} rollup={row['rollup_revenue']} "
+                f"quantity sales={row['expected_quantity']} rollup={row['rollup_quantity']} "
+                f"count sales={row['expected_sales_count']} rollup={row['rollup_sales_count']}"
+            )
+        print(f"{len(mismatches)} mismatching rollup keys")
+
+        if mismatches and args.repair:
+            days = sorted({row["day"] for row in mismatches})
+            written = crud.rebuild_sales_rollup(session, days)
+            print(f"Rebuilt {len(days)} days ({written} rollup rows)")
+            return 0
+    finally:
+        session.close()
+
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
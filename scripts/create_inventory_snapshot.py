@@ -0,0 +1,40 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import datetime
+
+from app import crud
+from app.database import SessionLocal
+
+def main():
+    """
+    Records a checkpoint of every product's stock in inventory_snapshots,
+    from which GET /inventory/as-of rebuilds stock at any time. Schedule it
+    (e.g. hourly or daily from cron): point-in-time lookups replay at most
+    one interval of inventory_changes.
+
+    The checkpoint is taken --lag-seconds in the past so that changes still
+    being committed are not missed; keep it above the longest write
+    transaction. With --keep-days, older checkpoints are pruned, keeping the
+    latest one before the cutoff.
+    """
+    parser = argparse.ArgumentParser(description="Checkpoint the stock of every product.")
+    parser.add_argument("--lag-seconds", type=int, default=300, help="Take the checkpoint this far in the past (default 300)")
+    parser.add_argument("--keep-days", type=int, default=0, help="Prune checkpoints older than this (default 0, keep all)")
+    args = parser.parse_args()
+
+    taken_at = datetime.datetime.utcnow().replace(microsecond=0) - datetime.timedelta(seconds=args.lag_seconds)
+    session = SessionLocal()
+    try:
+        products = crud.create_inventory_snapshot(session, taken_at)
+        print(f"{taken_at.isoformat()}: {products} products")
+        if args.keep_days:
+            pruned = crud.prune_inventory_snapshots(session, taken_at - datetime.timedelta(days=args.keep_days))
+            print(f"pruned {pruned} snapshot rows")
+    finally:
+        session.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+
+from app import crud
+from app.database import SessionLocal
+
+def main():
+    """
+    Pre-creates the monthly partitions of the sales table so that new sales
+    never land in sales_default. Safe to run repeatedly; schedule it (e.g.
+    daily from cron) with a look-ahead longer than the schedule interval.
+    """
+    parser = argparse.ArgumentParser(description="Create upcoming monthly sales partitions.")
+    parser.add_argument("--months-ahead", type=int, default=3, help="Future months to create (default 3)")
+    args = parser.parse_args()
+
+    session = SessionLocal()
+    try:
+        for name in crud.create_sales_partitions(session, args.months_ahead):
+            print(name)
+    finally:
+        session.close()
+
+if __name__ == "__main__":
+    main()
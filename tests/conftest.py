@@ -0,0 +1,43 @@
+import datetime
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from app import models
+from app.embedded import EMBEDDED_TABLES
+
+PRODUCTS = [
+    {"id": 1, "name": "Novel", "category": "Books", "price": 10.0, "stock": 5},
+    {"id": 2, "name": "Board game", "category": "Games", "price": 10.0, "stock": 5},
+    {"id": 3, "name": "Gift card", "category": None, "price": 5.0, "stock": 5},
+]
+
+# (day, product_id, category, revenue, quantity): ISO week 2025-01 runs from
+# Monday 2024-12-30 to Sunday 2025-01-05, and February 2025 has no sales.
+ROLLUP = [
+    (datetime.date(2024, 12, 30), 1, "Books", 10.0, 1),
+    (datetime.date(2025, 1, 5), 2, "Games", 20.0, 2),
+    (datetime.date(2025, 1, 6), 1, "Books", 30.0, 3),
+    (datetime.date(2025, 3, 15), 3, "", 5.0, 1),
+    (datetime.date(2025, 3, 31), 2, "Games", 40.0, 4),
+]
+
+@pytest.fixture
+def report_db():
+    """
+    Session on an in-memory SQLite database holding the tables the revenue
+    reports read, seeded with :data:`PRODUCTS` and :data:`ROLLUP`.
+    """
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(engine, tables=EMBEDDED_TABLES)
+    with engine.begin() as conn:
+        conn.execute(insert(models.Product.__table__), PRODUCTS)
+        conn.execute(insert(models.SalesDailyRollup.__table__), [
+            {"day": day, "product_id": product_id, "category": category,
+             "revenue": revenue, "quantity": quantity, "sales_count": quantity}
+            for day, product_id, category, revenue, quantity in ROLLUP
+        ])
+    with Session(engine) as db:
+        yield db
+    engine.dispose()
@@ -0,0 +1,91 @@
+import datetime
+
+from app.cache import INVALIDATION_LOG_SIZE, ReportCache, parse_day
+
+D = datetime.date
+JANUARY = (D(2025, 1, 1), D(2025, 1, 31))
+MARCH = (D(2025, 3, 1), D(2025, 3, 31))
+
+def test_get_and_set():
+    cache = ReportCache(max_entries=4, ttl=60)
+    assert cache.get("a") is None
+    cache.set("a", 1, [JANUARY])
+    assert cache.get("a") == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ReportCache(max_entries=2, ttl=60)
+    cache.set("a", 1, [JANUARY])
+    cache.set("b", 2, [JANUARY])
+    cache.get("a")
+    cache.set("c", 3, [JANUARY])
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.evictions == 1
+
+def test_expired_entries_are_misses():
+    cache = ReportCache(max_entries=2, ttl=0)
+    cache.set("a", 1, [JANUARY])
+    assert cache.get("a") is None
+    assert cache.expirations == 1
+
+def test_disabled_cache_stores_nothing():
+    cache = ReportCache(max_entries=0, ttl=60)
+    cache.set("a", 1, [JANUARY])
+    assert cache.get("a") is None
+
+def test_invalidation_drops_only_overlapping_ranges():
+    cache = ReportCache(max_entries=8, ttl=60)
+    cache.set("january", 1, [JANUARY])
+    cache.set("march", 2, [MARCH])
+    cache.set("both", 3, [JANUARY, MARCH])
+    cache.set("since february", 4, [(D(2025, 2, 1), None)])
+    cache.set("all", 5, [(None, None)])
+    cache.invalidate_days([D(2025, 1, 15)])
+    assert [key for key in ("january", "march", "both", "since february", "all") if cache.get(key) is not None] == [
+        "march", "since february",
+    ]
+    assert cache.invalidations == 3
+
+def test_invalidating_no_days_is_a_no_op():
+    cache = ReportCache(max_entries=8, ttl=60)
+    cache.invalidate_days([])
+    assert cache.generation == 0
+
+def test_clear():
+    cache = ReportCache(max_entries=8, ttl=60)
+    cache.set("a", 1, [JANUARY])
+    cache.clear()
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
+
+def test_report_computed_across_an_overlapping_invalidation_is_not_stored():
+    cache = ReportCache(max_entries=8, ttl=60)
+    generation = cache.generation
+    cache.invalidate_days([D(2025, 1, 15)])  # a write lands while the report is computed
+    cache.set("january", 1, [JANUARY], generation)
+    cache.set("march", 2, [MARCH], generation)
+    assert cache.get("january") is None
+    assert cache.get("march") == 2
+    assert cache.stale_stores == 1
+
+def test_report_computed_across_a_clear_is_not_stored():
+    cache = ReportCache(max_entries=8, ttl=60)
+    generation = cache.generation
+    cache.clear()
+    cache.set("march", 2, [MARCH], generation)
+    assert cache.get("march") is None
+
+def test_report_older_than_the_invalidation_log_is_not_stored():
+    cache = ReportCache(max_entries=8, ttl=60)
+    generation = cache.generation
+    for _ in range(INVALIDATION_LOG_SIZE + 1):
+        cache.invalidate_days([D(2025, 1, 15)])
+    cache.set("march", 2, [MARCH], generation)
+    assert cache.get("march") is None
+
+def test_parse_day():
+    assert parse_day("2025-01-15") == D(2025, 1, 15)
+    assert parse_day("2025-01-15T10:30:00") == D(2025, 1, 15)
+    assert parse_day(datetime.datetime(2025, 1, 15, 10, 30)) == D(2025, 1, 15)
+    assert parse_day(None) is None
@@ -0,0 +1,29 @@
+import pytest
+from starlette.requests import Request
+
+from app.etags import make_etag, not_modified
+
+def request(path="/inventory/", query="", if_none_match=None):
+    headers = [] if if_none_match is None else [(b"if-none-match", if_none_match.encode())]
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": query.encode(), "headers": headers})
+
+def test_etag_depends_on_version_path_and_query():
+    etag = make_etag(request(query="limit=10&skip=0"), 7)
+    assert etag.startswith('W/"7-')
+    assert make_etag(request(query="skip=0&limit=10"), 7) == etag  # parameter order does not matter
+    assert make_etag(request(query="limit=10&skip=0"), 8) != etag
+    assert make_etag(request(query="limit=20&skip=0"), 7) != etag
+    assert make_etag(request(path="/sales/", query="limit=10&skip=0"), 7) != etag
+
+def test_without_if_none_match_the_body_is_sent():
+    assert not_modified(request(), 'W/"7-abc"') is None
+
+@pytest.mark.parametrize("header", ['W/"7-abc"', '"7-abc"', '"1-def", W/"7-abc"', "*"])
+def test_matching_tag_is_not_modified(header):
+    response = not_modified(request(if_none_match=header), 'W/"7-abc"')
+    assert response.status_code == 304
+    assert response.headers["etag"] == 'W/"7-abc"'
+
+@pytest.mark.parametrize("header", ['W/"6-abc"', '"7-abd", "8-abc"'])
+def test_other_tags_get_the_body(header):
+    assert not_modified(request(if_none_match=header), 'W/"7-abc"') is None
@@ -0,0 +1,31 @@
+import base64
+import datetime
+
+import pytest
+
+from app.pagination import decode_cursor, encode_cursor
+
+def test_round_trip():
+    timestamp = datetime.datetime(2025, 6, 18, 10, 30, 15, 123456)
+    cursor = encode_cursor(timestamp, 42)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (timestamp, 42)
+
+def _encode(payload: bytes) -> str:
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "not a cursor!",
+    _encode(b"not json"),
+    _encode(b'{"timestamp": "2025-06-18T10:30:00", "id": 1}'),
+    _encode(b'["2025-06-18T10:30:00"]'),
+    _encode(b'["2025-06-18T10:30:00", 1, 2]'),
+    _encode(b'["yesterday", 1]'),
+    _encode(b'["2025-06-18T10:30:00", "one"]'),
+    _encode(b'[20250618, 1]'),
+    _encode(b'["2025-06-18T10:30:00", null]'),
+])
+def test_malformed_cursors_raise_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
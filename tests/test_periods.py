@@ -0,0 +1,37 @@
+import datetime
+
+import pytest
+
+from app import crud
+from app.routers.sales import parse_period
+
+D = datetime.date
+
+@pytest.mark.parametrize("period, day, start, label", [
+    ("daily", D(2025, 6, 18), D(2025, 6, 18), "2025-06-18"),
+    ("weekly", D(2025, 6, 18), D(2025, 6, 16), "2025-25"),
+    ("weekly", D(2025, 6, 16), D(2025, 6, 16), "2025-25"),
+    ("weekly", D(2025, 1, 1), D(2024, 12, 30), "2025-01"),  # ISO week of the following year
+    ("weekly", D(2021, 1, 3), D(2020, 12, 28), "2020-53"),
+    ("monthly", D(2025, 6, 18), D(2025, 6, 1), "2025-06"),
+    ("annual", D(2025, 6, 18), D(2025, 1, 1), "2025"),
+])
+def test_period_start_and_label(period, day, start, label):
+    assert crud.period_start(period, day) == start
+    assert crud.period_label(period, start) == label
+
+def test_parse_period():
+    assert parse_period("2025-01-06/2025-01-12") == (D(2025, 1, 6), D(2025, 1, 12))
+    assert parse_period("2025-01-06/2025-01-06") == (D(2025, 1, 6), D(2025, 1, 6))
+
+@pytest.mark.parametrize("value", [
+    "2025-01-12/2025-01-06",  # inverted
+    "2025-01-06",
+    "2025-01-06/",
+    "/2025-01-06",
+    "2025-01-06/2025-02-30",
+    "last week",
+])
+def test_parse_period_rejects(value):
+    with pytest.raises(ValueError):
+        parse_period(value)
@@ -0,0 +1,101 @@
+import datetime
+
+import pytest
+
+from app import crud
+
+D = datetime.date
+
+def revenues(report):
+    return [(row["period"], row["total_revenue"]) for row in report]
+
+def test_monthly_fills_gaps_between_first_and_last_sale(report_db):
+    report = crud.get_revenue_by_period(report_db, "monthly")
+    assert revenues(report) == [("2024-12", 10.0), ("2025-01", 50.0), ("2025-02", 0.0), ("2025-03", 45.0)]
+    assert [row["period_start"] for row in report] == [D(2024, 12, 1), D(2025, 1, 1), D(2025, 2, 1), D(2025, 3, 1)]
+
+def test_weekly_buckets_start_on_monday(report_db):
+    report = crud.get_revenue_by_period(report_db, "weekly", D(2024, 12, 30), D(2025, 1, 12))
+    assert revenues(report) == [("2025-01", 30.0), ("2025-02", 30.0)]
+    assert [row["period_start"] for row in report] == [D(2024, 12, 30), D(2025, 1, 6)]
+
+def test_annual(report_db):
+    assert revenues(crud.get_revenue_by_period(report_db, "annual")) == [("2024", 10.0), ("2025", 95.0)]
+
+def test_daily_fills_days_up_to_an_explicit_end(report_db):
+    report = crud.get_revenue_by_period(report_db, "daily", D(2025, 1, 5), D(2025, 1, 8))
+    assert revenues(report) == [("2025-01-05", 20.0), ("2025-01-06", 30.0), ("2025-01-07", 0.0), ("2025-01-08", 0.0)]
+
+def test_bounds_mid_period_cover_the_whole_period(report_db):
+    report = crud.get_revenue_by_period(report_db, "monthly", D(2025, 1, 6), D(2025, 3, 20))
+    assert revenues(report) == [("2025-01", 30.0), ("2025-02", 0.0), ("2025-03", 5.0)]
+
+@pytest.mark.parametrize("start, end, expected", [
+    (D(2025, 3, 1), None, [("2025-03", 45.0)]),
+    (None, D(2025, 1, 31), [("2024-12", 10.0), ("2025-01", 50.0)]),
+    (D(2026, 1, 1), None, []),  # no sales after the start
+    (None, D(2024, 1, 31), []),  # no sales before the end
+])
+def test_open_ranges_stop_at_the_last_or_first_sale(report_db, start, end, expected):
+    assert revenues(crud.get_revenue_by_period(report_db, "monthly", start, end)) == expected
+
+@pytest.mark.parametrize("period", ["daily", "weekly", "monthly", "annual"])
+@pytest.mark.parametrize("start, end", [
+    (D(2025, 3, 31), D(2024, 12, 30)),
+    (D(2027, 1, 1), D(2023, 1, 1)),
+])
+def test_inverted_ranges_are_empty(report_db, period, start, end):
+    assert crud.get_revenue_by_period(report_db, period, start, end) == []
+
+@pytest.mark.parametrize("start, end", [(None, None), (D(2025, 1, 1), D(2025, 1, 31))])
+def test_unknown_category_is_empty_or_zero(report_db, start, end):
+    report = crud.get_revenue_by_period(report_db, "monthly", start, end, category="Toys")
+    assert revenues(report) == ([] if start is None else [("2025-01", 0.0)])
+
+def test_category_and_product_filters(report_db):
+    assert revenues(crud.get_revenue_by_period(report_db, "annual", category="Books")) == [("2024", 10.0), ("2025", 30.0)]
+    assert revenues(crud.get_revenue_by_period(report_db, "annual", product_id=2)) == [("2025", 60.0)]
+
+def test_invalid_period(report_db):
+    assert "error" in crud.get_revenue_by_period(report_db, "hourly")
+
+@pytest.mark.parametrize("period", ["daily", "weekly", "monthly", "annual"])
+def test_buckets_agree_with_period_start_and_label(report_db, period):
+    for row in crud.get_revenue_by_period(report_db, period):
+        assert crud.period_start(period, row["period_start"]) == row["period_start"]
+        assert crud.period_label(period, row["period_start"]) == row["period"]
+
+def test_compare_revenue(report_db):
+    result = crud.compare_revenue(report_db, D(2025, 1, 1), D(2025, 1, 31), D(2025, 3, 1), D(2025, 3, 31))
+    assert result["period1"]["revenue"] == 50.0
+    assert result["period2"]["revenue"] == 45.0
+    assert result["difference"] == -5.0
+
+def test_compare_revenue_periods(report_db):
+    periods = [(D(2025, 1, 1), D(2025, 1, 31)), (D(2025, 2, 1), D(2025, 2, 28)), (D(2025, 3, 1), D(2025, 3, 31))]
+    result = crud.compare_revenue_periods(report_db, periods)
+    assert [(p["revenue"], p["delta"], p["delta_pct"]) for p in result["periods"]] == [
+        (50.0, None, None),
+        (0.0, -50.0, -100.0),
+        (45.0, 45.0, None),  # no percentage after a period without revenue
+    ]
+    assert result["categories"] is None
+
+def test_compare_revenue_periods_by_category(report_db):
+    periods = [(D(2024, 12, 1), D(2024, 12, 31)), (D(2025, 1, 1), D(2025, 3, 31))]
+    result = crud.compare_revenue_periods(report_db, periods, by_category=True)
+    assert [p["revenue"] for p in result["periods"]] == [10.0, 95.0]
+    assert {c["category"]: [p["revenue"] for p in c["periods"]] for c in result["categories"]} == {
+        "": [0.0, 5.0], "Books": [10.0, 30.0], "Games": [0.0, 60.0],
+    }
+
+def test_top_products_by_revenue(report_db):
+    top = crud.get_top_sales(report_db, by="product", metric="revenue", limit=2)
+    assert [(row["product_id"], row["name"], row["total_revenue"]) for row in top] == [(2, "Board game", 60.0), (1, "Novel", 40.0)]
+
+def test_top_categories_by_quantity_in_a_range(report_db):
+    top = crud.get_top_sales(report_db, by="category", metric="quantity", start_date=D(2025, 1, 1), end_date=D(2025, 3, 30))
+    assert [(row["category"], row["total_quantity"]) for row in top] == [("Books", 3), ("Games", 2), ("", 1)]
+
+def test_top_sales_of_an_inverted_range_is_empty(report_db):
+    assert crud.get_top_sales(report_db, start_date=D(2025, 3, 31), end_date=D(2025, 1, 1)) == []